@@ -0,0 +1,57 @@
+"""
+Concurrency benchmark for AgentGraph.invoke.
+
+Runs N simultaneous invocations against a local FakeChatModel and compares the
+wall time with that of a single invocation. With a non-blocking assistant node
+the ratio should stay close to 1.
+
+Usage:
+    python -m benchmarks.concurrency --concurrency 50 --latency 0.5
+"""
+
+import argparse
+import asyncio
+import time
+
+from benchmarks.fake_llm import FakeChatModel
+from src.graph.agent_graph import AgentGraph
+from src.graph.create_graph import load_tools_from_directory
+
+
+def build_graph(latency: float) -> AgentGraph:
+    graph = AgentGraph(
+        tools=load_tools_from_directory("src.tools.tool_directory"),
+        config={"configurable": {}},
+        llm=FakeChatModel(latency=latency),
+    )
+    graph.compile()
+    return graph
+
+
+async def timed_invokes(graph: AgentGraph, concurrency: int) -> float:
+    start = time.perf_counter()
+    await asyncio.gather(
+        *(
+            graph.invoke(chat_history=[], message=f"Question {i}")
+            for i in range(concurrency)
+        )
+    )
+    return time.perf_counter() - start
+
+
+async def main(concurrency: int, latency: float):
+    graph = build_graph(latency)
+    single = await timed_invokes(graph, 1)
+    concurrent = await timed_invokes(graph, concurrency)
+    print(f"model latency:          {latency:.3f}s")
+    print(f"1 invocation:           {single:.3f}s")
+    print(f"{concurrency} concurrent invocations: {concurrent:.3f}s")
+    print(f"ratio:                  {concurrent / single:.2f}x")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--concurrency", type=int, default=50)
+    parser.add_argument("--latency", type=float, default=0.5)
+    args = parser.parse_args()
+    asyncio.run(main(args.concurrency, args.latency))
@@ -0,0 +1,136 @@
+"""
+Stress test of per-request config isolation in AgentGraph.invoke.
+
+Runs many turns at once against one shared graph, from asyncio tasks and from
+several threads with their own event loops, each with a distinct runtime config
+(user id and token). A tool echoes the configurable values it receives, and
+the test fails if any turn sees another turn's values or if the graph's base
+config changed. It then measures the per-call cost of building a turn's config.
+
+Usage:
+    python -m benchmarks.config_isolation --requests 500 --threads 4
+"""
+
+import argparse
+import asyncio
+import json
+import random
+import threading
+import timeit
+
+from langchain_core.messages import AIMessage, ToolMessage
+from langchain_core.runnables import RunnableConfig
+from pydantic import BaseModel
+
+from benchmarks.fake_llm import FakeChatModel
+from src.graph.agent_graph import AgentGraph
+from src.tools.base import MiMaizeyTool
+from src.tools.schemas import ToolArtifact, ToolSource
+
+BASE_CONFIGURABLE = {"campus": "Ann Arbor", "language": "en"}
+
+SCRIPT = [
+    AIMessage(
+        content="",
+        tool_calls=[{"name": "whoami_tool", "args": {}, "id": "1"}],
+    ),
+    AIMessage(content="Done."),
+]
+
+
+class WhoAmITool(
+    MiMaizeyTool,
+    name="whoami_tool",
+    description="Returns the user the request runs for.",
+):
+    """Echoes the public configurable values of the config it receives."""
+
+    args_schema: type[BaseModel] = BaseModel
+
+    async def _arun(self, config: RunnableConfig):
+        # Yield so that concurrent turns interleave inside the tool node.
+        await asyncio.sleep(random.random() * 0.005)
+        configurable = {
+            k: v
+            for k, v in config.get("configurable", {}).items()
+            if not k.startswith("__") and not k.startswith("checkpoint")
+        }
+        return json.dumps(configurable), ToolArtifact(
+            sources=[ToolSource(label=self.name)]
+        )
+
+
+def build_graph() -> AgentGraph:
+    graph = AgentGraph(
+        tools=[WhoAmITool()],
+        config={"configurable": dict(BASE_CONFIGURABLE)},
+        llm=FakeChatModel(script=SCRIPT, latency=0.001),
+    )
+    graph.compile()
+    return graph
+
+
+async def checked_turn(graph: AgentGraph, user: str) -> list[str]:
+    """Runs one turn as `user` and returns the leaks it observed."""
+    runtime_config = {"user_id": user, "token": f"token-{user}"}
+    messages, _, _ = await graph.invoke(
+        chat_history=[], message="Who am I?", runtime_config=runtime_config
+    )
+    seen = json.loads(next(m for m in messages if isinstance(m, ToolMessage)).content)
+    expected = {**BASE_CONFIGURABLE, **runtime_config}
+    if seen != expected:
+        return [f"{user} saw {seen}"]
+    return []
+
+
+async def run_tasks(graph: AgentGraph, prefix: str, requests: int) -> list[str]:
+    results = await asyncio.gather(
+        *(checked_turn(graph, f"{prefix}-{i}") for i in range(requests))
+    )
+    return [leak for leaks in results for leak in leaks]
+
+
+def stress(graph: AgentGraph, requests: int, threads: int) -> list[str]:
+    leaks: list[str] = []
+
+    def worker(index: int):
+        leaks.extend(asyncio.run(run_tasks(graph, f"thread{index}", requests)))
+
+    workers = [threading.Thread(target=worker, args=(i,)) for i in range(threads)]
+    for thread in workers:
+        thread.start()
+    for thread in workers:
+        thread.join()
+    return leaks
+
+
+def main(requests: int, threads: int, repeat: int):
+    graph = build_graph()
+    leaks = stress(graph, requests, threads)
+    base_changed = dict(graph.config["configurable"]) != BASE_CONFIGURABLE
+    print(f"turns:             {requests * threads} ({threads} thread(s))")
+    print(f"leaked configs:    {len(leaks)}")
+    print(f"base config kept:  {not base_changed}")
+    for leak in leaks[:5]:
+        print(f"  {leak}")
+
+    runtime_config = {"user_id": "user", "token": "token"}
+    per_call = (
+        timeit.timeit(
+            lambda: graph._prepare_input([], "Who am I?", runtime_config),
+            number=repeat,
+        )
+        / repeat
+    )
+    print(f"config per call:   {per_call * 1e6:.2f}us (including the graph input)")
+    if leaks or base_changed:
+        raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--requests", type=int, default=500, help="Turns per thread")
+    parser.add_argument("--threads", type=int, default=4)
+    parser.add_argument("--repeat", type=int, default=100_000)
+    args = parser.parse_args()
+    main(args.requests, args.threads, args.repeat)
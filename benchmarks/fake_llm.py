@@ -0,0 +1,214 @@
+import asyncio
+import json
+import random
+import re
+import time
+import uuid
+from typing import Any, AsyncIterator, Iterator, Optional
+
+from langchain_core.callbacks import (
+    AsyncCallbackManagerForLLMRun,
+    CallbackManagerForLLMRun,
+)
+from langchain_core.language_models import BaseChatModel
+from langchain_core.messages import (
+    AIMessage,
+    AIMessageChunk,
+    BaseMessage,
+    HumanMessage,
+)
+from langchain_core.outputs import ChatGeneration, ChatGenerationChunk, ChatResult
+from pydantic import PrivateAttr
+
+
+class FakeAPIError(Exception):
+    """Error raised by FakeChatModel to simulate throttling or server errors."""
+
+    def __init__(self, status_code: int):
+        super().__init__(f"Fake API error {status_code}")
+        self.status_code = status_code
+
+
+class FakeChatModel(BaseChatModel):
+    """
+    Local, scripted stand-in for AzureChatOpenAI used by the benchmarks.
+
+    The response is chosen from `script` by the number of AI messages that
+    follow the last human message, so concurrent conversations sharing one
+    model instance each walk through the script deterministically. Every call
+    takes `latency` seconds; the async path sleeps without blocking the loop.
+
+    Attributes:
+        script (list[AIMessage]): Responses for each assistant step of a turn.
+            The last entry is reused once the script runs out.
+        latency (float): Simulated round-trip time in seconds.
+        failure_rate (float): Fraction of calls that fail with `failure_status`,
+            e.g. to simulate a throttled deployment.
+        failure_status (int): Status code of the simulated failures.
+        prompt_cache (bool): Simulates a provider-side prompt cache: the input
+            tokens of the longest message prefix sent before are reported as
+            cached in `input_token_details`.
+    """
+
+    script: list[AIMessage] = [AIMessage(content="Hello from the fake model.")]
+    latency: float = 0.0
+    failure_rate: float = 0.0
+    failure_status: int = 429
+    prompt_cache: bool = False
+    _cached_prefixes: set[int] = PrivateAttr(default_factory=set)
+
+    @property
+    def _llm_type(self) -> str:
+        return "fake-chat-model"
+
+    def bind_tools(self, tools: list, **kwargs: Any) -> "FakeChatModel":
+        return self
+
+    def _maybe_fail(self):
+        if self.failure_rate and random.random() < self.failure_rate:
+            raise FakeAPIError(self.failure_status)
+
+    @staticmethod
+    def _step(messages: list[BaseMessage]) -> int:
+        """Number of AI messages since the last human message."""
+        step = 0
+        for message in reversed(messages):
+            if isinstance(message, HumanMessage):
+                break
+            if isinstance(message, AIMessage):
+                step += 1
+        return step
+
+    def _scripted_message(
+        self, messages: list[BaseMessage], run_manager: Optional[Any] = None
+    ) -> tuple[AIMessage, float]:
+        """Returns the scripted response to a call and its latency."""
+        step = self._step(messages)
+        return self.script[min(step, len(self.script) - 1)], self.latency
+
+    def _next_message(
+        self, messages: list[BaseMessage], run_manager: Optional[Any] = None
+    ) -> tuple[AIMessage, float]:
+        scripted, latency = self._scripted_message(messages, run_manager)
+        tool_calls = [
+            {**call, "id": f"call_{uuid.uuid4().hex[:12]}"}
+            for call in scripted.tool_calls
+        ]
+        input_tokens = sum(len(str(message.content)) // 4 for message in messages)
+        output_tokens = len(str(scripted.content)) // 4
+        usage_metadata = {
+            "input_tokens": input_tokens,
+            "output_tokens": output_tokens,
+            "total_tokens": input_tokens + output_tokens,
+        }
+        if self.prompt_cache:
+            usage_metadata["input_token_details"] = {
+                "cache_read": self._cached_tokens(messages)
+            }
+        message = AIMessage(
+            content=scripted.content,
+            tool_calls=tool_calls,
+            usage_metadata=usage_metadata,
+        )
+        return message, latency
+
+    def _generate(
+        self,
+        messages: list[BaseMessage],
+        stop: Optional[list[str]] = None,
+        run_manager: Optional[CallbackManagerForLLMRun] = None,
+        **kwargs: Any,
+    ) -> ChatResult:
+        message, latency = self._next_message(messages, run_manager)
+        time.sleep(latency)
+        self._maybe_fail()
+        return ChatResult(generations=[ChatGeneration(message=message)])
+
+    async def _agenerate(
+        self,
+        messages: list[BaseMessage],
+        stop: Optional[list[str]] = None,
+        run_manager: Optional[AsyncCallbackManagerForLLMRun] = None,
+        **kwargs: Any,
+    ) -> ChatResult:
+        message, latency = self._next_message(messages, run_manager)
+        await asyncio.sleep(latency)
+        self._maybe_fail()
+        return ChatResult(generations=[ChatGeneration(message=message)])
+
+    def _stream(
+        self,
+        messages: list[BaseMessage],
+        stop: Optional[list[str]] = None,
+        run_manager: Optional[CallbackManagerForLLMRun] = None,
+        **kwargs: Any,
+    ) -> Iterator[ChatGenerationChunk]:
+        message, latency = self._next_message(messages, run_manager)
+        time.sleep(latency)
+        self._maybe_fail()
+        for chunk in self._chunks(message):
+            if run_manager:
+                run_manager.on_llm_new_token(chunk.text, chunk=chunk)
+            yield chunk
+
+    async def _astream(
+        self,
+        messages: list[BaseMessage],
+        stop: Optional[list[str]] = None,
+        run_manager: Optional[AsyncCallbackManagerForLLMRun] = None,
+        **kwargs: Any,
+    ) -> AsyncIterator[ChatGenerationChunk]:
+        self._maybe_fail()
+        message, latency = self._next_message(messages, run_manager)
+        chunks = self._chunks(message)
+        # Spread the latency over the chunks so time-to-first-token is visible.
+        delay = latency / max(len(chunks), 1)
+        for chunk in chunks:
+            await asyncio.sleep(delay)
+            if run_manager:
+                await run_manager.on_llm_new_token(chunk.text, chunk=chunk)
+            yield chunk
+
+    def _cached_tokens(self, messages: list[BaseMessage]) -> int:
+        """Tokens of the longest prefix of `messages` seen before; remembers them."""
+        cached = tokens = 0
+        prefix = 0
+        for message in messages:
+            prefix = hash((prefix, message.type, str(message.content)))
+            tokens += len(str(message.content)) // 4
+            if prefix in self._cached_prefixes:
+                cached = tokens
+            self._cached_prefixes.add(prefix)
+        return cached
+
+    @staticmethod
+    def _chunks(message: AIMessage) -> list[ChatGenerationChunk]:
+        tokens = [t for t in re.split(r"(\s)", str(message.content)) if t]
+        chunks = [
+            ChatGenerationChunk(message=AIMessageChunk(content=token))
+            for token in tokens
+        ]
+        for index, call in enumerate(message.tool_calls):
+            chunks.append(
+                ChatGenerationChunk(
+                    message=AIMessageChunk(
+                        content="",
+                        tool_call_chunks=[
+                            {
+                                "name": call["name"],
+                                "args": json.dumps(call["args"]),
+                                "id": call["id"],
+                                "index": index,
+                            }
+                        ],
+                    )
+                )
+            )
+        chunks.append(
+            ChatGenerationChunk(
+                message=AIMessageChunk(
+                    content="", usage_metadata=message.usage_metadata
+                )
+            )
+        )
+        return chunks
@@ -0,0 +1,146 @@
+"""
+Load test of the ASGI service against a local fake LLM.
+
+Starts `src.server.app` with the given number of worker processes and a graph
+factory that uses FakeChatModel, waits until it is ready, then sends requests
+from many concurrent clients to the invoke (or stream) endpoint and reports
+throughput and latency percentiles.
+
+Usage:
+    python -m benchmarks.load_test --workers 4 --requests 2000 --concurrency 100
+"""
+
+import argparse
+import asyncio
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+import httpx
+from langchain_core.messages import AIMessage
+from langgraph.checkpoint.base import BaseCheckpointSaver
+
+from benchmarks.fake_llm import FakeChatModel
+from src.graph.agent_graph import AgentGraph
+from src.graph.create_graph import load_tools_from_manifest
+
+SCRIPT = [
+    AIMessage(
+        content="",
+        tool_calls=[
+            {"name": "multiplication_tool", "args": {"num1": 6, "num2": 7}, "id": "1"}
+        ],
+    ),
+    AIMessage(content="The answer is 42."),
+]
+
+
+def create_fake_graph(checkpointer: BaseCheckpointSaver | None = None) -> AgentGraph:
+    """Graph factory for the service using the fake LLM (GRAPH_FACTORY)."""
+    graph = AgentGraph(
+        tools=load_tools_from_manifest("src.tools.tool_directory"),
+        config={"configurable": {}},
+        llm=FakeChatModel(
+            script=SCRIPT, latency=float(os.getenv("FAKE_LLM_LATENCY", "0.05"))
+        ),
+    )
+    graph.compile(checkpointer=checkpointer)
+    return graph
+
+
+async def wait_until_ready(client: httpx.AsyncClient, timeout: float = 60.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            if (await client.get("/readyz")).status_code == 200:
+                return
+        except httpx.TransportError:
+            pass
+        await asyncio.sleep(0.2)
+    raise TimeoutError("The service did not become ready")
+
+
+async def run_load(base_url: str, requests: int, concurrency: int, endpoint: str):
+    limits = httpx.Limits(max_connections=concurrency)
+    async with httpx.AsyncClient(
+        base_url=base_url, limits=limits, timeout=60.0
+    ) as client:
+        await wait_until_ready(client)
+        semaphore = asyncio.Semaphore(concurrency)
+        latencies: list[float] = []
+        errors = 0
+
+        async def one(i: int):
+            nonlocal errors
+            async with semaphore:
+                start = time.perf_counter()
+                try:
+                    response = await client.post(
+                        endpoint, json={"message": f"What is 6 times 7? ({i})"}
+                    )
+                    response.raise_for_status()
+                except httpx.HTTPError:
+                    errors += 1
+                    return
+                latencies.append(time.perf_counter() - start)
+
+        start = time.perf_counter()
+        await asyncio.gather(*(one(i) for i in range(requests)))
+        elapsed = time.perf_counter() - start
+
+    quantiles = statistics.quantiles(latencies, n=100) if len(latencies) > 1 else []
+    print(f"requests:   {requests} ({errors} failed) in {elapsed:.2f}s")
+    print(f"throughput: {len(latencies) / elapsed:.1f} turns/s")
+    if quantiles:
+        print(
+            f"latency:    p50 {quantiles[49] * 1000:.0f}ms  "
+            f"p95 {quantiles[94] * 1000:.0f}ms  p99 {quantiles[98] * 1000:.0f}ms"
+        )
+
+
+def main(args: argparse.Namespace):
+    env = {
+        **os.environ,
+        "GRAPH_FACTORY": "benchmarks.load_test:create_fake_graph",
+        "FAKE_LLM_LATENCY": str(args.latency),
+        "CHECKPOINTER": "none",
+    }
+    server = subprocess.Popen(
+        [
+            sys.executable,
+            "-m",
+            "src.server.app",
+            "--port",
+            str(args.port),
+            "--workers",
+            str(args.workers),
+            "--log-level",
+            "warning",
+        ],
+        env=env,
+    )
+    try:
+        asyncio.run(
+            run_load(
+                f"http://127.0.0.1:{args.port}",
+                args.requests,
+                args.concurrency,
+                f"/{args.endpoint}",
+            )
+        )
+    finally:
+        server.terminate()
+        server.wait(timeout=60)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--workers", type=int, default=2)
+    parser.add_argument("--requests", type=int, default=1000)
+    parser.add_argument("--concurrency", type=int, default=50)
+    parser.add_argument("--latency", type=float, default=0.05)
+    parser.add_argument("--endpoint", choices=["invoke", "stream"], default="invoke")
+    parser.add_argument("--port", type=int, default=8765)
+    main(parser.parse_args())
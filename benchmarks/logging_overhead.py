@@ -0,0 +1,105 @@
+"""
+Per-turn cost of logging with long conversations.
+
+Runs turns that carry a chat history of `--history` messages, so the logged
+graph output is large, with:
+
+- logging disabled (WARNING level), the baseline;
+- a synchronous stdlib text handler at INFO level;
+- the queue-based JSON logging of `configure_logging` at INFO level;
+- the same with `--sample-rate` of the large payloads rendered.
+
+All handlers write to os.devnull. Reports the mean turn time of each setup,
+its overhead over the baseline, and what eagerly formatting the output with an
+f-string costs per turn.
+
+Usage:
+    python -m benchmarks.logging_overhead --turns 200 --history 200
+"""
+
+import argparse
+import asyncio
+import logging
+import os
+import statistics
+import time
+
+from langchain_core.messages import AIMessage, HumanMessage
+
+from benchmarks.fake_llm import FakeChatModel
+from src.common.logs import configure_logging, shutdown_logging
+from src.graph.agent_graph import AgentGraph
+
+
+def build_history(length: int) -> list:
+    return [
+        (
+            HumanMessage(content=f"Question {i} about campus housing and dining.")
+            if i % 2 == 0
+            else AIMessage(content=f"Answer {i}: " + "details " * 40)
+        )
+        for i in range(length)
+    ]
+
+
+def plain_logging(level: int, devnull):
+    root = logging.getLogger()
+    for handler in root.handlers[:]:
+        root.removeHandler(handler)
+    handler = logging.StreamHandler(devnull)
+    handler.setFormatter(logging.Formatter("%(asctime)s — %(levelname)s — %(message)s"))
+    root.addHandler(handler)
+    root.setLevel(level)
+
+
+async def mean_turn_time(graph: AgentGraph, history: list, turns: int) -> float:
+    timings = []
+    for turn in range(turns):
+        start = time.perf_counter()
+        await graph.invoke(history, f"Question {turn}")
+        timings.append(time.perf_counter() - start)
+    return statistics.fmean(timings)
+
+
+async def main(turns: int, history_length: int, sample_rate: float):
+    graph = AgentGraph(config={"configurable": {}}, llm=FakeChatModel())
+    graph.compile()
+    history = build_history(history_length)
+    results = {}
+    with open(os.devnull, "w") as devnull:
+        setups = {
+            "disabled": lambda: plain_logging(logging.WARNING, devnull),
+            "sync text handler": lambda: plain_logging(logging.INFO, devnull),
+            "queue + JSON": lambda: configure_logging("INFO", stream=devnull),
+            f"queue + JSON, {sample_rate:.0%} sampled": lambda: configure_logging(
+                "INFO", stream=devnull, payload_sample_rate=sample_rate
+            ),
+        }
+        for name, setup in setups.items():
+            setup()
+            await mean_turn_time(graph, history, 5)  # Warm up.
+            results[name] = await mean_turn_time(graph, history, turns)
+            shutdown_logging()
+
+    start = time.perf_counter()
+    for _ in range(turns):
+        f"GRAPH OUTPUT: {history}"
+    eager = (time.perf_counter() - start) / turns
+
+    baseline = results["disabled"]
+    print(f"{'logging':<28} {'turn (ms)':>10} {'overhead (ms)':>14}")
+    for name, turn_time in results.items():
+        print(
+            f"{name:<28} {turn_time * 1000:>10.3f} "
+            f"{(turn_time - baseline) * 1000:>14.3f}"
+        )
+    print(f"Eager f-string of the output: {eager * 1000:.3f} ms per turn")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--turns", type=int, default=200)
+    parser.add_argument("--history", type=int, default=200)
+    parser.add_argument("--sample-rate", type=float, default=0.1)
+    args = parser.parse_args()
+    asyncio.run(main(args.turns, args.history, args.sample_rate))
@@ -0,0 +1,70 @@
+"""
+Per-turn orchestration overhead over a long conversation.
+
+Compares resending the full chat history every turn with a checkpointer-backed
+thread where only the new message is sent. The fake model has no latency, but
+every turn still formats the whole history into the prompt and measures its
+size, so all setups grow with the thread. In the in-memory thread, merging and
+saving the state only costs as much as the new messages; the SQLite thread
+also encodes and decodes the full history at every step, so it grows faster.
+
+Usage:
+    python -m benchmarks.long_session --turns 200 --report-every 50
+"""
+
+import argparse
+import asyncio
+import time
+
+from benchmarks.fake_llm import FakeChatModel
+from src.graph.agent_graph import AgentGraph
+from src.graph.checkpointers import close_checkpointer, create_checkpointer
+
+
+def build_graph(checkpointer=None) -> AgentGraph:
+    graph = AgentGraph(config={"configurable": {}}, llm=FakeChatModel())
+    graph.compile(checkpointer=checkpointer)
+    return graph
+
+
+async def resend_history(turns: int) -> list[float]:
+    graph = build_graph()
+    history, timings = [], []
+    for turn in range(turns):
+        start = time.perf_counter()
+        history, _, _ = await graph.invoke(history, f"Question {turn}")
+        timings.append(time.perf_counter() - start)
+    return timings
+
+
+async def thread_state(turns: int, kind: str) -> list[float]:
+    graph = build_graph(create_checkpointer(kind, ":memory:"))
+    timings = []
+    for turn in range(turns):
+        start = time.perf_counter()
+        await graph.invoke([], f"Question {turn}", thread_id="benchmark")
+        timings.append(time.perf_counter() - start)
+    await close_checkpointer(graph.checkpointer)
+    return timings
+
+
+async def main(turns: int, report_every: int):
+    results = {
+        "resend history": await resend_history(turns),
+        "memory thread": await thread_state(turns, "memory"),
+        "sqlite thread": await thread_state(turns, "sqlite"),
+    }
+    print(f"{'turn':>6}" + "".join(f"{name:>17}" for name in results))
+    for turn in range(report_every - 1, turns, report_every):
+        row = "".join(
+            f"{timings[turn] * 1000:>14.2f} ms" for timings in results.values()
+        )
+        print(f"{turn + 1:>6}{row}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--turns", type=int, default=200)
+    parser.add_argument("--report-every", type=int, default=50)
+    args = parser.parse_args()
+    asyncio.run(main(args.turns, args.report_every))
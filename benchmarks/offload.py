@@ -0,0 +1,150 @@
+"""
+Event-loop lag while tools do CPU-bound work, with and without offloading.
+
+Runs `--conversations` concurrent turns that each call a tool hashing
+`--work` rounds in pure Python, once per execution mode: "async" does the work in
+`_arun` on the event loop, "thread" and "process" run it in the tool executors.
+A monitor task wakes up every `--interval` seconds and records how late it was,
+which is the delay every other conversation in the process would see. Reports
+the lag percentiles and the wall time of all turns.
+
+Threads keep the loop responsive but share the GIL, so pure-Python work is no
+faster; processes also run it in parallel.
+
+Usage:
+    python -m benchmarks.offload --conversations 8 --work 200000
+"""
+
+import argparse
+import asyncio
+import hashlib
+import statistics
+import time
+
+from langchain_core.messages import AIMessage
+from langchain_core.runnables import RunnableConfig
+from pydantic import BaseModel, Field
+
+from benchmarks.fake_llm import FakeChatModel
+from src.graph.agent_graph import AgentGraph
+from src.tools.base import MiMaizeyTool
+from src.tools.executors import close_tool_executors
+from src.tools.schemas import ToolArtifact, ToolSource
+
+
+class DigestInput(BaseModel):
+    rounds: int = Field(description="Number of hashing rounds")
+
+
+def digest(rounds: int) -> tuple[str, ToolArtifact]:
+    value = b"mimaizey"
+    for _ in range(rounds):
+        value = hashlib.sha256(value).digest()
+    return value.hex(), ToolArtifact(sources=[ToolSource(label="Digest")])
+
+
+class AsyncDigestTool(MiMaizeyTool):
+    name: str = "digest_tool"
+    description: str = "Hashes a value many times."
+    args_schema: type[BaseModel] = DigestInput
+
+    async def _arun(self, rounds: int, config: RunnableConfig):
+        return digest(rounds)
+
+
+class ThreadDigestTool(MiMaizeyTool):
+    name: str = "digest_tool"
+    description: str = "Hashes a value many times."
+    args_schema: type[BaseModel] = DigestInput
+    execution_mode = "thread"
+
+    def _run(self, rounds: int, config: RunnableConfig):
+        return digest(rounds)
+
+
+class ProcessDigestTool(MiMaizeyTool):
+    name: str = "digest_tool"
+    description: str = "Hashes a value many times."
+    args_schema: type[BaseModel] = DigestInput
+    execution_mode = "process"
+
+    def _run(self, rounds: int, config: RunnableConfig):
+        return digest(rounds)
+
+
+async def monitor_lag(interval: float, lags: list[float], stop: asyncio.Event):
+    while not stop.is_set():
+        start = time.perf_counter()
+        await asyncio.sleep(interval)
+        lags.append(time.perf_counter() - start - interval)
+
+
+async def run_mode(
+    tool: MiMaizeyTool, conversations: int, work: int, interval: float
+) -> dict[str, float]:
+    script = [
+        AIMessage(
+            content="",
+            tool_calls=[{"name": "digest_tool", "args": {"rounds": work}, "id": "1"}],
+        ),
+        AIMessage(content="Done."),
+    ]
+    graph = AgentGraph(
+        tools=[tool], config={"configurable": {}}, llm=FakeChatModel(script=script)
+    )
+    graph.compile()
+    # Warm up the pools, so process start-up is not measured.
+    await graph.invoke(chat_history=[], message="Warm up")
+
+    lags: list[float] = []
+    stop = asyncio.Event()
+    monitor = asyncio.create_task(monitor_lag(interval, lags, stop))
+    start = time.perf_counter()
+    await asyncio.gather(
+        *(
+            graph.invoke(chat_history=[], message=f"Digest {i}")
+            for i in range(conversations)
+        )
+    )
+    wall = time.perf_counter() - start
+    stop.set()
+    await monitor
+    percentiles = (
+        statistics.quantiles(lags, n=100, method="inclusive")
+        if len(lags) > 1
+        else lags * 99
+    )
+    return {
+        "p50": percentiles[49],
+        "p99": percentiles[98],
+        "max": max(lags),
+        "wall": wall,
+    }
+
+
+async def main(conversations: int, work: int, interval: float):
+    tools = {
+        "async": AsyncDigestTool(),
+        "thread": ThreadDigestTool(),
+        "process": ProcessDigestTool(),
+    }
+    print(
+        f"{'mode':<8} {'lag p50 (ms)':>13} {'lag p99 (ms)':>13} "
+        f"{'lag max (ms)':>13} {'wall (s)':>9}"
+    )
+    for mode, tool in tools.items():
+        result = await run_mode(tool, conversations, work, interval)
+        print(
+            f"{mode:<8} {result['p50'] * 1000:>13.1f} {result['p99'] * 1000:>13.1f} "
+            f"{result['max'] * 1000:>13.1f} {result['wall']:>9.2f}"
+        )
+    await close_tool_executors()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--conversations", type=int, default=8)
+    parser.add_argument("--work", type=int, default=200000)
+    parser.add_argument("--interval", type=float, default=0.005)
+    args = parser.parse_args()
+    asyncio.run(main(args.conversations, args.work, args.interval))
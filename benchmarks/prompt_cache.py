@@ -0,0 +1,108 @@
+"""
+Prompt-cache hit rate of the prompt assembly over multi-turn conversations.
+
+The fake model simulates a provider prompt cache: the input tokens of the
+longest message prefix it has seen before are reported as cached. Compares the
+previous assembly, with the current time inside the system prompt, to the
+current one, where the system prompt is static and the time follows the
+conversation. Both read a clock that advances on every LLM call, as a real
+clock does between requests. Reports the share of input tokens served from the
+cache according to the turn metrics.
+
+Usage:
+    python -m benchmarks.prompt_cache --threads 5 --turns 10
+"""
+
+import argparse
+import asyncio
+import itertools
+
+from langchain_core.messages import AIMessage
+from langchain_core.prompts import ChatPromptTemplate, MessagesPlaceholder
+from langchain_core.runnables import RunnableConfig
+from pydantic import BaseModel, Field
+
+from benchmarks.fake_llm import FakeChatModel
+from src.graph.agent_graph import AgentGraph
+from src.graph.checkpointers import create_checkpointer
+from src.graph.metrics import InMemoryMetricsSink
+from src.graph.prompts import SYSPROMPT
+from src.tools.base import MiMaizeyTool
+from src.tools.schemas import ToolArtifact, ToolSource
+
+SCRIPT = [
+    AIMessage(
+        content="",
+        tool_calls=[
+            {"name": "dining_menu_tool", "args": {"hall": "South Quad"}, "id": "1"}
+        ],
+    ),
+    AIMessage(content="South Quad serves pasta, salads and a taco bar tonight."),
+]
+
+
+class MenuInput(BaseModel):
+    hall: str = Field(description="Name of the dining hall")
+
+
+class DiningMenuTool(MiMaizeyTool):
+    name: str = "dining_menu_tool"
+    description: str = "Returns today's menu of a dining hall."
+    args_schema: type[BaseModel] = MenuInput
+
+    async def _arun(self, hall: str, config: RunnableConfig):
+        return f"{hall}: pasta, salads, taco bar", ToolArtifact(
+            sources=[ToolSource(label=hall)]
+        )
+
+
+def legacy_prompt(clock: itertools.count) -> ChatPromptTemplate:
+    """The time in the system prompt, ahead of the conversation."""
+    return ChatPromptTemplate.from_messages(
+        [
+            ("system", SYSPROMPT + "Current time: {time}.\n"),
+            MessagesPlaceholder(variable_name="messages"),
+        ]
+    ).partial(time=lambda: f"request {next(clock)}")
+
+
+async def cached_ratio(legacy: bool, threads: int, turns: int) -> tuple[int, int]:
+    sink = InMemoryMetricsSink()
+    graph = AgentGraph(
+        tools=[DiningMenuTool()],
+        config={"configurable": {}},
+        llm=FakeChatModel(script=SCRIPT, prompt_cache=True),
+        metrics_sink=sink,
+    )
+    clock = itertools.count()
+    if legacy:
+        graph.primary_prompt = legacy_prompt(clock)
+    else:
+        graph.primary_prompt = graph.primary_prompt.partial(
+            time=lambda: f"request {next(clock)}"
+        )
+    graph.invalidate_tools()
+    graph.compile(checkpointer=create_checkpointer("memory"))
+    for turn in range(turns):
+        for thread in range(threads):
+            await graph.invoke(
+                [], f"What is for dinner today? ({turn})", thread_id=f"thread-{thread}"
+            )
+    cached = sum(turn.cached_input_tokens for turn in sink.turns)
+    total = sum(turn.input_tokens for turn in sink.turns)
+    return cached, total
+
+
+async def main(threads: int, turns: int):
+    print(f"{'assembly':<24} {'input tokens':>13} {'cached':>9} {'ratio':>7}")
+    for name, legacy in (("time in system prompt", True), ("static prefix", False)):
+        cached, total = await cached_ratio(legacy, threads, turns)
+        print(f"{name:<24} {total:>13,} {cached:>9,} {cached / total:>7.1%}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--threads", type=int, default=5)
+    parser.add_argument("--turns", type=int, default=10)
+    args = parser.parse_args()
+    asyncio.run(main(args.threads, args.turns))
@@ -0,0 +1,392 @@
+"""
+Offline replay of a conversation corpus through AgentGraph.
+
+Each line of the corpus is a recorded conversation: its runtime config and, for
+every turn, the human message and the assistant steps that answered it, with
+the tool calls they made, the tools' outputs and the recorded latencies. The
+replay substitutes ReplayChatModel, which answers every call with the recorded
+step, and RecordedTool stubs, which return the recorded outputs (or a stub
+output when none was recorded), so no Azure deployment or external service is
+needed.
+
+Conversations run concurrently, their turns in order on a checkpointer-backed
+thread. The report has throughput, turn latency percentiles, the per-node
+breakdown of the turn metrics and memory use. Save a run with --save and pass
+it as --baseline to a later run to fail on regressions.
+
+Corpus line format:
+
+    {"id": "hours", "config": {"campus": "Ann Arbor"}, "turns": [
+        {"message": "When does the library open?", "steps": [
+            {"tool_calls": [{"name": "building_hours_tool",
+                             "args": {"building": "library"},
+                             "output": "8am to 2am", "latency": 0.12}],
+             "latency": 0.8},
+            {"content": "The library opens at 8am.", "latency": 1.1}]}]}
+
+Usage:
+    python -m benchmarks.replay --corpus benchmarks/replay_corpus.jsonl \\
+        --repeat 50 --concurrency 20 --save run.json
+    python -m benchmarks.replay --repeat 50 --concurrency 20 --baseline run.json
+"""
+
+import argparse
+import asyncio
+import json
+import resource
+import statistics
+import sys
+import time
+import tracemalloc
+from collections import defaultdict
+from pathlib import Path
+from typing import Any, Optional
+
+from langchain_core.messages import AIMessage, BaseMessage
+from langchain_core.runnables import RunnableConfig
+from pydantic import BaseModel
+
+from benchmarks.fake_llm import FakeChatModel
+from src.graph.agent_graph import AgentGraph
+from src.graph.checkpointers import create_checkpointer
+from src.graph.metrics import InMemoryMetricsSink
+from src.tools.base import MiMaizeyTool
+from src.tools.schemas import ToolArtifact, ToolSource
+
+DEFAULT_CORPUS = Path(__file__).with_name("replay_corpus.jsonl")
+
+# Configurable keys identifying the recorded turn a graph call replays.
+CONVERSATION_KEY = "replay_conversation"
+TURN_KEY = "replay_turn"
+
+# Relative changes beyond the threshold that count as regressions.
+LOWER_IS_BETTER = ("p50", "p95", "p99", "peak_memory_mb")
+HIGHER_IS_BETTER = ("throughput",)
+
+
+class RecordedToolCall(BaseModel):
+    """
+    A tool call of a recorded assistant step, with the tool's output
+    """
+
+    name: str
+    args: dict[str, Any] = {}
+    output: Optional[str] = None  # None replays a stub output.
+    latency: float = 0.0
+
+
+class RecordedStep(BaseModel):
+    """
+    A recorded assistant response: final content or tool calls
+    """
+
+    content: str = ""
+    tool_calls: list[RecordedToolCall] = []
+    latency: Optional[float] = None  # None uses the model's default latency.
+
+
+class RecordedTurn(BaseModel):
+    """
+    A human message and the assistant steps that answered it
+    """
+
+    message: str
+    steps: list[RecordedStep]
+
+
+class Conversation(BaseModel):
+    """
+    A recorded conversation, one line of a replay corpus
+    """
+
+    id: str
+    config: dict[str, Any] = {}
+    turns: list[RecordedTurn]
+
+
+def read_corpus(path: Path) -> list[Conversation]:
+    with path.open() as corpus:
+        return [
+            Conversation.model_validate_json(line) for line in corpus if line.strip()
+        ]
+
+
+def recorded_steps(conversations: list[Conversation]) -> dict[tuple, list]:
+    """Maps (conversation id, turn index) to the turn's recorded steps."""
+    return {
+        (conversation.id, index): turn.steps
+        for conversation in conversations
+        for index, turn in enumerate(conversation.turns)
+    }
+
+
+class ReplayChatModel(FakeChatModel):
+    """
+    FakeChatModel answering every call with the recorded step of the turn it
+    belongs to. The turn is identified by the replay keys of the runtime config,
+    which LangChain passes on to the model as run metadata.
+    """
+
+    steps: dict[tuple, list[RecordedStep]]
+    latency_scale: float = 1.0
+
+    def _scripted_message(
+        self, messages: list[BaseMessage], run_manager: Optional[Any] = None
+    ) -> tuple[AIMessage, float]:
+        metadata = run_manager.metadata if run_manager else {}
+        key = (metadata.get(CONVERSATION_KEY), metadata.get(TURN_KEY))
+        if key not in self.steps:
+            raise KeyError(f"No recorded turn for {key}")
+        steps = self.steps[key]
+        step = steps[min(self._step(messages), len(steps) - 1)]
+        message = AIMessage(
+            content=step.content,
+            tool_calls=[
+                {"name": call.name, "args": call.args, "id": ""}
+                for call in step.tool_calls
+            ],
+        )
+        latency = self.latency if step.latency is None else step.latency
+        return message, latency * self.latency_scale
+
+
+class RecordedTool(
+    MiMaizeyTool, name="recorded_tool", description="Replays recorded outputs."
+):
+    """
+    Stand-in for a tool of the corpus. A call returns the output recorded for
+    the same tool and arguments in the turn being replayed, after the recorded
+    latency; calls without a recording get a stub output.
+    """
+
+    args_schema: dict[str, Any] = {"type": "object", "properties": {}}
+    recordings: dict[tuple, list[RecordedToolCall]] = {}
+    latency_scale: float = 1.0
+
+    async def _arun(self, config: RunnableConfig, **kwargs: Any):
+        configurable = config.get("configurable", {})
+        key = (configurable.get(CONVERSATION_KEY), configurable.get(TURN_KEY))
+        recorded = next(
+            (call for call in self.recordings.get(key, []) if call.args == kwargs),
+            None,
+        )
+        if recorded is not None:
+            await asyncio.sleep(recorded.latency * self.latency_scale)
+        if recorded is None or recorded.output is None:
+            output = f"Stub output of {self.name} for {json.dumps(kwargs)}"
+        else:
+            output = recorded.output
+        return output, ToolArtifact(sources=[ToolSource(label=self.name)])
+
+
+def recorded_tools(
+    conversations: list[Conversation], latency_scale: float
+) -> list[RecordedTool]:
+    """Creates a RecordedTool for every tool name in the corpus."""
+    recordings: dict[str, dict[tuple, list]] = defaultdict(lambda: defaultdict(list))
+    arguments: dict[str, set[str]] = defaultdict(set)
+    for conversation in conversations:
+        for index, turn in enumerate(conversation.turns):
+            for step in turn.steps:
+                for call in step.tool_calls:
+                    recordings[call.name][(conversation.id, index)].append(call)
+                    arguments[call.name].update(call.args)
+    return [
+        RecordedTool(
+            name=name,
+            description=f"Recorded outputs of {name}.",
+            # A JSON schema is passed through without validation, so the tool
+            # receives the arguments exactly as recorded.
+            args_schema={
+                "type": "object",
+                "properties": {arg: {} for arg in sorted(arguments[name])},
+            },
+            recordings=dict(calls),
+            latency_scale=latency_scale,
+        )
+        for name, calls in sorted(recordings.items())
+    ]
+
+
+def build_graph(
+    conversations: list[Conversation],
+    llm_latency: float,
+    latency_scale: float,
+    parallel_tool_calls: bool,
+) -> tuple[AgentGraph, InMemoryMetricsSink]:
+    sink = InMemoryMetricsSink(maxlen=sys.maxsize)
+    graph = AgentGraph(
+        tools=recorded_tools(conversations, latency_scale),
+        config={"configurable": {}},
+        llm=ReplayChatModel(
+            steps=recorded_steps(conversations),
+            latency=llm_latency,
+            latency_scale=latency_scale,
+        ),
+        parallel_tool_calls=parallel_tool_calls,
+        metrics_sink=sink,
+    )
+    graph.compile(checkpointer=create_checkpointer("memory"))
+    return graph, sink
+
+
+async def replay_conversation(
+    graph: AgentGraph, conversation: Conversation, thread_id: str
+) -> list[float]:
+    latencies = []
+    for index, turn in enumerate(conversation.turns):
+        runtime_config = {
+            **conversation.config,
+            CONVERSATION_KEY: conversation.id,
+            TURN_KEY: index,
+        }
+        start = time.perf_counter()
+        await graph.invoke(
+            chat_history=[],
+            message=turn.message,
+            runtime_config=runtime_config,
+            thread_id=thread_id,
+        )
+        latencies.append(time.perf_counter() - start)
+    return latencies
+
+
+def percentiles(values: list[float]) -> dict[str, float]:
+    if len(values) < 2:
+        value = values[0] if values else 0.0
+        return {"p50": value, "p95": value, "p99": value}
+    quantiles = statistics.quantiles(values, n=100)
+    return {"p50": quantiles[49], "p95": quantiles[94], "p99": quantiles[98]}
+
+
+def node_breakdown(sink: InMemoryMetricsSink) -> dict[str, dict[str, float]]:
+    """Call count, mean and p95 wall time and mean queue time of every node."""
+    wall_times, queue_times = defaultdict(list), defaultdict(list)
+    for turn in sink.turns:
+        for node in turn.nodes:
+            wall_times[node.node].append(node.wall_time)
+            queue_times[node.node].append(node.queue_time)
+    return {
+        node: {
+            "calls": len(times),
+            "mean": statistics.fmean(times),
+            "p95": percentiles(times)["p95"],
+            "queue": statistics.fmean(queue_times[node]),
+        }
+        for node, times in sorted(wall_times.items())
+    }
+
+
+async def replay(args: argparse.Namespace) -> dict[str, Any]:
+    conversations = read_corpus(args.corpus)
+    graph, sink = build_graph(
+        conversations, args.llm_latency, args.latency_scale, args.parallel_tool_calls
+    )
+    semaphore = asyncio.Semaphore(args.concurrency)
+
+    async def run(conversation: Conversation, copy: int) -> list[float]:
+        async with semaphore:
+            return await replay_conversation(
+                graph, conversation, f"{conversation.id}#{copy}"
+            )
+
+    if args.trace_memory:
+        tracemalloc.start()
+    start = time.perf_counter()
+    results = await asyncio.gather(
+        *(
+            run(conversation, copy)
+            for copy in range(args.repeat)
+            for conversation in conversations
+        )
+    )
+    elapsed = time.perf_counter() - start
+    if args.trace_memory:
+        peak_memory = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+    else:
+        # ru_maxrss is in kilobytes on Linux.
+        peak_memory = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+
+    latencies = [latency for result in results for latency in result]
+    overheads = [turn.wall_time - turn.node_time for turn in sink.turns]
+    return {
+        "turns": len(latencies),
+        "elapsed": elapsed,
+        "throughput": len(latencies) / elapsed,
+        **percentiles(latencies),
+        "overhead_p95": percentiles(overheads)["p95"],
+        "peak_memory_mb": peak_memory / 2**20,
+        "nodes": node_breakdown(sink),
+    }
+
+
+def print_report(report: dict[str, Any], trace_memory: bool):
+    print(f"turns:       {report['turns']} in {report['elapsed']:.2f}s")
+    print(f"throughput:  {report['throughput']:.1f} turns/s")
+    print(
+        f"latency:     p50 {report['p50'] * 1000:.1f}ms  "
+        f"p95 {report['p95'] * 1000:.1f}ms  p99 {report['p99'] * 1000:.1f}ms"
+    )
+    print(f"overhead:    p95 {report['overhead_p95'] * 1000:.2f}ms outside nodes")
+    memory = "traced peak" if trace_memory else "peak RSS"
+    print(f"memory:      {report['peak_memory_mb']:.1f}MB {memory}")
+    print(
+        f"\n{'node':<28} {'calls':>7} {'mean (ms)':>10} {'p95 (ms)':>9} {'queue (ms)':>11}"
+    )
+    for node, stats in report["nodes"].items():
+        print(
+            f"{node:<28} {stats['calls']:>7} {stats['mean'] * 1000:>10.2f} "
+            f"{stats['p95'] * 1000:>9.2f} {stats['queue'] * 1000:>11.3f}"
+        )
+
+
+def compare(report: dict[str, Any], baseline: dict[str, Any], threshold: float) -> bool:
+    """Prints the change of every metric against a baseline; True on regression."""
+    regressed = False
+    print(f"\n{'metric':<16} {'baseline':>10} {'current':>10} {'change':>8}")
+    for metric in (*HIGHER_IS_BETTER, *LOWER_IS_BETTER):
+        before, after = baseline[metric], report[metric]
+        change = (after - before) / before if before else 0.0
+        worse = -change if metric in HIGHER_IS_BETTER else change
+        flag = ""
+        if worse > threshold:
+            regressed = True
+            flag = "  REGRESSION"
+        print(f"{metric:<16} {before:>10.4f} {after:>10.4f} {change:>+8.1%}{flag}")
+    return regressed
+
+
+def main(args: argparse.Namespace):
+    report = asyncio.run(replay(args))
+    print_report(report, args.trace_memory)
+    if args.save:
+        args.save.write_text(json.dumps(report, indent=2) + "\n")
+    if args.baseline:
+        baseline = json.loads(args.baseline.read_text())
+        if compare(report, baseline, args.threshold):
+            raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+    parser.add_argument("--corpus", type=Path, default=DEFAULT_CORPUS)
+    parser.add_argument("--repeat", type=int, default=20, help="Copies of the corpus")
+    parser.add_argument("--concurrency", type=int, default=20)
+    parser.add_argument(
+        "--llm-latency", type=float, default=0.05, help="Latency of unrecorded steps"
+    )
+    parser.add_argument(
+        "--latency-scale",
+        type=float,
+        default=1.0,
+        help="Factor applied to every latency; 0 measures orchestration alone",
+    )
+    parser.add_argument("--parallel-tool-calls", action="store_true")
+    parser.add_argument("--trace-memory", action="store_true")
+    parser.add_argument("--save", type=Path, help="Write the report as JSON")
+    parser.add_argument("--baseline", type=Path, help="Report to compare with")
+    parser.add_argument("--threshold", type=float, default=0.1)
+    main(parser.parse_args())
@@ -0,0 +1,73 @@
+"""
+Routing benchmark for LLMRouter.
+
+Runs concurrent AgentGraph invocations against several fake deployments, one
+of which is throttled (every call fails with a 429), and reports how requests
+were spread across the deployments and how many turns still succeeded.
+
+Usage:
+    python -m benchmarks.router --requests 200 --strategy least_outstanding
+"""
+
+import argparse
+import asyncio
+import time
+
+from benchmarks.fake_llm import FakeChatModel
+from src.graph.agent_graph import AgentGraph
+from src.graph.router import Deployment, LLMRouter
+
+
+def build_router(latency: float, strategy: str) -> LLMRouter:
+    return LLMRouter(
+        [
+            Deployment(name="east", weight=2, llm=FakeChatModel(latency=latency)),
+            Deployment(name="west", llm=FakeChatModel(latency=latency * 2)),
+            Deployment(
+                name="throttled",
+                llm=FakeChatModel(latency=latency, failure_rate=1.0),
+            ),
+        ],
+        strategy=strategy,
+    )
+
+
+async def main(requests: int, concurrency: int, latency: float, strategy: str):
+    router = build_router(latency, strategy)
+    graph = AgentGraph(config={"configurable": {}}, llm=router)
+    graph.compile()
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def turn(i: int) -> bool:
+        async with semaphore:
+            messages, _, _ = await graph.invoke([], f"Question {i}")
+            return "retries" in messages[-1].response_metadata and not (
+                messages[-1].response_metadata.get("error")
+            )
+
+    start = time.perf_counter()
+    results = await asyncio.gather(*(turn(i) for i in range(requests)))
+    elapsed = time.perf_counter() - start
+
+    print(f"strategy:   {strategy}")
+    print(f"turns:      {requests} in {elapsed:.2f}s, {sum(results)} succeeded")
+    for name, stats in router.stats().items():
+        latency_ms = f"{stats['latency'] * 1000:.0f}ms" if stats["latency"] else "-"
+        print(
+            f"{name:<10}  successes {stats['successes']:>4}  "
+            f"failures {stats['failures']:>3}  latency {latency_ms}"
+        )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--requests", type=int, default=200)
+    parser.add_argument("--concurrency", type=int, default=20)
+    parser.add_argument("--latency", type=float, default=0.05)
+    parser.add_argument(
+        "--strategy",
+        choices=["least_outstanding", "weighted"],
+        default="least_outstanding",
+    )
+    args = parser.parse_args()
+    asyncio.run(main(args.requests, args.concurrency, args.latency, args.strategy))
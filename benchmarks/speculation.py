@@ -0,0 +1,108 @@
+"""
+Turn latency with and without speculative tool calls.
+
+The fake model streams a response with `--calls` tool calls, spreading its
+latency over the chunks, so each call's arguments are complete before the whole
+response is. With speculation, the side-effect-free tool starts as soon as a
+call's arguments parse. Reports the mean turn time of both modes and the time
+saved according to the turn metrics.
+
+Usage:
+    python -m benchmarks.speculation --calls 3 --llm-latency 1.0 --tool-latency 0.5
+"""
+
+import argparse
+import asyncio
+import statistics
+import time
+
+from langchain_core.messages import AIMessage
+from langchain_core.runnables import RunnableConfig
+from pydantic import BaseModel, Field
+
+from benchmarks.fake_llm import FakeChatModel
+from src.graph.agent_graph import AgentGraph
+from src.graph.metrics import InMemoryMetricsSink
+from src.tools.base import MiMaizeyTool
+from src.tools.schemas import ToolArtifact, ToolSource
+
+
+class LookupInput(BaseModel):
+    building: str = Field(description="Name of the building")
+
+
+class BuildingHoursTool(MiMaizeyTool):
+    name: str = "building_hours_tool"
+    description: str = "Looks up the opening hours of a campus building."
+    args_schema: type[BaseModel] = LookupInput
+    side_effect_free = True
+    latency: float = 0.5
+
+    async def _arun(self, building: str, config: RunnableConfig):
+        await asyncio.sleep(self.latency)
+        return f"{building}: 8am to 10pm", ToolArtifact(
+            sources=[ToolSource(label=building)]
+        )
+
+
+def build_graph(
+    calls: int, llm_latency: float, tool_latency: float, speculative: bool
+) -> tuple[AgentGraph, InMemoryMetricsSink]:
+    script = [
+        AIMessage(
+            content="",
+            tool_calls=[
+                {
+                    "name": "building_hours_tool",
+                    "args": {"building": f"Building {i}"},
+                    "id": str(i),
+                }
+                for i in range(calls)
+            ],
+        ),
+        AIMessage(content="Here are the opening hours."),
+    ]
+    sink = InMemoryMetricsSink()
+    graph = AgentGraph(
+        tools=[BuildingHoursTool(latency=tool_latency)],
+        config={"configurable": {}},
+        llm=FakeChatModel(script=script, latency=llm_latency),
+        parallel_tool_calls=True,
+        metrics_sink=sink,
+        speculative_tool_calls=speculative,
+    )
+    graph.compile()
+    return graph, sink
+
+
+async def mean_turn_time(graph: AgentGraph, turns: int) -> float:
+    timings = []
+    for turn in range(turns):
+        start = time.perf_counter()
+        await graph.invoke(
+            chat_history=[], message=f"When are the buildings open? {turn}"
+        )
+        timings.append(time.perf_counter() - start)
+    return statistics.fmean(timings)
+
+
+async def main(calls: int, llm_latency: float, tool_latency: float, turns: int):
+    results = {}
+    for speculative in (False, True):
+        graph, sink = build_graph(calls, llm_latency, tool_latency, speculative)
+        turn_time = await mean_turn_time(graph, turns)
+        saved = statistics.fmean(turn.speculative_time_saved for turn in sink.turns)
+        results["speculative" if speculative else "sequential"] = (turn_time, saved)
+    print(f"{'mode':<12} {'turn (s)':>9} {'saved per turn (s)':>19}")
+    for mode, (turn_time, saved) in results.items():
+        print(f"{mode:<12} {turn_time:>9.3f} {saved:>19.3f}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--calls", type=int, default=3)
+    parser.add_argument("--llm-latency", type=float, default=1.0)
+    parser.add_argument("--tool-latency", type=float, default=0.5)
+    parser.add_argument("--turns", type=int, default=5)
+    args = parser.parse_args()
+    asyncio.run(main(args.calls, args.llm_latency, args.tool_latency, args.turns))
@@ -0,0 +1,135 @@
+"""
+Buffered versus streaming tool results for a tool paging through large results.
+
+Both tools fetch `pages` pages of `page_size` bytes, each after `latency`
+seconds. The buffered tool returns everything from `_arun`; the streaming tool
+yields every page from `_astream`, once uncapped and once with
+`max_output_bytes`. Reports,
+for one graph turn each, the time until the tool's first output reaches the
+event stream, the tool's wall time, the bytes handed to the model and the peak
+memory traced during the turn.
+
+Usage:
+    python -m benchmarks.streaming_tools --pages 50 --page-size 65536 --cap 262144
+"""
+
+import argparse
+import asyncio
+import time
+import tracemalloc
+from typing import AsyncIterator
+
+from langchain_core.messages import AIMessage
+from langchain_core.runnables import RunnableConfig
+from pydantic import BaseModel, Field
+
+from benchmarks.fake_llm import FakeChatModel
+from src.graph.agent_graph import AgentGraph
+from src.tools.base import MiMaizeyTool
+from src.tools.schemas import ToolArtifact, ToolChunk, ToolSource
+
+
+class SearchInput(BaseModel):
+    query: str = Field(description="What to search for")
+
+
+class PagedSearch(BaseModel):
+    pages: int
+    page_size: int
+    latency: float
+
+    async def fetch(self, page: int) -> str:
+        await asyncio.sleep(self.latency)
+        return f"Result page {page}: ".ljust(self.page_size, "x")
+
+
+class BufferedSearchTool(MiMaizeyTool):
+    name: str = "search_tool"
+    description: str = "Searches the document index."
+    args_schema: type[BaseModel] = SearchInput
+    search: PagedSearch
+
+    async def _arun(self, query: str, config: RunnableConfig):
+        pages = [await self.search.fetch(page) for page in range(self.search.pages)]
+        return "".join(pages), ToolArtifact(sources=[ToolSource(label=self.name)])
+
+
+class StreamingSearchTool(MiMaizeyTool):
+    name: str = "search_tool"
+    description: str = "Searches the document index."
+    args_schema: type[BaseModel] = SearchInput
+    search: PagedSearch
+
+    async def _astream(
+        self, config: RunnableConfig, query: str
+    ) -> AsyncIterator[ToolChunk]:
+        for page in range(self.search.pages):
+            yield ToolChunk(
+                content=await self.search.fetch(page),
+                sources=[ToolSource(label=self.name)],
+            )
+
+
+SCRIPT = [
+    AIMessage(
+        content="",
+        tool_calls=[{"name": "search_tool", "args": {"query": "housing"}, "id": "1"}],
+    ),
+    AIMessage(content="Here is what I found."),
+]
+
+
+async def run_turn(tool: MiMaizeyTool) -> dict[str, float]:
+    graph = AgentGraph(
+        tools=[tool], config={"configurable": {}}, llm=FakeChatModel(script=SCRIPT)
+    )
+    graph.compile()
+    first_output = duration = None
+    tracemalloc.start()
+    start = time.perf_counter()
+    async for event in graph.stream(chat_history=[], message="Find housing pages"):
+        if event.type in ("tool_progress", "tool_end") and first_output is None:
+            first_output = time.perf_counter() - start
+        if event.type == "tool_end":
+            duration = event.duration
+        elif event.type == "final":
+            output_bytes = len(event.messages[-2].content.encode())
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return {
+        "first": first_output,
+        "duration": duration,
+        "bytes": output_bytes,
+        "peak": peak,
+    }
+
+
+async def main(pages: int, page_size: int, latency: float, cap: int):
+    search = PagedSearch(pages=pages, page_size=page_size, latency=latency)
+    results = {
+        "buffered": await run_turn(BufferedSearchTool(search=search)),
+        "streaming": await run_turn(StreamingSearchTool(search=search)),
+        "streaming + cap": await run_turn(
+            StreamingSearchTool(search=search, max_output_bytes=cap)
+        ),
+    }
+    print(
+        f"{'tool':<16} {'first output (ms)':>18} {'tool time (ms)':>15} "
+        f"{'bytes to model':>15} {'peak memory (MB)':>17}"
+    )
+    for name, result in results.items():
+        print(
+            f"{name:<16} {result['first'] * 1000:>18.1f} "
+            f"{result['duration'] * 1000:>15.1f} {result['bytes']:>15,} "
+            f"{result['peak'] / 2**20:>17.1f}"
+        )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--pages", type=int, default=50)
+    parser.add_argument("--page-size", type=int, default=65536)
+    parser.add_argument("--latency", type=float, default=0.01)
+    parser.add_argument("--cap", type=int, default=262144, help="max_output_bytes")
+    args = parser.parse_args()
+    asyncio.run(main(args.pages, args.page_size, args.latency, args.cap))
@@ -0,0 +1,52 @@
+from typing import Any
+
+from langchain_core.runnables import RunnableConfig
+from pydantic import Field, create_model
+
+from src.tools.base import MiMaizeyTool
+from src.tools.schemas import ToolArtifact, ToolSource
+
+TOPICS = [
+    "course catalog",
+    "building hours",
+    "dining menus",
+    "bus routes",
+    "library holdings",
+    "parking permits",
+    "campus events",
+    "faculty directory",
+    "financial aid",
+    "housing assignments",
+]
+
+
+class SyntheticTool(
+    MiMaizeyTool, name="synthetic_tool", description="Synthetic benchmark tool."
+):
+    """Echo tool with a generated schema, used to build large tool catalogs."""
+
+    async def _arun(self, config: RunnableConfig, **kwargs: Any):
+        return str(kwargs), ToolArtifact(
+            sources=[ToolSource(label=self.name)], metadata={"args": kwargs}
+        )
+
+
+def make_synthetic_tools(count: int) -> list[SyntheticTool]:
+    """Creates `count` tools with distinct names, descriptions and argument schemas."""
+    tools = []
+    for index in range(count):
+        topic = TOPICS[index % len(TOPICS)]
+        schema = create_model(
+            f"SyntheticToolInput{index}",
+            query=(str, Field(description=f"What to look up in the {topic}")),
+            campus=(str, Field(default="Ann Arbor", description="Campus name")),
+            limit=(int, Field(default=10, description="Maximum number of results")),
+        )
+        tools.append(
+            SyntheticTool(
+                name=f"{topic.replace(' ', '_')}_tool_{index}",
+                description=f"Use this tool to look up {topic} (variant {index}).",
+                args_schema=schema,
+            )
+        )
+    return tools
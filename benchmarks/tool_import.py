@@ -0,0 +1,115 @@
+"""
+Cold-start benchmark of eager versus manifest-based (lazy) tool loading.
+
+Generates a synthetic tool package with one module per tool, each paying a
+simulated import cost for its client libraries, and measures in fresh
+interpreters how long it takes to load the tools and build an AgentGraph:
+eagerly with load_tools_from_directory, and lazily from the package's manifest.
+
+Usage:
+    python -m benchmarks.tool_import --counts 100 300 --import-cost 0.002
+"""
+
+import argparse
+import os
+import subprocess
+import sys
+import tempfile
+from pathlib import Path
+
+from benchmarks.synthetic_tools import TOPICS
+
+MODULE_TEMPLATE = """import time
+
+from langchain_core.runnables import RunnableConfig
+from pydantic import BaseModel, Field
+
+from src.tools.base import MiMaizeyTool
+from src.tools.schemas import ToolArtifact, ToolSource
+
+time.sleep({import_cost})  # Stands in for importing heavy client libraries.
+
+
+class LookupInput{index}(BaseModel):
+    query: str = Field(description="What to look up in the {topic}")
+
+
+class LookupTool{index}(MiMaizeyTool):
+    name: str = "{name}"
+    description: str = "Use this tool to look up {topic} (variant {index})."
+    args_schema: type[BaseModel] = LookupInput{index}
+
+    async def _arun(self, query: str, config: RunnableConfig):
+        return query, ToolArtifact(sources=[ToolSource(label=self.name)])
+"""
+
+STARTUP_SCRIPT = """
+import time
+start = time.perf_counter()
+from benchmarks.fake_llm import FakeChatModel
+from src.graph.agent_graph import AgentGraph
+from src.graph.create_graph import {loader}
+tools = {loader}("{package}")
+AgentGraph(tools=tools, config={{"configurable": {{}}}}, llm=FakeChatModel())
+print(time.perf_counter() - start)
+"""
+
+
+def write_package(root: Path, package: str, count: int, import_cost: float):
+    directory = root / package
+    directory.mkdir()
+    (directory / "__init__.py").write_text("")
+    for index in range(count):
+        topic = TOPICS[index % len(TOPICS)]
+        (directory / f"tool_{index}.py").write_text(
+            MODULE_TEMPLATE.format(
+                index=index,
+                topic=topic,
+                name=f"{topic.replace(' ', '_')}_tool_{index}",
+                import_cost=import_cost,
+            )
+        )
+
+
+def startup_time(root: Path, package: str, loader: str) -> float:
+    env = {
+        **os.environ,
+        "PYTHONPATH": os.pathsep.join([os.getcwd(), str(root)]),
+    }
+    output = subprocess.run(
+        [sys.executable, "-c", STARTUP_SCRIPT.format(loader=loader, package=package)],
+        env=env,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    return float(output.stdout.strip().splitlines()[-1])
+
+
+def main(counts: list[int], import_cost: float, repeat: int):
+    print(f"{'tools':>6} {'eager (s)':>10} {'manifest (s)':>13} {'speedup':>8}")
+    for count in counts:
+        with tempfile.TemporaryDirectory() as tmp:
+            root = Path(tmp)
+            package = f"synthetic_tools_{count}"
+            write_package(root, package, count, import_cost)
+            # The first manifest-based start generates the manifest.
+            startup_time(root, package, "load_tools_from_manifest")
+            eager = min(
+                startup_time(root, package, "load_tools_from_directory")
+                for _ in range(repeat)
+            )
+            lazy = min(
+                startup_time(root, package, "load_tools_from_manifest")
+                for _ in range(repeat)
+            )
+        print(f"{count:>6} {eager:>10.3f} {lazy:>13.3f} {eager / lazy:>7.1f}x")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--counts", type=int, nargs="+", default=[100, 300])
+    parser.add_argument("--import-cost", type=float, default=0.002)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+    main(args.counts, args.import_cost, args.repeat)
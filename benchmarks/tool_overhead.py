@@ -0,0 +1,58 @@
+"""
+Micro-benchmark of the per-turn tool setup overhead as a function of tool count.
+
+Compares rebuilding the tools map, the bound LLM and the ToolNode on every turn
+with reusing the bindings AgentGraph caches at construction time.
+
+Usage:
+    python -m benchmarks.tool_overhead --counts 1 10 50 100 200
+"""
+
+import argparse
+import timeit
+
+from langchain_openai import AzureChatOpenAI
+from langgraph.prebuilt import ToolNode
+
+from benchmarks.synthetic_tools import make_synthetic_tools
+from src.graph.agent_graph import AgentGraph
+
+
+def rebuild_per_turn(llm: AzureChatOpenAI, tools: list):
+    {tool.name: tool for tool in tools}
+    llm.bind_tools(tools, parallel_tool_calls=False)
+    ToolNode(tools)
+
+
+def reuse_cached(graph: AgentGraph):
+    graph.tools_map
+    graph.llm_with_tools
+    graph._tool_node
+
+
+def main(counts: list[int], repeat: int):
+    # Constructing the client does not touch the network.
+    llm = AzureChatOpenAI(
+        api_key="benchmark",
+        azure_endpoint="https://localhost",
+        openai_api_version="2024-10-21",
+        deployment_name="benchmark",
+    )
+    print(f"{'tools':>6} {'rebuilt (ms/turn)':>18} {'cached (ms/turn)':>17}")
+    for count in counts:
+        tools = make_synthetic_tools(count)
+        graph = AgentGraph(tools=tools, config={"configurable": {}}, llm=llm)
+        rebuilt = timeit.timeit(lambda: rebuild_per_turn(llm, tools), number=repeat)
+        cached = timeit.timeit(lambda: reuse_cached(graph), number=repeat)
+        print(
+            f"{count:>6} {rebuilt / repeat * 1000:>18.3f} "
+            f"{cached / repeat * 1000:>17.4f}"
+        )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--counts", type=int, nargs="+", default=[1, 10, 50, 100])
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+    main(args.counts, args.repeat)
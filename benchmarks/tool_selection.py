@@ -0,0 +1,68 @@
+"""
+Token savings of per-turn tool selection as a function of catalog size.
+
+For each catalog size, compares the tokens of the tool schemas sent with every
+LLM call when binding the whole catalog with those of the top-K tools a
+ToolSelector picks, and reports the selection time and how many of the picked
+tools match the topic of the question.
+
+Usage:
+    python -m benchmarks.tool_selection --counts 10 50 100 200 --top-k 8
+"""
+
+import argparse
+import json
+import time
+
+from langchain_core.messages import HumanMessage
+from langchain_core.utils.function_calling import convert_to_openai_tool
+
+from benchmarks.synthetic_tools import TOPICS, make_synthetic_tools
+from src.common.tokens import count_text_tokens
+from src.graph.tool_selection import ToolSelector
+
+
+def schema_tokens(tools: list) -> int:
+    return sum(
+        count_text_tokens(json.dumps(convert_to_openai_tool(tool))) for tool in tools
+    )
+
+
+def main(counts: list[int], top_k: int):
+    print(
+        f"{'tools':>6} {'all (tokens)':>13} {'top-k (tokens)':>15} "
+        f"{'saved':>6} {'select (ms)':>12} {'on topic':>9}"
+    )
+    for count in counts:
+        tools = make_synthetic_tools(count)
+        tools_map = {tool.name: tool for tool in tools}
+        selector = ToolSelector(top_k=top_k)
+        selector.build_index(tools)
+
+        full = schema_tokens(tools)
+        selected_tokens = on_topic = picked = 0
+        start = time.perf_counter()
+        selections = [
+            selector.select([HumanMessage(content=f"What are the {topic} for today?")])
+            for topic in TOPICS
+        ]
+        elapsed = (time.perf_counter() - start) / len(TOPICS)
+        for topic, names in zip(TOPICS, selections):
+            selected_tokens += schema_tokens([tools_map[name] for name in names])
+            on_topic += sum(name.startswith(topic.replace(" ", "_")) for name in names)
+            picked += len(names)
+        selected_tokens /= len(TOPICS)
+
+        print(
+            f"{count:>6} {full:>13} {selected_tokens:>15.0f} "
+            f"{1 - selected_tokens / full:>6.0%} {elapsed * 1000:>12.3f} "
+            f"{on_topic / max(picked, 1):>9.0%}"
+        )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--counts", type=int, nargs="+", default=[10, 50, 100, 200])
+    parser.add_argument("--top-k", type=int, default=8)
+    args = parser.parse_args()
+    main(args.counts, args.top_k)
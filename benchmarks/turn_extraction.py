@@ -0,0 +1,111 @@
+"""
+Per-turn cost of extracting tool sources and tool calls over long conversations.
+
+Builds histories of `--turns` earlier turns with `--calls` tool calls each and
+times the extraction for one new turn: the previous approach scanned every tool
+message of the conversation after the turn, while TurnToolResults records only
+the current turn's results as its tool nodes finish. Also reports how many tool
+calls each approach returns for the turn.
+
+Usage:
+    python -m benchmarks.turn_extraction --turns 10 100 1000 --calls 3
+"""
+
+import argparse
+import time
+from itertools import chain
+
+from langchain_core.messages import (
+    AIMessage,
+    AnyMessage,
+    HumanMessage,
+    ToolMessage,
+    filter_messages,
+)
+
+from src.graph.utils import (
+    TurnToolResults,
+    get_artifact_sources,
+    get_tool_call_args,
+    validate_tool_artifact,
+)
+from src.tools.schemas import ToolArtifact, ToolCall, ToolSource
+
+
+def build_turn(turn: int, calls: int) -> list[AnyMessage]:
+    tool_calls = [
+        {"name": "search_tool", "args": {"query": f"{turn}-{i}"}, "id": f"{turn}-{i}"}
+        for i in range(calls)
+    ]
+    tool_messages = [
+        ToolMessage(
+            content=f"Result {call['id']}",
+            name=call["name"],
+            tool_call_id=call["id"],
+            # Artifacts restored from a checkpointer are plain dicts.
+            artifact=ToolArtifact(
+                sources=[ToolSource(label=f"Page {call['id']}")],
+                metadata={"args": call["args"]},
+            ).model_dump(),
+        )
+        for call in tool_calls
+    ]
+    return [
+        HumanMessage(content=f"Question {turn}"),
+        AIMessage(content="", tool_calls=tool_calls),
+        *tool_messages,
+        AIMessage(content=f"Answer {turn}"),
+    ]
+
+
+def scan_conversation(messages: list[AnyMessage]):
+    """The previous extraction: every tool message of the conversation."""
+    tool_messages = filter_messages(messages, include_types=("tool",))
+    tool_artifacts = list(map(validate_tool_artifact, tool_messages))
+    sources = list(set(chain.from_iterable(map(get_artifact_sources, tool_artifacts))))
+    tool_calls = [
+        ToolCall(tool_name=message.name, metadata={"args": get_tool_call_args(a)})
+        for message, a in zip(tool_messages, tool_artifacts)
+    ]
+    return sources, tool_calls
+
+
+def collect_turn(turn: list[AnyMessage]):
+    """The turn-scoped extraction, as done by the assistant and tool nodes."""
+    tool_results = TurnToolResults()
+    tool_results.expect(turn[1].tool_calls)
+    for message in turn[2:-1]:
+        tool_results.add(message, 0.0)
+    return tool_results.sources, tool_results.tool_calls
+
+
+def timed(function, argument, repeat: int) -> tuple[float, int]:
+    start = time.perf_counter()
+    for _ in range(repeat):
+        _, tool_calls = function(argument)
+    return (time.perf_counter() - start) / repeat, len(tool_calls)
+
+
+def main(turn_counts: list[int], calls: int, repeat: int):
+    print(
+        f"{'turns':>6} {'full scan (ms)':>15} {'calls':>7} "
+        f"{'turn-scoped (ms)':>17} {'calls':>7}"
+    )
+    for turns in turn_counts:
+        history = [build_turn(turn, calls) for turn in range(turns + 1)]
+        messages = list(chain.from_iterable(history))
+        scan_time, scan_calls = timed(scan_conversation, messages, repeat)
+        turn_time, turn_calls = timed(collect_turn, history[-1], repeat)
+        print(
+            f"{turns:>6} {scan_time * 1000:>15.3f} {scan_calls:>7} "
+            f"{turn_time * 1000:>17.3f} {turn_calls:>7}"
+        )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--turns", type=int, nargs="+", default=[10, 100, 1000])
+    parser.add_argument("--calls", type=int, default=3)
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+    main(args.turns, args.calls, args.repeat)
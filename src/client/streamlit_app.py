@@ -2,6 +2,8 @@ import asyncio
 import logging
 import os
 import sys
+import uuid
+from contextlib import aclosing
 
 import streamlit as st
 from dotenv import load_dotenv
@@ -11,21 +13,37 @@ load_dotenv()
 # Add the project root to sys.path so imports work
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "..")))
 
+from src.common.logs import configure_logging
+from src.graph.checkpointers import create_checkpointer
 from src.graph.create_graph import create_mimaizey_graph
-
-# Set up logging so we can see the logs in the terminal when running the Streamlit app
-logging.basicConfig(
-    level=logging.DEBUG,
-    format="%(asctime)s — %(levelname)s — %(message)s",
+from src.graph.events import (
+    FinalEvent,
+    TokenEvent,
+    ToolEndEvent,
+    ToolProgressEvent,
+    ToolStartEvent,
 )
+
+
+# Set up logging so we can see the logs in the terminal when running the Streamlit app.
+# Streamlit re-runs this script on every interaction; configure logging only once.
+@st.cache_resource
+def setup_logging():
+    configure_logging(level=os.getenv("LOG_LEVEL", "INFO"), json_format=False)
+
+
+setup_logging()
 logger = logging.getLogger(__name__)
 
 # -----------------------Session State Initialization----------------------------
 if "mimaizey_graph" not in st.session_state:
-    st.session_state.mimaizey_graph = create_mimaizey_graph()
+    st.session_state.mimaizey_graph = create_mimaizey_graph(
+        checkpointer=create_checkpointer("memory")
+    )
 
-if "chat_history" not in st.session_state:
-    st.session_state.chat_history = []
+# The graph's checkpointer keeps the conversation, keyed by this thread id.
+if "thread_id" not in st.session_state:
+    st.session_state.thread_id = str(uuid.uuid4())
 
 if "config" not in st.session_state:
     st.session_state.config = {}
@@ -34,6 +52,40 @@ if "chat_messages" not in st.session_state:
     st.session_state.chat_messages = []  # For storing displayed messages
 
 
+def iterate_stream(async_events):
+    """
+    Drives an async event generator from Streamlit's synchronous script, yielding
+    each event as soon as it is produced so the reply can be rendered incrementally.
+
+    The generator is consumed by a single task, which hands the events over one at
+    a time, so the context it binds (such as the log context) lasts the whole stream.
+    """
+    loop = asyncio.new_event_loop()
+    events = asyncio.Queue(maxsize=1)
+    end = object()
+
+    async def consume():
+        try:
+            async with aclosing(async_events):
+                async for event in async_events:
+                    await events.put(event)
+        except Exception as e:
+            await events.put(e)
+        else:
+            await events.put(end)
+
+    consumer = loop.create_task(consume())
+    try:
+        while (event := loop.run_until_complete(events.get())) is not end:
+            if isinstance(event, Exception):
+                raise event
+            yield event
+    finally:
+        consumer.cancel()
+        loop.run_until_complete(asyncio.gather(consumer, return_exceptions=True))
+        loop.close()
+
+
 # ------------------------App Title and Config Form--------------------------------
 st.title("GoBlue Tool Dev Chat Interface")
 
@@ -70,58 +122,72 @@ user_message = st.chat_input("Type your message:")
 
 if user_message:
     # Append and render the user message.
-    st.session_state.chat_history.append({"role": "user", "content": user_message})
     st.session_state.chat_messages.append({"role": "user", "content": user_message})
     with st.chat_message("user"):
         st.markdown(user_message)
 
-    try:
-        response, flattened_sources, tool_calls = asyncio.run(
-            st.session_state.mimaizey_graph.invoke(
-                chat_history=st.session_state.chat_history,
+    with st.chat_message("assistant"):
+        placeholder = st.empty()
+        agent_reply = ""
+        tool_status = ""
+        final_event = None
+        try:
+            events = st.session_state.mimaizey_graph.stream(
+                chat_history=[],
                 message=user_message,
                 runtime_config=st.session_state.config,
+                thread_id=st.session_state.thread_id,
+            )
+            for event in iterate_stream(events):
+                if isinstance(event, TokenEvent):
+                    agent_reply += event.content
+                elif isinstance(event, ToolStartEvent):
+                    tool_status = f"*Calling tool* **{event.tool_name}**..."
+                elif isinstance(event, ToolProgressEvent):
+                    tool_status = (
+                        f"*Tool* **{event.tool_name}** *received "
+                        f"{event.bytes:,} bytes...*"
+                    )
+                elif isinstance(event, ToolEndEvent):
+                    tool_status = (
+                        f"*Tool* **{event.tool_name}** *finished in "
+                        f"{event.duration:.2f}s*"
+                    )
+                elif isinstance(event, FinalEvent):
+                    final_event = event
+                placeholder.markdown(f"{tool_status}\n\n{agent_reply}▌")
+        except Exception as e:
+            error_msg = f"Error invoking agent: {e}"
+            placeholder.error(error_msg)
+            st.session_state.chat_messages.append(
+                {"role": "assistant", "content": error_msg}
             )
-        )  # Async call to the graph
-    except Exception as e:
-        error_msg = f"Error invoking agent: {e}"
-        st.error(error_msg)
-        st.session_state.chat_messages.append(
-            {"role": "assistant", "content": error_msg}
-        )
-        logger.exception(f"Error invoking agent: {e}")
-    else:
-        if response:
-            agent_reply = response[-1].content
-            full_reply = agent_reply
-
-            if tool_calls:
-                for call in tool_calls:
+            logger.exception("Error invoking agent: %s", e)
+        else:
+            if final_event and final_event.messages:
+                agent_reply = final_event.messages[-1].content
+                full_reply = agent_reply
+
+                for call in final_event.tool_calls:
                     tool_message = f"\n\n*Tool Call:* **{call.tool_name}**, metadata: {call.metadata}"
                     full_reply += tool_message
 
-            if flattened_sources:
-                for source in flattened_sources:
+                for source in final_event.flattened_sources:
                     try:
                         label = source.label
                         url = source.url
                     except Exception as e:
                         label = str(source)
                         url = ""
-                        logger.exception(f"Error extracting source label and url: {e}")
+                        logger.exception("Error extracting source label and url: %s", e)
                     source_message = f"\n\n*Tool Source:* **{label}**"
                     if url:
                         source_message += f" ([Link]({url}))"
                     full_reply += source_message
 
-            # Render full assistant reply with tools/sources embedded
-            with st.chat_message("assistant"):
-                st.markdown(full_reply)
+                # Render full assistant reply with tools/sources embedded
+                placeholder.markdown(full_reply)
 
-            # Append once to chat history
-            st.session_state.chat_history.append(
-                {"role": "assistant", "content": agent_reply}
-            )
-            st.session_state.chat_messages.append(
-                {"role": "assistant", "content": full_reply}
-            )
+                st.session_state.chat_messages.append(
+                    {"role": "assistant", "content": full_reply}
+                )
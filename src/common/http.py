@@ -0,0 +1,24 @@
+"""
+HTTP helpers shared by the tools' client pool and the LLM retry policy.
+"""
+
+import time
+from email.utils import parsedate_to_datetime
+from typing import Optional
+
+import httpx
+
+
+def retry_after(response: httpx.Response) -> Optional[float]:
+    """Parses the Retry-After header (seconds or HTTP date) of a response."""
+    value = response.headers.get("Retry-After")
+    if value is None:
+        return None
+    try:
+        return max(float(value), 0.0)
+    except ValueError:
+        pass
+    try:
+        return max(parsedate_to_datetime(value).timestamp() - time.time(), 0.0)
+    except (TypeError, ValueError):
+        return None
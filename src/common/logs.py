@@ -0,0 +1,270 @@
+"""
+Structured, low-overhead logging for the graph and the tools.
+
+- Hot paths log with lazy %-style arguments, so nothing is formatted for
+  disabled levels. Large values such as message lists are wrapped in a
+  LogPayload, which is only rendered when a handler formats the record. It is
+  then redacted, capped at `max_chars` and, for large payloads, sampled.
+- `log_context` binds the request and thread id of the running turn; the
+  ContextFilter adds them to every record logged in that context, including
+  from tool nodes and tool executor threads.
+- `configure_logging` installs a non-blocking QueueHandler on the root logger.
+  Records are formatted, as JSON by default, and written by a background
+  listener thread, so slow log sinks never block the event loop. When the
+  bounded queue is full, records are dropped and counted instead.
+"""
+
+import atexit
+import contextvars
+import json
+import logging
+import logging.handlers
+import queue
+import random
+import sys
+from contextlib import contextmanager
+from datetime import datetime, timezone
+from typing import Any, Iterable, Iterator, Optional
+
+from langchain_core.messages import BaseMessage
+from pydantic import BaseModel
+
+# Keys whose values are replaced in logged payloads.
+DEFAULT_REDACT_KEYS = (
+    "api_key",
+    "authorization",
+    "password",
+    "token",
+    "email",
+    "name",
+    "user_id",
+)
+
+_log_context: contextvars.ContextVar[dict[str, str]] = contextvars.ContextVar(
+    "log_context", default={}
+)
+
+
+class PayloadSettings(BaseModel):
+    """
+    How LogPayloads are rendered
+    """
+
+    max_chars: int = 2000  # Longer renderings are truncated.
+    sample_rate: float = 1.0  # Share of large payloads rendered in full.
+    large_items: int = 20  # Payloads with more items than this are "large".
+    redact_keys: frozenset[str] = frozenset(DEFAULT_REDACT_KEYS)
+
+
+_payload_settings = PayloadSettings()
+
+
+def redact(value: Any, keys: frozenset[str]) -> Any:
+    """Replaces the values of `keys` in nested dicts, lists and messages."""
+    if isinstance(value, BaseMessage):
+        message, value = value, {"type": value.type, "content": value.content}
+        if tool_calls := getattr(message, "tool_calls", None):
+            value["tool_calls"] = tool_calls
+    if isinstance(value, BaseModel):
+        value = value.model_dump()
+    if isinstance(value, dict):
+        # The name of a tool call is the tool's, not the user's.
+        kept = {"name"} if value.get("type") == "tool_call" else set()
+        return {
+            key: "[REDACTED]" if key in keys - kept else redact(item, keys)
+            for key, item in value.items()
+        }
+    if isinstance(value, (list, tuple)):
+        return [redact(item, keys) for item in value]
+    return value
+
+
+class LogPayload:
+    """
+    A value to log, rendered only when the record is formatted. Lists longer
+    than the `large_items` setting are rendered in full for a `sample_rate`
+    share of the records and summarized otherwise; the sampling is decided
+    when the payload is created, without rendering it.
+    """
+
+    __slots__ = ("value", "sampled")
+
+    def __init__(self, value: Any):
+        self.value = value
+        self.sampled = (
+            not isinstance(value, (list, tuple))
+            or len(value) <= _payload_settings.large_items
+            or random.random() < _payload_settings.sample_rate
+        )
+
+    def __str__(self) -> str:
+        settings = _payload_settings
+        if not self.sampled:
+            return f"[{len(self.value)} items, not sampled]"
+        if not isinstance(self.value, (list, tuple)):
+            return self._cap(self._render(self.value))
+        # Items are rendered until the cap is reached, so a long conversation
+        # costs no more than a short one.
+        parts, size = [], 0
+        for item in self.value:
+            if size > settings.max_chars:
+                break
+            parts.append(self._render(item))
+            size += len(parts[-1]) + 2
+        text = self._cap("[" + ", ".join(parts) + "]")
+        if len(parts) < len(self.value):
+            text += f" [{len(self.value) - len(parts)} more items]"
+        return text
+
+    @staticmethod
+    def _render(value: Any) -> str:
+        return json.dumps(
+            redact(value, _payload_settings.redact_keys),
+            default=str,
+            ensure_ascii=False,
+        )
+
+    @staticmethod
+    def _cap(text: str) -> str:
+        max_chars = _payload_settings.max_chars
+        if len(text) <= max_chars:
+            return text
+        return f"{text[:max_chars]}... [{len(text) - max_chars} more chars]"
+
+
+@contextmanager
+def log_context(**fields: Optional[str]) -> Iterator[dict[str, str]]:
+    """
+    Binds fields such as `request_id` and `thread_id` to the records logged in
+    the current context; fields bound by an outer context are kept unless
+    overridden. None values are ignored.
+    """
+    context = {
+        **_log_context.get(),
+        **{key: value for key, value in fields.items() if value is not None},
+    }
+    token = _log_context.set(context)
+    try:
+        yield context
+    finally:
+        _log_context.reset(token)
+
+
+def current_log_context() -> dict[str, str]:
+    return _log_context.get()
+
+
+class ContextFilter(logging.Filter):
+    """Adds the fields bound with `log_context` to each record as `context`."""
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        record.context = _log_context.get()
+        return True
+
+
+class JsonFormatter(logging.Formatter):
+    """Formats records as single-line JSON objects."""
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "time": datetime.fromtimestamp(record.created, timezone.utc).isoformat(),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+            **getattr(record, "context", {}),
+        }
+        if record.exc_info:
+            entry["exception"] = self.formatException(record.exc_info)
+        return json.dumps(entry, default=str, ensure_ascii=False)
+
+
+class TextFormatter(logging.Formatter):
+    """The plain-text format, followed by the bound context fields."""
+
+    def format(self, record: logging.LogRecord) -> str:
+        text = super().format(record)
+        context = getattr(record, "context", {})
+        if context:
+            text += " " + " ".join(f"{key}={value}" for key, value in context.items())
+        return text
+
+
+class NonBlockingQueueHandler(logging.handlers.QueueHandler):
+    """
+    A QueueHandler that leaves formatting to the listener thread and drops
+    records instead of blocking when the queue is full.
+    """
+
+    def __init__(self, log_queue: queue.Queue):
+        super().__init__(log_queue)
+        self.dropped = 0
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        # Arguments are formatted by the listener; they must not be mutated
+        # after they are logged.
+        return record
+
+    def enqueue(self, record: logging.LogRecord):
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+
+_listener: Optional[logging.handlers.QueueListener] = None
+
+
+def configure_logging(
+    level: str | int = "INFO",
+    json_format: bool = True,
+    queue_size: int = 10000,
+    stream: Any = None,
+    handlers: Iterable[logging.Handler] = (),
+    max_payload_chars: int = 2000,
+    payload_sample_rate: float = 1.0,
+    redact_keys: Iterable[str] = DEFAULT_REDACT_KEYS,
+) -> NonBlockingQueueHandler:
+    """
+    Replaces the root logger's handlers with a non-blocking queue handler whose
+    listener writes to `stream` (stderr by default) and to `handlers`. Returns
+    the queue handler, whose `dropped` counts the records lost to a full queue.
+    """
+    global _listener, _payload_settings
+    shutdown_logging()
+    _payload_settings = PayloadSettings(
+        max_chars=max_payload_chars,
+        sample_rate=payload_sample_rate,
+        redact_keys=frozenset(redact_keys),
+    )
+    formatter = (
+        JsonFormatter()
+        if json_format
+        else TextFormatter("%(asctime)s — %(levelname)s — %(name)s — %(message)s")
+    )
+    output = logging.StreamHandler(stream or sys.stderr)
+    output.setFormatter(formatter)
+    queue_handler = NonBlockingQueueHandler(queue.Queue(queue_size))
+    queue_handler.addFilter(ContextFilter())
+    _listener = logging.handlers.QueueListener(
+        queue_handler.queue, output, *handlers, respect_handler_level=True
+    )
+    _listener.start()
+
+    root = logging.getLogger()
+    for handler in root.handlers[:]:
+        root.removeHandler(handler)
+        handler.close()
+    root.addHandler(queue_handler)
+    root.setLevel(level.upper() if isinstance(level, str) else level)
+    return queue_handler
+
+
+def shutdown_logging():
+    """Stops the listener after writing the queued records."""
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
+
+
+atexit.register(shutdown_logging)
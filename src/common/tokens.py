@@ -0,0 +1,96 @@
+"""
+Local token counting with tiktoken, shared by the graph's context budget and
+the tools' output limits. The encoding is loaded in the background; counts are
+approximated until it is available.
+"""
+
+import logging
+import threading
+from collections import OrderedDict
+from typing import Any, Optional
+
+logger = logging.getLogger(__name__)
+
+# Number of token counts kept by count_text_tokens.
+TOKEN_COUNT_CACHE_SIZE = 8192
+
+_encoding: Any = None
+_encoding_loaded = threading.Event()
+_encoding_lock = threading.Lock()
+_encoding_thread: Optional[threading.Thread] = None
+_token_counts: OrderedDict[tuple[int, int], int] = OrderedDict()
+
+
+def _load_encoding():
+    global _encoding
+    try:
+        import tiktoken
+
+        _encoding = tiktoken.get_encoding("o200k_base")
+    except Exception as e:
+        logger.warning("tiktoken unavailable, approximating token counts: %s", e)
+    finally:
+        _encoding_loaded.set()
+
+
+def preload_encoding() -> threading.Event:
+    """
+    Starts loading the tiktoken encoding in a background thread, since the first
+    load downloads it. Token counts are approximated until it is loaded. Returns
+    an event that is set once loading has finished or failed.
+    """
+    global _encoding_thread
+    with _encoding_lock:
+        if _encoding_thread is None:
+            _encoding_thread = threading.Thread(
+                target=_load_encoding, name="tiktoken-loader", daemon=True
+            )
+            _encoding_thread.start()
+    return _encoding_loaded
+
+
+def _get_encoding():
+    """Returns the tiktoken encoding, or None while it loads or if unavailable."""
+    if not _encoding_loaded.is_set():
+        preload_encoding()
+        return None
+    return _encoding
+
+
+def count_tokens(text: str) -> int:
+    """
+    Counts the tokens of a string locally with tiktoken, falling back to roughly
+    four characters per token.
+    """
+    encoding = _get_encoding()
+    if encoding is None:
+        return (len(text) + 3) // 4
+    return len(encoding.encode(text, disallowed_special=()))
+
+
+def count_text_tokens(text: str) -> int:
+    """
+    Cached count_tokens, since the same history is counted again on every turn.
+    The cache is keyed by the hash and length of the text, so it does not keep
+    large tool outputs alive.
+    """
+    key = (hash(text), len(text))
+    count = _token_counts.get(key)
+    if count is not None:
+        _token_counts.move_to_end(key)
+        return count
+    count = count_tokens(text)
+    if _encoding_loaded.is_set():
+        # Approximate counts made while the encoding loads are not kept.
+        _token_counts[key] = count
+        if len(_token_counts) > TOKEN_COUNT_CACHE_SIZE:
+            _token_counts.popitem(last=False)
+    return count
+
+
+def truncate_text(text: str, max_tokens: int) -> str:
+    """Cuts a string down to at most `max_tokens` tokens."""
+    encoding = _get_encoding()
+    if encoding is None:
+        return text[: max_tokens * 4]
+    return encoding.decode(encoding.encode(text, disallowed_special=())[:max_tokens])
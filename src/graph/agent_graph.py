@@ -1,86 +1,255 @@
+import asyncio
+import json
 import logging
 import os
-from datetime import datetime
-from itertools import chain
-from typing import Any
+import time
+from collections import OrderedDict
+from contextlib import contextmanager
+from pathlib import Path
+from types import MappingProxyType
+from typing import Any, AsyncIterable, AsyncIterator, Callable, Iterable
 
+from langchain_core.language_models import BaseChatModel
 from langchain_core.messages import (
     AIMessage,
+    AIMessageChunk,
     AnyMessage,
     HumanMessage,
     ToolMessage,
-    filter_messages,
 )
 from langchain_core.prompts import ChatPromptTemplate, MessagesPlaceholder
-from langchain_core.runnables import RunnableConfig
+from langchain_core.runnables import Runnable, RunnableConfig
 from langchain_core.tools import StructuredTool
 from langchain_openai import AzureChatOpenAI
+from langgraph.checkpoint.base import BaseCheckpointSaver
+from langgraph.config import get_stream_writer
 from langgraph.graph import StateGraph
 from langgraph.graph.message import add_messages
 from langgraph.prebuilt import ToolNode
-from langgraph.types import Command
+from langgraph.store.base import BaseStore
+from langgraph.types import Command, Send
 
-from src.graph.prompts import SYSPROMPT
+from src.common.logs import LogPayload, log_context
+from src.graph.batch import BatchInput, BatchItem, BatchResult, BatchRun
+from src.graph.context import ContextBudget
+from src.graph.events import (
+    FinalEvent,
+    StreamEvent,
+    TokenEvent,
+    ToolEndEvent,
+    ToolStartEvent,
+)
+from src.graph.metrics import (
+    METRICS_CONFIG_KEY,
+    MetricsSink,
+    TurnMetrics,
+    TurnRecorder,
+    payload_size,
+    time_node,
+)
+from src.graph.prompts import REQUEST_CONTEXT_PROMPT, SYSPROMPT, current_time
+from src.graph.response_cache import CachedTurn, ResponseCache, fingerprint
+from src.graph.retry import RetryPolicy, error_retry_after, error_status
+from src.graph.router import LLMRouter
+from src.graph.speculation import (
+    SPECULATION_CONFIG_KEY,
+    SpeculativeToolCalls,
+    get_speculation,
+)
 from src.graph.states import AgentGraphState
+from src.graph.tool_selection import ToolSelector
 from src.graph.utils import (
-    get_artifact_sources,
-    get_tool_call_args,
-    get_tool_names_from_messages,
-    validate_tool_artifact,
+    TOOL_RESULTS_CONFIG_KEY,
+    TurnToolResults,
+    get_turn_tool_results,
 )
-from src.tools.schemas import ToolCall
 
 logger = logging.getLogger(__name__)
 
 
+def error_message(
+    content: str, response_metadata: dict[str, Any] | None = None
+) -> AIMessage:
+    """Builds the fallback AIMessage returned when the LLM call fails."""
+    return AIMessage(
+        content=content,
+        response_metadata=response_metadata or {},
+        usage_metadata={
+            "input_tokens": 0,
+            "output_tokens": 0,
+            "total_tokens": 0,
+        },
+    )
+
+
+def is_empty_response(result: AIMessage) -> bool:
+    """Whether the LLM returned neither text nor tool calls."""
+    return not result.tool_calls and (
+        not result.content
+        or isinstance(result.content, list)
+        and not result.content[0].get("text")
+    )
+
+
 class Assistant:
-    def __init__(self, llm_with_tools: AzureChatOpenAI, prompt: ChatPromptTemplate):
+    def __init__(
+        self,
+        llm_with_tools: BaseChatModel,
+        prompt: ChatPromptTemplate,
+        timeout: float | None = None,
+        context_budget: ContextBudget | None = None,
+        retry_policy: RetryPolicy | None = None,
+        select_llm: Callable[[list[AnyMessage]], Runnable] | None = None,
+    ):
         self.llm_with_tools = llm_with_tools
         self.prompt = prompt
+        self.timeout = timeout
+        self.context_budget = context_budget
+        self.retry_policy = retry_policy or RetryPolicy()
+        self.select_llm = select_llm
 
     async def __call__(self, state: dict, config: RunnableConfig):
         """
         NOTE: config to always have the key 'name' in the "configurable" key.
+
+        The per-request timeout can be overridden with the "llm_timeout" key in
+        the "configurable" key. On timeout the in-flight model call is cancelled.
+
+        Empty responses, rate limits and server errors are retried according to
+        the retry policy; once it is exhausted a fixed error message is returned.
+        The retry counts are exposed in the response metadata under "retries".
+        Wall time, tokens, retries and payload sizes are recorded in the turn's
+        metrics.
+
+        With speculative tool calls enabled, the LLM call streams so that
+        side-effect-free tool calls can start before the response is complete.
         """
-        formatted_prompt = self.prompt.format_messages(
-            messages=state["messages"],
-        )
-        while True:
-            try:
-                result = self.llm_with_tools.invoke(formatted_prompt)
-            except KeyError as e:
-                logger.exception(e)
+        with time_node(config, "assistant") as timer:
+            policy = self.retry_policy
+            timeout = config.get("configurable", {}).get("llm_timeout", self.timeout)
+            deadline = None
+            if policy.deadline is not None:
+                turn_elapsed = timer.recorder.elapsed if timer.recorder else 0.0
+                deadline = time.monotonic() - turn_elapsed + policy.deadline
+
+            messages = state["messages"]
+            llm = self.select_llm(messages) if self.select_llm else self.llm_with_tools
+            speculation = get_speculation(config)
+            context_usage = None
+            if self.context_budget:
+                messages, context_usage = await self.context_budget.apply(messages)
+                logger.info("Context budget: %s", context_usage)
+
+            retries = {"empty": 0, "rate_limit": 0, "server_error": 0}
+            failure = "retries exhausted"
+            result = None
+            for attempt in range(policy.max_attempts):
+                formatted_prompt = self.prompt.format_messages(messages=messages)
+                call_timeout = timeout
+                if deadline is not None:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        failure = "deadline exceeded"
+                        break
+                    call_timeout = min(timeout or remaining, remaining)
+                timer.record(input_bytes=payload_size(formatted_prompt))
+
+                delay = None
+                try:
+                    async with asyncio.timeout(call_timeout):
+                        if speculation is None:
+                            result = await llm.ainvoke(formatted_prompt, config)
+                        else:
+                            result = await llm.ainvoke(
+                                formatted_prompt, speculation.watch(config), stream=True
+                            )
+                except KeyError as e:
+                    logger.exception(e)
+                    timer.record(status="error")
+                    return {
+                        "messages": [
+                            error_message(
+                                "An error occurred while processing your request",
+                                response_metadata={"error": "error"},
+                            )
+                        ]
+                    }
+                except TimeoutError:
+                    if call_timeout != timeout:
+                        failure = "deadline exceeded"
+                        break
+                    logger.error("LLM call timed out after %s seconds", timeout)
+                    timer.record(status="timeout")
+                    return {
+                        "messages": [
+                            error_message(
+                                "The request timed out. Please try again.",
+                                response_metadata={"error": "timeout"},
+                            )
+                        ]
+                    }
+                except Exception as e:
+                    status = error_status(e)
+                    if status not in policy.retry_statuses:
+                        raise
+                    kind = "rate_limit" if status == 429 else "server_error"
+                    logger.warning("LLM call failed with status %s: %s", status, e)
+                    delay = error_retry_after(e)
+                    result = None
+                else:
+                    if not is_empty_response(result):
+                        break
+                    # Re-prompt the LLM for an actual response.
+                    kind = "empty"
+                    logger.warning("LLM returned an empty response")
+                    messages = add_messages(
+                        messages, [HumanMessage(content="Respond with a real output.")]
+                    )
+                    result = None
+
+                if attempt + 1 == policy.max_attempts:
+                    break
+                delay = policy.delay(attempt, delay)
+                if delay > policy.max_retry_after:
+                    failure = f"retry after {delay:.0f}s exceeds the limit"
+                    break
+                if deadline is not None and time.monotonic() + delay >= deadline:
+                    failure = "deadline exceeded"
+                    break
+                retries[kind] += 1
+                timer.record(retries=sum(retries.values()))
+                await asyncio.sleep(delay)
+
+            if speculation is not None:
+                speculation.reconcile(result.tool_calls if result is not None else [])
+            if result is None:
+                logger.error("LLM call failed: %s, retries: %s", failure, retries)
+                timer.record(status="error")
                 return {
                     "messages": [
-                        AIMessage(
-                            content="An error occurred while processing your request",
-                            usage_metadata={
-                                "input_tokens": 0,
-                                "output_tokens": 0,
-                                "total_tokens": 0,
-                            },
+                        error_message(
+                            "The assistant could not produce a response. "
+                            "Please try again.",
+                            response_metadata={"retries": retries, "error": failure},
                         )
                     ]
                 }
 
-            # If the LLM happens to return an empty response, we will re-prompt it
-            # for an actual response.
-            if not result.tool_calls and (
-                not result.content
-                or isinstance(result.content, list)
-                and not result.content[0].get("text")
-            ):
-                state = {
-                    **state,
-                    "messages": add_messages(
-                        state["messages"],
-                        [HumanMessage(content="Respond with a real output.")],
-                    ),
-                }
-            else:
-                break
-
-        return {"messages": result}
+            usage = result.usage_metadata or {}
+            timer.record(
+                input_tokens=usage.get("input_tokens", 0),
+                cached_input_tokens=usage.get("input_token_details", {}).get(
+                    "cache_read", 0
+                ),
+                output_tokens=usage.get("output_tokens", 0),
+                output_bytes=payload_size([result]),
+            )
+            if (tool_results := get_turn_tool_results(config)) is not None:
+                tool_results.expect(result.tool_calls)
+            result.response_metadata["retries"] = retries
+            if context_usage:
+                result.response_metadata["context_budget"] = context_usage.model_dump()
+            return {"messages": result}
 
 
 class AgentGraph:
@@ -93,14 +262,77 @@ class AgentGraph:
     def __init__(
         self,
         state_class: type = AgentGraphState,
-        tools: list[StructuredTool] = [],
-        config: dict = {},
+        tools: list[StructuredTool] | None = None,
+        config: dict | None = None,
+        llm: BaseChatModel | LLMRouter | None = None,
+        llm_timeout: float | None = None,
+        parallel_tool_calls: bool = False,
+        max_tool_concurrency: int = 4,
+        tool_timeout: float | None = None,
+        context_budget: ContextBudget | None = None,
+        metrics_sink: MetricsSink | None = None,
+        retry_policy: RetryPolicy | None = None,
+        response_cache: ResponseCache | None = None,
+        tool_selector: ToolSelector | None = None,
+        max_bound_variants: int = 32,
+        speculative_tool_calls: bool = False,
     ):
-        self.config = config
+        """
+        Args:
+            config: Base config of every turn. It is stored read-only and shared
+                by concurrent requests; each turn merges its runtime config into
+                a copy of it.
+            llm: Chat model to use. Defaults to AzureChatOpenAI configured from
+                environment variables, or to an LLMRouter across the deployments
+                in AZURE_OPENAI_DEPLOYMENTS if it is set; pass a local fake model
+                for benchmarks.
+            llm_timeout: Default timeout in seconds for a single LLM call.
+            parallel_tool_calls: Let the LLM request several tools at once and
+                dispatch every tool call of an AIMessage concurrently.
+            max_tool_concurrency: Maximum number of tool calls running at once
+                for a single request in parallel mode.
+            tool_timeout: Default timeout in seconds for a single tool call. A
+                tool's own `timeout` attribute takes precedence.
+            context_budget: Optional stage that trims the conversation to a token
+                budget before each LLM call.
+            metrics_sink: Optional exporter receiving the per-node metrics of
+                every turn (in-memory, JSON lines or Prometheus).
+            retry_policy: Retry policy of the LLM calls for empty responses,
+                rate limits and server errors. Defaults to RetryPolicy().
+            response_cache: Optional cache of whole first turns, answering
+                repeated questions without running the graph.
+            tool_selector: Optional pre-routing stage that binds only the tools
+                relevant to each turn instead of the whole catalog.
+            max_bound_variants: Maximum number of LLMs bound to a tool subset
+                kept for reuse when a tool selector is set.
+            speculative_tool_calls: Stream the LLM calls and start calls of
+                side-effect-free tools as soon as their arguments are complete,
+                overlapping the tool's latency with the rest of the response.
+        """
+        config = config or {}
+        self.config = MappingProxyType(
+            {
+                **config,
+                "configurable": MappingProxyType(dict(config.get("configurable", {}))),
+            }
+        )
         self.system_prompt = SYSPROMPT
+        self.llm_timeout = llm_timeout
+        self.parallel_tool_calls = parallel_tool_calls
+        self.max_tool_concurrency = max_tool_concurrency
+        self.tool_timeout = tool_timeout
+        self.context_budget = context_budget
+        self.metrics_sink = metrics_sink
+        self.retry_policy = retry_policy
+        self.response_cache = response_cache
+        self.tool_selector = tool_selector
+        self.max_bound_variants = max_bound_variants
+        self.speculative_tool_calls = speculative_tool_calls
 
         # Initialize the LLM with AzureChatOpenAI using environment variables.
-        self._llm = AzureChatOpenAI(
+        if llm is None and os.getenv("AZURE_OPENAI_DEPLOYMENTS"):
+            llm = LLMRouter.from_env()
+        self._llm = llm or AzureChatOpenAI(
             api_key=os.getenv("AZURE_OPENAI_API_KEY"),
             openai_api_version=os.getenv("AZURE_OPENAI_API_VERSION"),
             openai_organization=os.getenv("AZURE_OPENAI_ORGANIZATION"),
@@ -108,25 +340,74 @@ class AgentGraph:
             azure_endpoint=os.getenv("AZURE_OPENAI_ENDPOINT"),
         )
 
-        # Set up the primary prompt with a system prompt and a messages placeholder.
+        # Set up the primary prompt: the static system prompt, the messages and
+        # the per-request context. The time is read again on every LLM call.
         self.primary_prompt = ChatPromptTemplate.from_messages(
             [
                 ("system", self.system_prompt),
                 MessagesPlaceholder(variable_name="messages"),
+                ("system", REQUEST_CONTEXT_PROMPT),
             ]
-        ).partial(time=datetime.now().strftime("%A %Y-%m-%d %H:%M:%S"))
+        ).partial(time=current_time)
 
         self._state_class = state_class
-        self._tools = tools
+        self._tools = tools or []
+        self.compiled_graph = None
+        self.checkpointer = None
 
-        # Create the state graph.
+        # Bind the tools once and create the state graph.
+        self.build_tool_bindings()
         self._graph = StateGraph(self._state_class)
         self.setup_graph()
 
+    def build_tool_bindings(self):
+        """
+        Builds the tool-dependent objects reused on every turn: the tools map,
+        the LLM with the tools bound and the ToolNode that executes them.
+        With a tool selector, its index is rebuilt and the LLMs bound to tool
+        subsets are dropped.
+
+        Tools are bound sorted by name, so the tool schemas in the prompt prefix
+        are byte-identical across requests and processes.
+        """
+        tools = sorted(self._tools, key=lambda tool: tool.name)
+        self._tools_map = {tool.name: tool for tool in tools}
+        self._tools_fingerprint = fingerprint(
+            [(tool.name, tool.description) for tool in tools]
+        )
+        self._llm_with_tools = self._llm.bind_tools(
+            tools, parallel_tool_calls=self.parallel_tool_calls
+        )
+        self._tool_node = ToolNode(tools)
+        self._bound_variants: OrderedDict[tuple[str, ...], Runnable] = OrderedDict()
+        if self.tool_selector is not None:
+            self.tool_selector.build_index(tools)
+
+    def invalidate_tools(self, tools: list[StructuredTool] | None = None):
+        """
+        Rebuilds the cached tool bindings and the graph after the tool set changed.
+        Pass `tools` to replace the tool set; the graph is recompiled if it was
+        already compiled.
+        """
+        if tools is not None:
+            self._tools = tools
+        self.build_tool_bindings()
+        self._graph = StateGraph(self._state_class)
+        self.setup_graph()
+        if self.compiled_graph is not None:
+            self.compile()
+
     def setup_graph(self):
         """Sets up the graph with the appropriate nodes and transitions."""
         # Create the assistant node using the pre-existing Assistant class.
-        assistant = Assistant(self.llm_with_tools, self.primary_prompt)
+        assistant = Assistant(
+            self.llm_with_tools,
+            self.primary_prompt,
+            timeout=self.llm_timeout,
+            context_budget=self.context_budget,
+            retry_policy=self.retry_policy,
+            select_llm=self.select_llm if self.tool_selector else None,
+        )
         self._graph.add_node("assistant", assistant)
 
         # Create tool nodes and add them to the graph.
@@ -141,82 +422,550 @@ class AgentGraph:
     @property
     def tools_map(self):
         """Returns a mapping of tool names to tool instances."""
-        return {tool.name: tool for tool in self._tools}
+        return self._tools_map
 
     @property
     def llm_with_tools(self):
-        """Binds the available tools to the LLM (parallel tool calls disabled)."""
-        return self._llm.bind_tools(self._tools, parallel_tool_calls=False)
+        """Returns the LLM with the tools bound (parallel tool calls opt-in)."""
+        return self._llm_with_tools
+
+    def select_llm(self, messages: list[AnyMessage]) -> Runnable:
+        """
+        Returns the LLM bound to the tools the tool selector picks for the
+        conversation, or to all tools if it picks none. Bound variants are kept
+        in a bounded LRU cache, keyed by the selected tool names.
+        """
+        if self.tool_selector is None or len(self._tools) <= self.tool_selector.top_k:
+            return self.llm_with_tools
+        names = self.tool_selector.select(messages)
+        if not names:
+            # Nothing matched; fall back to the whole catalog rather than no tools.
+            return self.llm_with_tools
+        variant = self._bound_variants.get(names)
+        if variant is None:
+            variant = self._llm.bind_tools(
+                [self.tools_map[name] for name in names],
+                parallel_tool_calls=self.parallel_tool_calls,
+            )
+            self._bound_variants[names] = variant
+            if len(self._bound_variants) > self.max_bound_variants:
+                self._bound_variants.popitem(last=False)
+        else:
+            self._bound_variants.move_to_end(names)
+        logger.info("Selected %d of %d tools: %s", len(names), len(self._tools), names)
+        return variant
 
-    async def tool_node(self, state: dict, config: RunnableConfig):
+    async def tool_node(
+        self, state: dict, config: RunnableConfig, *, store: BaseStore | None = None
+    ):
         """
-        Invokes a tool node using the last message from the assistant and
-        returns a command to continue with the assistant node.
+        Invokes a tool node and returns a command to continue with the assistant node.
+
+        In parallel mode each node receives a single tool call through a `Send`,
+        along with the graph state; otherwise the tool calls of the last assistant
+        message are executed concurrently, and their messages are returned in the
+        order of the calls.
         """
-        tool_node = ToolNode(self._tools)
-        tool_node_output = await tool_node.ainvoke(
-            {"messages": [state["messages"][-1]]}, config=config
+        if "tool_call" in state:
+            tool_calls = [state["tool_call"]]
+            state = {key: value for key, value in state.items() if key != "tool_call"}
+        else:
+            tool_calls = state["messages"][-1].tool_calls
+        tool_messages = await asyncio.gather(
+            *(
+                self._run_tool_call(tool_call, config, state, store)
+                for tool_call in tool_calls
+            )
         )
-        tool_messages = tool_node_output.get("messages")
         return Command(update={"messages": tool_messages}, goto="assistant")
 
+    async def _run_tool_call(
+        self,
+        tool_call: dict,
+        config: RunnableConfig,
+        state: dict,
+        store: BaseStore | None,
+    ):
+        """
+        Runs a single tool call, or awaits its speculative execution. Start and
+        end events are written to the graph's custom stream for AgentGraph.stream,
+        the call's wall time and payload sizes to the turn's metrics, and its
+        sources and arguments to the turn's tool results.
+        """
+        write_event = get_stream_writer()
+        write_event(
+            ToolStartEvent(
+                tool_name=tool_call["name"],
+                tool_call_id=tool_call["id"],
+                args=tool_call["args"],
+            )
+        )
+        speculation = get_speculation(config)
+        speculative = speculation.claim(tool_call["id"]) if speculation else None
+        with time_node(config, tool_call["name"], tool_call["id"]) as timer:
+            timer.record(
+                input_bytes=len(json.dumps(tool_call["args"], default=str).encode())
+            )
+            if speculative is not None:
+                tool_message = (await speculative.task).model_copy(
+                    update={"tool_call_id": tool_call["id"]}
+                )
+                timer.record(
+                    speculative=True,
+                    speculative_time_saved=speculative.time_saved(),
+                )
+            else:
+                tool_message = await self._execute_tool_call(
+                    tool_call, config, state, store
+                )
+            timer.record(
+                output_bytes=payload_size([tool_message]), status=tool_message.status
+            )
+        if (tool_results := get_turn_tool_results(config)) is not None:
+            tool_results.add(tool_message, timer.wall_time)
+        write_event(
+            ToolEndEvent(
+                tool_name=tool_call["name"],
+                tool_call_id=tool_call["id"],
+                duration=timer.wall_time,
+                status=tool_message.status,
+            )
+        )
+        return tool_message
+
+    async def _execute_tool_call(
+        self,
+        tool_call: dict,
+        config: RunnableConfig,
+        state: dict | None = None,
+        store: BaseStore | None = None,
+    ) -> ToolMessage:
+        """
+        Executes a tool call with the tool node, enforcing the tool's timeout.
+        With a state, the tool's InjectedState and InjectedStore arguments are
+        filled in first, as the tool node does for a whole state.
+        """
+        if state is not None:
+            tool_call = self._tool_node.inject_tool_args(tool_call, state, store)
+        tool = self.tools_map.get(tool_call["name"])
+        timeout = getattr(tool, "timeout", None) or self.tool_timeout
+        try:
+            async with asyncio.timeout(timeout):
+                tool_node_output = await self._tool_node.ainvoke(
+                    [tool_call], config=config
+                )
+            return tool_node_output.get("messages")[0]
+        except TimeoutError:
+            error = f"{tool_call['name']} timed out after {timeout} seconds"
+            logger.error("TOOL ERROR: %s", error)
+            return ToolMessage(
+                content=f"Error: {error}.",
+                name=tool_call["name"],
+                tool_call_id=tool_call["id"],
+                status="error",
+            )
+
+    def _is_side_effect_free(self, tool_name: str) -> bool:
+        """
+        Whether a tool may be called speculatively. Tools with injected state or
+        store arguments are not, since those only exist in the tool node.
+        """
+        if self._tool_node.tool_to_state_args.get(
+            tool_name
+        ) or self._tool_node.tool_to_store_arg.get(tool_name):
+            return False
+        return getattr(self.tools_map.get(tool_name), "side_effect_free", False)
+
     def tools_condition(self, state: dict):
         """
         Examines the last message for a tool call.
         Returns the tool name if one is detected, otherwise returns '__end__'.
+
+        In parallel mode, every tool call is sent to its tool node at once. The
+        resulting ToolMessages are merged back in the order of the tool calls.
         """
         if isinstance(state["messages"], list):
             ai_message = state["messages"][-1]
             if hasattr(ai_message, "tool_calls") and len(ai_message.tool_calls) > 0:
+                if self.parallel_tool_calls:
+                    return [
+                        Send(tool_call["name"], {**state, "tool_call": tool_call})
+                        for tool_call in ai_message.tool_calls
+                    ]
                 return ai_message.tool_calls[0]["name"]
         else:
             raise ValueError(f"No messages found in input state: {state}")
         return "__end__"
 
-    def compile(self):
-        """Compiles the underlying state graph."""
-        self.compiled_graph = self._graph.compile()
+    def compile(self, checkpointer: BaseCheckpointSaver | None = None):
+        """
+        Compiles the underlying state graph. With a checkpointer, conversation
+        state is persisted per thread id and callers only send the new message.
+        """
+        if checkpointer is not None:
+            self.checkpointer = checkpointer
+        self.compiled_graph = self._graph.compile(checkpointer=self.checkpointer)
+
+    def _prepare_input(
+        self,
+        chat_history: list[AnyMessage],
+        message: str,
+        runtime_config: dict[str, Any] | None,
+        thread_id: str | None = None,
+        recorder: TurnRecorder | None = None,
+    ):
+        """
+        Builds the graph input and the config for a single turn. The config is a
+        new dict merging the runtime configuration into the read-only base
+        config, so concurrent turns never see each other's configurable values.
+
+        The per-turn helpers (TurnToolResults, the TurnRecorder and, when enabled,
+        SpeculativeToolCalls) reach the nodes through private "__" keys of
+        config["configurable"], which checkpointers do not persist; nodes look
+        them up with get_turn_tool_results, get_turn_recorder and get_speculation.
+        """
+        configurable = {**self.config["configurable"], **(runtime_config or {})}
+        configurable[TOOL_RESULTS_CONFIG_KEY] = TurnToolResults()
+        if thread_id is not None:
+            configurable["thread_id"] = thread_id
+        if recorder is not None:
+            configurable[METRICS_CONFIG_KEY] = recorder
+        if self.speculative_tool_calls:
+            configurable[SPECULATION_CONFIG_KEY] = SpeculativeToolCalls(
+                self._execute_tool_call, self._is_side_effect_free, recorder
+            )
+        config_to_invoke = {**self.config, "configurable": configurable}
+        if self.parallel_tool_calls:
+            config_to_invoke.setdefault("max_concurrency", self.max_tool_concurrency)
+
+        human_message = HumanMessage(content=[{"type": "text", "text": message}])
+        if thread_id is None:
+            graph_input = {"messages": add_messages(chat_history, [human_message])}
+        else:
+            # The checkpointer holds the earlier turns; the state reducer appends
+            # the new message to them.
+            graph_input = {"messages": [*chat_history, human_message]}
+        return graph_input, config_to_invoke
+
+    @staticmethod
+    def _extract_tool_results(config: RunnableConfig):
+        """
+        Returns the de-duplicated sources, in order, and the details of the tool
+        calls of the current turn, as collected by its tool nodes.
+        """
+        tool_results = get_turn_tool_results(config)
+        return tool_results.sources, tool_results.tool_calls
+
+    @staticmethod
+    def _cancel_speculation(config: RunnableConfig):
+        """Cancels the turn's speculative tool calls that were never used."""
+        if (speculation := get_speculation(config)) is not None:
+            speculation.cancel()
+
+    def _emit_metrics(
+        self, recorder: TurnRecorder, status: str = "success"
+    ) -> TurnMetrics:
+        """Finalizes the turn's metrics and hands them to the metrics sink."""
+        metrics = recorder.close(status)
+        if logger.isEnabledFor(logging.INFO):
+            logger.info(
+                "Turn metrics: %s, %.3fs total, %s, %d/%d input tokens cached%s",
+                metrics.status,
+                metrics.wall_time,
+                ", ".join(
+                    f"{node.node}={node.wall_time:.3f}s" for node in metrics.nodes
+                ),
+                metrics.cached_input_tokens,
+                metrics.input_tokens,
+                (
+                    f", speculative tool calls saved"
+                    f" {metrics.speculative_time_saved:.3f}s"
+                    if metrics.speculative_hits
+                    else ""
+                ),
+            )
+        if self.metrics_sink is not None:
+            try:
+                self.metrics_sink.emit(metrics)
+            except Exception as e:
+                logger.exception("Metrics sink failed: %s", e)
+        return metrics
+
+    @contextmanager
+    def _record_turn(self, recorder: TurnRecorder):
+        """
+        Emits the metrics of a turn that ends without emitting them: with status
+        "error" if it raised, or "cancelled" if it was cancelled or its stream
+        was closed early.
+        """
+        status = "cancelled"
+        try:
+            yield
+        except Exception:
+            status = "error"
+            raise
+        finally:
+            if not recorder.closed:
+                self._emit_metrics(recorder, status)
+
+    async def _cache_scope(
+        self,
+        chat_history: list[AnyMessage],
+        message: str,
+        config: RunnableConfig,
+        thread_id: str | None,
+    ) -> str | None:
+        """
+        Returns the response cache scope of a turn, or None if the turn is not
+        cacheable: only first turns of a conversation are cached.
+        """
+        if self.response_cache is None or chat_history:
+            return None
+        if thread_id is not None and self.checkpointer is not None:
+            snapshot = await self.compiled_graph.aget_state(config)
+            if snapshot.values.get("messages"):
+                return None
+        return self.response_cache.scope(
+            message, self._tools_fingerprint, config["configurable"]
+        )
+
+    async def _cached_turn(
+        self,
+        scope: str,
+        human_message: HumanMessage,
+        config: RunnableConfig,
+        thread_id: str | None,
+        recorder: TurnRecorder,
+    ) -> CachedTurn | None:
+        """
+        Looks up a turn in the response cache. A hit is returned as the current
+        message followed by the cached answer, since it may have been cached for
+        a similar but different message; these are also written to the thread's
+        state, so the conversation can continue from it.
+        """
+        turn = await self.response_cache.aget(scope, human_message.text())
+        if turn is None:
+            return None
+        logger.info("Response cache hit")
+        turn = turn._replace(messages=[human_message, turn.messages[-1]])
+        if thread_id is not None and self.checkpointer is not None:
+            await self.compiled_graph.aupdate_state(
+                config, {"messages": turn.messages}, as_node="assistant"
+            )
+        recorder.metrics.cache_hit = True
+        return turn
+
+    async def _cache_turn(self, scope: str | None, message: str, turn: CachedTurn):
+        """Stores a turn in the response cache unless it ended in an error."""
+        if scope is None or "error" in turn.messages[-1].response_metadata:
+            return
+        await self.response_cache.aset(scope, message, turn)
 
     async def invoke(
         self,
         chat_history: list[AnyMessage],
         message: str,
-        runtime_config: dict[str, Any] = {},
+        runtime_config: dict[str, Any] | None = None,
+        thread_id: str | None = None,
     ):
         """
         Invokes the graph with the current chat history and a new human message.
         Returns the final messages, a flattened list of tool sources, and details of tool calls.
+        Sources and tool calls cover the current turn only.
+
+        When the graph is compiled with a checkpointer, pass a `thread_id` and an
+        empty `chat_history`; the earlier turns are loaded from the checkpointer.
+
+        With a response cache, repeated first turns are answered from the cache.
         """
-        logger.info(f"\n💬💬💬 {len(chat_history)} message(s) in chat history.")
-        # Merge runtime configuration with the base configuration.
-        config_to_invoke = {**self.config}
-        config_to_invoke["configurable"].update(runtime_config)
+        recorder = TurnRecorder(thread_id, self.parallel_tool_calls)
+        with (
+            log_context(turn_id=recorder.metrics.turn_id, thread_id=thread_id),
+            self._record_turn(recorder),
+        ):
+            logger.info("%d message(s) in chat history", len(chat_history))
+            graph_input, config_to_invoke = self._prepare_input(
+                chat_history, message, runtime_config, thread_id, recorder
+            )
 
-        output = await self.compiled_graph.ainvoke(
-            {
-                "messages": add_messages(
-                    chat_history,
-                    [HumanMessage(content=[{"type": "text", "text": message}])],
+            cache_scope = await self._cache_scope(
+                chat_history, message, config_to_invoke, thread_id
+            )
+            if cache_scope is not None:
+                cached = await self._cached_turn(
+                    cache_scope,
+                    graph_input["messages"][-1],
+                    config_to_invoke,
+                    thread_id,
+                    recorder,
                 )
-            },
-            config_to_invoke,
-        )
+                if cached is not None:
+                    self._emit_metrics(recorder)
+                    return cached
+
+            try:
+                output = await self.compiled_graph.ainvoke(
+                    graph_input, config_to_invoke
+                )
+            finally:
+                self._cancel_speculation(config_to_invoke)
+
+            messages: list[AnyMessage] = output.get("messages")
+            logger.info("Graph output: %s", LogPayload(messages))
+
+            self._emit_metrics(recorder)
+            flattened_sources, tool_calls = self._extract_tool_results(config_to_invoke)
+            await self._cache_turn(
+                cache_scope,
+                message,
+                CachedTurn(messages, flattened_sources, tool_calls),
+            )
+
+            return messages, flattened_sources, tool_calls
+
+    async def stream(
+        self,
+        chat_history: list[AnyMessage],
+        message: str,
+        runtime_config: dict[str, Any] | None = None,
+        thread_id: str | None = None,
+    ) -> AsyncIterator[StreamEvent]:
+        """
+        Streams the graph with the current chat history and a new human message.
+        Yields assistant token deltas, tool start and end events as they happen,
+        and finally a FinalEvent with the same values that invoke returns.
+        A response cache hit yields the whole answer as a single token event.
+        """
+        recorder = TurnRecorder(thread_id, self.parallel_tool_calls)
+        with (
+            log_context(turn_id=recorder.metrics.turn_id, thread_id=thread_id),
+            self._record_turn(recorder),
+        ):
+            logger.info("%d message(s) in chat history", len(chat_history))
+            graph_input, config_to_invoke = self._prepare_input(
+                chat_history, message, runtime_config, thread_id, recorder
+            )
+
+            cache_scope = await self._cache_scope(
+                chat_history, message, config_to_invoke, thread_id
+            )
+            if cache_scope is not None:
+                cached = await self._cached_turn(
+                    cache_scope,
+                    graph_input["messages"][-1],
+                    config_to_invoke,
+                    thread_id,
+                    recorder,
+                )
+                if cached is not None:
+                    yield TokenEvent(content=cached.messages[-1].text())
+                    yield FinalEvent(
+                        messages=cached.messages,
+                        flattened_sources=cached.flattened_sources,
+                        tool_calls=cached.tool_calls,
+                        metrics=self._emit_metrics(recorder),
+                    )
+                    return
+
+            output = {}
+            try:
+                async for mode, chunk in self.compiled_graph.astream(
+                    graph_input,
+                    config_to_invoke,
+                    stream_mode=["messages", "custom", "values"],
+                ):
+                    if mode == "messages":
+                        message_chunk, metadata = chunk
+                        if (
+                            metadata.get("langgraph_node") == "assistant"
+                            and isinstance(message_chunk, AIMessageChunk)
+                            and (text := message_chunk.text())
+                        ):
+                            yield TokenEvent(content=text)
+                    elif mode == "custom":
+                        yield chunk
+                    else:
+                        output = chunk
+            finally:
+                self._cancel_speculation(config_to_invoke)
+
+            messages: list[AnyMessage] = output.get("messages", [])
+            logger.info("Graph output: %s", LogPayload(messages))
+
+            metrics = self._emit_metrics(recorder)
+            flattened_sources, tool_calls = self._extract_tool_results(config_to_invoke)
+            await self._cache_turn(
+                cache_scope,
+                message,
+                CachedTurn(messages, flattened_sources, tool_calls),
+            )
 
-        messages: list[AnyMessage] = output.get("messages")
-        logger.info(f"\nGRAPH OUTPUT: {messages}")
+            yield FinalEvent(
+                messages=messages,
+                flattened_sources=flattened_sources,
+                tool_calls=tool_calls,
+                metrics=metrics,
+            )
 
-        # Process tool messages to extract tool names, arguments, and artifact sources.
-        tool_messages: list[ToolMessage] = filter_messages(
-            messages, include_types=("tool",)
+    def abatch(
+        self,
+        items: Iterable[BatchInput] | AsyncIterable[BatchInput],
+        max_concurrency: int = 8,
+        checkpoint_path: str | Path | None = None,
+        item_timeout: float | None = None,
+    ) -> BatchRun:
+        """
+        Runs many independent turns, e.g. recorded questions for an evaluation.
+        Items are BatchItems, dicts or `(chat_history, message[, runtime_config])`
+        tuples, from an iterable or an async stream. At most `max_concurrency`
+        turns run at once, and results are yielded as they complete:
+
+            run = graph.abatch(items, max_concurrency=16, checkpoint_path="out.jsonl")
+            async for result in run:
+                ...
+            print(run.stats)
+
+        A failing or timed-out item, or one whose LLM call failed, yields an error
+        result instead of ending the batch. With `checkpoint_path`, results are
+        appended to that JSON-lines file, and running the batch again with it
+        skips the succeeded items.
+        """
+        return BatchRun(
+            items,
+            lambda item: self._run_batch_item(item, item_timeout),
+            max_concurrency=max_concurrency,
+            checkpoint_path=checkpoint_path,
+        )
+
+    async def _run_batch_item(
+        self, item: BatchItem, timeout: float | None
+    ) -> BatchResult:
+        """Invokes the graph for one batch item, turning failures into results."""
+        start = time.perf_counter()
+        try:
+            async with asyncio.timeout(timeout):
+                messages, flattened_sources, tool_calls = await self.invoke(
+                    item.chat_history,
+                    item.message,
+                    item.runtime_config,
+                    item.thread_id,
+                )
+        except Exception as e:
+            logger.exception("Batch item %s failed: %r", item.id, e)
+            return BatchResult(
+                id=item.id,
+                status="error",
+                error=repr(e),
+                duration=time.perf_counter() - start,
+            )
+        # The assistant answers with an apology when the LLM call failed.
+        error = messages[-1].response_metadata.get("error")
+        return BatchResult(
+            id=item.id,
+            status="error" if error else "success",
+            error=error,
+            messages=messages,
+            flattened_sources=flattened_sources,
+            tool_calls=tool_calls,
+            duration=time.perf_counter() - start,
         )
-        tool_names = get_tool_names_from_messages(tool_messages)
-        tool_artifacts = list(map(validate_tool_artifact, tool_messages))
-        tool_sources = map(get_artifact_sources, tool_artifacts)
-        flattened_sources = list(set(chain.from_iterable(tool_sources)))
-        tool_args = map(get_tool_call_args, tool_artifacts)
-        tool_calls = [
-            ToolCall(tool_name=name, metadata={"args": args})
-            for name, args in zip(tool_names, tool_args)
-        ]
-
-        return messages, flattened_sources, tool_calls
@@ -0,0 +1,250 @@
+"""
+Bulk execution of conversation turns, e.g. to re-run recorded questions for
+evaluation or to pre-compute answers.
+
+A BatchRun pulls items from an iterable or async iterable and runs at most
+`max_concurrency` of them at a time, so large inputs are never loaded or
+scheduled all at once. Results are yielded in completion order. With a
+checkpoint file every result is appended to it as a JSON line as soon as it is
+available; a later run with the same file skips the items that already
+succeeded, so an interrupted batch resumes where it stopped.
+"""
+
+import asyncio
+import logging
+import statistics
+import time
+from pathlib import Path
+from typing import (
+    Any,
+    AsyncIterable,
+    AsyncIterator,
+    Awaitable,
+    Callable,
+    Iterable,
+    Literal,
+    Optional,
+    Union,
+)
+
+from langchain_core.messages import AnyMessage
+from pydantic import BaseModel, Field, ValidationError
+
+from src.tools.schemas import ToolCall, ToolSource
+
+logger = logging.getLogger(__name__)
+
+
+class BatchItem(BaseModel):
+    """
+    One turn of a batch. Items may also be given as `(chat_history, message)` or
+    `(chat_history, message, runtime_config)` tuples; their id is their position.
+    """
+
+    id: Optional[str] = None  # Stable id used to resume; defaults to the position.
+    chat_history: list[AnyMessage] = []
+    message: str
+    runtime_config: dict[str, Any] = {}
+    thread_id: Optional[str] = None
+
+
+class BatchResult(BaseModel):
+    """
+    Outcome of one batch item: the values AgentGraph.invoke returns, or the
+    error that ended the turn
+    """
+
+    id: str
+    status: Literal["success", "error"]
+    messages: list[AnyMessage] = []
+    flattened_sources: list[ToolSource] = []
+    tool_calls: list[ToolCall] = []
+    error: Optional[str] = None
+    duration: float = 0.0
+
+
+class BatchStats(BaseModel):
+    """
+    Aggregate progress of a batch run
+    """
+
+    succeeded: int = 0
+    failed: int = 0
+    skipped: int = 0  # Items completed by an earlier run with the same checkpoint.
+    wall_time: float = 0.0
+    durations: list[float] = Field(default=[], exclude=True)
+
+    @property
+    def completed(self) -> int:
+        return self.succeeded + self.failed
+
+    @property
+    def throughput(self) -> float:
+        """Completed items per second of wall time."""
+        return self.completed / self.wall_time if self.wall_time else 0.0
+
+    def latency(self, quantile: float) -> float:
+        """A quantile of the item durations, e.g. 0.95."""
+        if len(self.durations) < 2:
+            return self.durations[0] if self.durations else 0.0
+        cuts = statistics.quantiles(self.durations, n=100, method="inclusive")
+        return cuts[min(max(round(quantile * 100) - 1, 0), 98)]
+
+    def __str__(self) -> str:
+        return (
+            f"{self.succeeded} succeeded, {self.failed} failed, {self.skipped} skipped "
+            f"in {self.wall_time:.2f}s ({self.throughput:.2f} items/s, "
+            f"p50 {self.latency(0.5):.3f}s, p95 {self.latency(0.95):.3f}s)"
+        )
+
+
+BatchInput = Union[BatchItem, dict, tuple]
+
+
+def to_batch_item(item: BatchInput, index: int) -> BatchItem:
+    """Normalizes an item given as a BatchItem, dict or tuple and sets its id."""
+    if isinstance(item, tuple):
+        item = BatchItem(
+            chat_history=item[0],
+            message=item[1],
+            runtime_config=item[2] if len(item) > 2 else {},
+        )
+    elif isinstance(item, dict):
+        item = BatchItem(**item)
+    if item.id is None:
+        item = item.model_copy(update={"id": str(index)})
+    return item
+
+
+def read_checkpoint(path: Path) -> set[str]:
+    """Ids of the items a checkpoint file records as succeeded."""
+    if not path.exists():
+        return set()
+    done = set()
+    with path.open() as file:
+        for line in file:
+            try:
+                result = BatchResult.model_validate_json(line)
+            except ValidationError:
+                # A line cut short by an interrupted run.
+                continue
+            if result.status == "success":
+                done.add(result.id)
+    return done
+
+
+async def _aiter_items(
+    items: Union[Iterable[BatchInput], AsyncIterable[BatchInput]],
+) -> AsyncIterator[BatchInput]:
+    if isinstance(items, AsyncIterable):
+        async for item in items:
+            yield item
+    else:
+        for item in items:
+            yield item
+
+
+async def _completed(result: BatchResult) -> BatchResult:
+    return result
+
+
+class BatchRun:
+    """
+    An async iterator over the results of a batch, created by AgentGraph.abatch.
+    `stats` is updated as results complete. Leaving the iteration early and
+    calling `aclose` cancels the items still running.
+
+    Args:
+        items: The batch items, loaded lazily.
+        run_item: Runs one item and returns its result; must not raise.
+        max_concurrency: Maximum number of items running at once.
+        checkpoint_path: Optional JSON-lines file receiving every result; items
+            it records as succeeded are skipped.
+    """
+
+    def __init__(
+        self,
+        items: Union[Iterable[BatchInput], AsyncIterable[BatchInput]],
+        run_item: Callable[[BatchItem], Awaitable[BatchResult]],
+        max_concurrency: int = 8,
+        checkpoint_path: Optional[Union[str, Path]] = None,
+    ):
+        if max_concurrency < 1:
+            raise ValueError("max_concurrency must be at least 1")
+        self.items = items
+        self.run_item = run_item
+        self.max_concurrency = max_concurrency
+        self.checkpoint_path = Path(checkpoint_path) if checkpoint_path else None
+        self.stats = BatchStats()
+        self._results: Optional[AsyncIterator[BatchResult]] = None
+
+    def __aiter__(self) -> AsyncIterator[BatchResult]:
+        if self._results is None:
+            self._results = self._run()
+        return self._results
+
+    async def aclose(self):
+        if self._results is not None:
+            await self._results.aclose()
+
+    async def collect(self) -> list[BatchResult]:
+        """Runs the whole batch and returns the results in completion order."""
+        return [result async for result in self]
+
+    async def _run(self) -> AsyncIterator[BatchResult]:
+        done = read_checkpoint(self.checkpoint_path) if self.checkpoint_path else set()
+        checkpoint = self.checkpoint_path.open("a") if self.checkpoint_path else None
+        items = _aiter_items(self.items)
+        running: set[asyncio.Task] = set()
+        exhausted = False
+        start = time.perf_counter()
+        index = 0
+        try:
+            while running or not exhausted:
+                while not exhausted and len(running) < self.max_concurrency:
+                    try:
+                        raw = await anext(items)
+                    except StopAsyncIteration:
+                        exhausted = True
+                        break
+                    try:
+                        item = to_batch_item(raw, index)
+                    except (ValidationError, IndexError, TypeError) as e:
+                        # A malformed item fails on its own, like a failing turn.
+                        result = BatchResult(
+                            id=str(index), status="error", error=f"Invalid item: {e}"
+                        )
+                        running.add(asyncio.create_task(_completed(result)))
+                        continue
+                    finally:
+                        index += 1
+                    if item.id in done:
+                        self.stats.skipped += 1
+                        continue
+                    running.add(asyncio.create_task(self.run_item(item)))
+                if not running:
+                    break
+                finished, running = await asyncio.wait(
+                    running, return_when=asyncio.FIRST_COMPLETED
+                )
+                for task in finished:
+                    result = task.result()
+                    if result.status == "success":
+                        self.stats.succeeded += 1
+                    else:
+                        self.stats.failed += 1
+                    self.stats.durations.append(result.duration)
+                    self.stats.wall_time = time.perf_counter() - start
+                    if checkpoint is not None:
+                        checkpoint.write(result.model_dump_json() + "\n")
+                        checkpoint.flush()
+                    yield result
+            logger.info("Batch finished: %s", self.stats)
+        finally:
+            for task in running:
+                task.cancel()
+            await asyncio.gather(*running, return_exceptions=True)
+            self.stats.wall_time = time.perf_counter() - start
+            await items.aclose()
+            if checkpoint is not None:
+                checkpoint.close()
@@ -0,0 +1,118 @@
+from typing import Any, Literal, Optional
+
+import aiosqlite
+from langchain_core.runnables import RunnableConfig
+from langgraph.checkpoint.base import (
+    BaseCheckpointSaver,
+    ChannelVersions,
+    Checkpoint,
+    CheckpointMetadata,
+    CheckpointTuple,
+    get_checkpoint_id,
+)
+from langgraph.checkpoint.memory import InMemorySaver
+from langgraph.checkpoint.serde.jsonplus import JsonPlusSerializer
+from langgraph.checkpoint.sqlite.aio import AsyncSqliteSaver
+
+from src.graph.states import MessageHistory
+
+
+class InMemoryMessagesSerializer(JsonPlusSerializer):
+    """
+    Serializer for the in-memory checkpointer that keeps MessageHistory values,
+    i.e. the messages channel, by reference instead of re-encoding the whole
+    conversation on every step. Saving and loading them costs the same however
+    long the thread is. This is safe since a MessageHistory is never changed in
+    place; pending writes and other channels are encoded as usual.
+    """
+
+    def dumps_typed(self, obj: Any) -> tuple[str, Any]:
+        if isinstance(obj, MessageHistory):
+            return "messages", obj
+        return super().dumps_typed(obj)
+
+    def loads_typed(self, data: tuple[str, Any]) -> Any:
+        type_, payload = data
+        if type_ == "messages":
+            return payload
+        return super().loads_typed(data)
+
+
+class InMemoryMessagesSaver(InMemorySaver):
+    """
+    InMemorySaver that stores the message history by reference, with
+    InMemoryMessagesSerializer, and keeps the latest checkpoint id of each
+    thread so that loading a thread does not search all of its checkpoints.
+    """
+
+    def __init__(self):
+        super().__init__(serde=InMemoryMessagesSerializer())
+        self._latest: dict[tuple[str, str], str] = {}
+
+    def get_tuple(self, config: RunnableConfig) -> Optional[CheckpointTuple]:
+        configurable = config["configurable"]
+        if get_checkpoint_id(config) is None:
+            thread_id = configurable["thread_id"]
+            checkpoint_ns = configurable.get("checkpoint_ns", "")
+            checkpoint_id = self._latest.get((thread_id, checkpoint_ns))
+            if checkpoint_id is not None:
+                config = {
+                    "configurable": {
+                        "thread_id": thread_id,
+                        "checkpoint_ns": checkpoint_ns,
+                        "checkpoint_id": checkpoint_id,
+                    }
+                }
+        return super().get_tuple(config)
+
+    def put(
+        self,
+        config: RunnableConfig,
+        checkpoint: Checkpoint,
+        metadata: CheckpointMetadata,
+        new_versions: ChannelVersions,
+    ) -> RunnableConfig:
+        key = (
+            config["configurable"]["thread_id"],
+            config["configurable"]["checkpoint_ns"],
+        )
+        if checkpoint["id"] > self._latest.get(key, ""):
+            self._latest[key] = checkpoint["id"]
+        return super().put(config, checkpoint, metadata, new_versions)
+
+
+def create_checkpointer(
+    kind: Literal["memory", "sqlite"] = "memory",
+    path: str = "checkpoints.sqlite",
+) -> BaseCheckpointSaver:
+    """
+    Creates a checkpointer that persists conversation state keyed by thread id.
+
+    Args:
+        kind: "memory" keeps threads in process memory; "sqlite" stores them in
+            a local SQLite database at `path`.
+        path: Database file used by the "sqlite" checkpointer.
+
+    Note:
+        With the "memory" checkpointer, saving and loading a thread's state
+        costs the same on every turn. The "sqlite" checkpointer encodes and
+        decodes the full message history on every save and load, so its
+        per-turn cost grows with the length of the thread. With either, the
+        prompt sent to the model, and the work of formatting it, grows with
+        the thread unless a ContextBudget bounds it.
+
+        The "sqlite" checkpointer is bound to the running event loop, so it must
+        be created from within that loop (e.g. at server startup) and closed with
+        `close_checkpointer` on shutdown.
+    """
+    if kind == "memory":
+        return InMemoryMessagesSaver()
+    if kind == "sqlite":
+        return AsyncSqliteSaver(aiosqlite.connect(path))
+    raise ValueError(f"Unknown checkpointer kind: {kind}")
+
+
+async def close_checkpointer(checkpointer: BaseCheckpointSaver | None):
+    """Closes the database connection of a checkpointer, if it holds one."""
+    if isinstance(checkpointer, AsyncSqliteSaver):
+        await checkpointer.conn.close()
@@ -0,0 +1,193 @@
+import hashlib
+import json
+import logging
+from collections import OrderedDict
+from typing import Awaitable, Callable, Optional
+
+from langchain_core.language_models import BaseChatModel
+from langchain_core.messages import (
+    AIMessage,
+    AnyMessage,
+    HumanMessage,
+    SystemMessage,
+    ToolMessage,
+    get_buffer_string,
+    trim_messages,
+)
+from langgraph.constants import TAG_NOSTREAM
+from pydantic import BaseModel
+
+from src.common.tokens import count_text_tokens, preload_encoding, truncate_text
+
+logger = logging.getLogger(__name__)
+
+# Approximate number of tokens the chat format adds around every message.
+MESSAGE_OVERHEAD_TOKENS = 4
+
+
+def count_message_tokens(messages: list[AnyMessage]) -> int:
+    """Counts the tokens of a list of messages, including tool call arguments."""
+    total = 0
+    for message in messages:
+        total += MESSAGE_OVERHEAD_TOKENS + count_text_tokens(message.text())
+        if isinstance(message, AIMessage) and message.tool_calls:
+            total += count_text_tokens(json.dumps(message.tool_calls, default=str))
+    return total
+
+
+class ContextUsage(BaseModel):
+    """
+    Token accounting of a single ContextBudget pass
+    """
+
+    tokens_before: int
+    tokens_after: int
+    tokens_saved: int
+    dropped_messages: int = 0
+    truncated_tool_messages: int = 0
+    summarized: bool = False
+
+
+Summarizer = Callable[[list[AnyMessage]], Awaitable[str]]
+
+
+def create_llm_summarizer(llm: BaseChatModel, max_words: int = 150) -> Summarizer:
+    """Returns a summarizer that condenses dropped turns with the given LLM."""
+
+    async def summarize(messages: list[AnyMessage]) -> str:
+        result = await llm.ainvoke(
+            [
+                SystemMessage(
+                    content=(
+                        "Summarize the following conversation in at most "
+                        f"{max_words} words. Keep names, numbers and decisions."
+                    )
+                ),
+                HumanMessage(content=get_buffer_string(messages)),
+            ],
+            # Keeps the summary out of the graph's message stream, which would
+            # otherwise pass it on as tokens of the assistant's reply.
+            config={"run_name": "summarize_context", "tags": [TAG_NOSTREAM]},
+        )
+        return result.text()
+
+    return summarize
+
+
+class ContextBudget:
+    """
+    Keeps the messages sent to the LLM within a token budget.
+
+    Runs ahead of every model call: oversized ToolMessage contents are truncated
+    to a per-tool budget, then the oldest turns are dropped (or summarized, if a
+    summarizer is given) until the conversation fits `max_tokens`. The state
+    itself is left untouched; only the prompt sent to the model is reduced.
+
+    Args:
+        max_tokens: Token budget for the conversation messages, excluding the
+            system prompt and tool schemas.
+        tool_output_max_tokens: Default token budget for a single ToolMessage.
+        tool_output_limits: Per-tool overrides of `tool_output_max_tokens`.
+        summarizer: Optional coroutine that condenses dropped messages into a
+            summary kept at the start of the conversation.
+        summary_max_tokens: Tokens reserved for that summary.
+        summary_cache_size: Number of summaries kept, keyed by the messages
+            they condense, so the summarizer runs once for a dropped prefix
+            rather than on every model call of a turn.
+    """
+
+    def __init__(
+        self,
+        max_tokens: int = 16_000,
+        tool_output_max_tokens: int = 2_000,
+        tool_output_limits: Optional[dict[str, int]] = None,
+        summarizer: Optional[Summarizer] = None,
+        summary_max_tokens: int = 300,
+        summary_cache_size: int = 128,
+    ):
+        self.max_tokens = max_tokens
+        self.tool_output_max_tokens = tool_output_max_tokens
+        self.tool_output_limits = tool_output_limits or {}
+        self.summarizer = summarizer
+        self.summary_max_tokens = summary_max_tokens
+        self.summary_cache_size = summary_cache_size
+        self._summaries: OrderedDict[str, str] = OrderedDict()
+        preload_encoding()
+
+    def truncate_tool_output(self, message: ToolMessage) -> ToolMessage:
+        """Returns a copy of the ToolMessage cut down to its tool's budget."""
+        limit = self.tool_output_limits.get(message.name, self.tool_output_max_tokens)
+        text = message.text()
+        tokens = count_text_tokens(text)
+        if tokens <= limit:
+            return message
+        content = (
+            f"{truncate_text(text, limit)}\n"
+            f"[... truncated {tokens - limit} tokens of tool output]"
+        )
+        return message.model_copy(update={"content": content})
+
+    async def summarize(self, dropped: list[AnyMessage]) -> str:
+        """Summarizes the dropped messages, reusing the summary of the same prefix."""
+        key = hashlib.sha256(get_buffer_string(dropped).encode()).hexdigest()
+        summary = self._summaries.get(key)
+        if summary is not None:
+            self._summaries.move_to_end(key)
+            return summary
+        summary = await self.summarizer(dropped)
+        self._summaries[key] = summary
+        if len(self._summaries) > self.summary_cache_size:
+            self._summaries.popitem(last=False)
+        return summary
+
+    async def apply(
+        self, messages: list[AnyMessage]
+    ) -> tuple[list[AnyMessage], ContextUsage]:
+        """Fits the messages into the budget and reports the tokens saved."""
+        tokens_before = count_message_tokens(messages)
+
+        fitted = [
+            self.truncate_tool_output(m) if isinstance(m, ToolMessage) else m
+            for m in messages
+        ]
+        truncated = sum(a is not b for a, b in zip(messages, fitted))
+
+        dropped: list[AnyMessage] = []
+        summary_message = None
+        if count_message_tokens(fitted) > self.max_tokens:
+            budget = self.max_tokens
+            if self.summarizer:
+                budget -= self.summary_max_tokens
+            kept = trim_messages(
+                fitted,
+                max_tokens=budget,
+                token_counter=count_message_tokens,
+                strategy="last",
+                start_on="human",
+                allow_partial=False,
+            )
+            if not kept:
+                # Never drop the current turn, even if it exceeds the budget.
+                human_indexes = [
+                    i for i, m in enumerate(fitted) if isinstance(m, HumanMessage)
+                ]
+                kept = fitted[human_indexes[-1] :] if human_indexes else fitted
+            dropped = fitted[: len(fitted) - len(kept)]
+            if dropped and self.summarizer:
+                summary = await self.summarize(dropped)
+                summary_message = SystemMessage(
+                    content=f"Summary of the earlier conversation:\n{summary}"
+                )
+                kept = [summary_message, *kept]
+            fitted = kept
+
+        tokens_after = count_message_tokens(fitted)
+        usage = ContextUsage(
+            tokens_before=tokens_before,
+            tokens_after=tokens_after,
+            tokens_saved=tokens_before - tokens_after,
+            dropped_messages=len(dropped),
+            truncated_tool_messages=truncated,
+            summarized=summary_message is not None,
+        )
+        return fitted, usage
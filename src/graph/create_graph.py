@@ -4,8 +4,17 @@ import inspect
 import pkgutil
 from typing import List
 
+from langgraph.checkpoint.base import BaseCheckpointSaver
+
 from src.graph.agent_graph import AgentGraph
 from src.tools.base import MiMaizeyTool
+from src.tools.manifest import (
+    LazyTool,
+    generate_manifest,
+    load_lazy_tools,
+    read_manifest,
+    write_manifest,
+)
 
 
 def load_tools_from_directory(package_path: str) -> List[MiMaizeyTool]:
@@ -28,18 +37,37 @@ def load_tools_from_directory(package_path: str) -> List[MiMaizeyTool]:
     return tools
 
 
-def create_mimaizey_graph() -> AgentGraph:
+def load_tools_from_manifest(package_path: str) -> List[LazyTool]:
+    """
+    Load lazy proxies of the tools in the given package from its manifest, so no
+    tool module is imported until the tool is first called. A missing or stale
+    manifest is regenerated (which imports the tools once).
+    """
+    manifest = read_manifest(package_path)
+    if manifest is None:
+        try:
+            manifest = write_manifest(package_path)
+        except OSError:
+            manifest = generate_manifest(package_path)
+    return load_lazy_tools(manifest)
+
+
+def create_mimaizey_graph(
+    checkpointer: BaseCheckpointSaver | None = None,
+) -> AgentGraph:
     """
     Creates a new instance of the AgentGraph with the user's tools and configuration.
-    It automatically loads all tools from the tools directory.
+    It automatically loads all tools from the tools directory, through its manifest
+    so tool modules are only imported on first use. Pass a checkpointer (see
+    src.graph.checkpointers) to keep conversation state per thread id.
     """
-    configured_tools = load_tools_from_directory("src.tools.tool_directory")
+    configured_tools = load_tools_from_manifest("src.tools.tool_directory")
 
     graph_config = {"configurable": {}}
 
     mimaizey_instance: AgentGraph = AgentGraph(
         tools=configured_tools, config=graph_config
     )
-    mimaizey_instance.compile()
+    mimaizey_instance.compile(checkpointer=checkpointer)
 
     return mimaizey_instance
@@ -0,0 +1,57 @@
+from typing import Any, Literal, Optional, Union
+
+from langchain_core.messages import AnyMessage
+from pydantic import BaseModel
+
+from src.graph.metrics import TurnMetrics
+from src.tools.schemas import ToolCall, ToolProgressEvent, ToolSource
+
+
+class TokenEvent(BaseModel):
+    """
+    A token delta produced by the assistant node
+    """
+
+    type: Literal["token"] = "token"
+    content: str
+
+
+class ToolStartEvent(BaseModel):
+    """
+    Emitted when a tool call starts executing
+    """
+
+    type: Literal["tool_start"] = "tool_start"
+    tool_name: str
+    tool_call_id: str
+    args: dict[str, Any] = {}
+
+
+class ToolEndEvent(BaseModel):
+    """
+    Emitted when a tool call finishes, with its wall time in seconds
+    """
+
+    type: Literal["tool_end"] = "tool_end"
+    tool_name: str
+    tool_call_id: str
+    duration: float
+    status: str = "success"
+
+
+class FinalEvent(BaseModel):
+    """
+    Emitted once the graph finishes, carrying the same values as AgentGraph.invoke
+    and the metrics of the turn
+    """
+
+    type: Literal["final"] = "final"
+    messages: list[AnyMessage]
+    flattened_sources: list[ToolSource]
+    tool_calls: list[ToolCall]
+    metrics: Optional[TurnMetrics] = None
+
+
+StreamEvent = Union[
+    TokenEvent, ToolStartEvent, ToolProgressEvent, ToolEndEvent, FinalEvent
+]
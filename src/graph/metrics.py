@@ -0,0 +1,354 @@
+import json
+import threading
+import time
+import uuid
+from collections import defaultdict, deque
+from typing import Any, Optional
+
+from langchain_core.messages import AIMessage, AnyMessage
+from langchain_core.runnables import RunnableConfig
+from pydantic import BaseModel
+
+# Key of the per-turn recorder in config["configurable"]. Keys starting with "__"
+# are private to the orchestration layer and are not persisted by checkpointers.
+METRICS_CONFIG_KEY = "__turn_metrics"
+
+
+class NodeMetrics(BaseModel):
+    """
+    Metrics of a single assistant or tool-node step
+    """
+
+    node: str
+    tool_call_id: Optional[str] = None
+    started_at: float
+    wall_time: float
+    queue_time: float = 0.0
+    input_tokens: int = 0
+    cached_input_tokens: int = 0  # Input tokens served from the prompt cache.
+    output_tokens: int = 0
+    retries: int = 0
+    input_bytes: int = 0
+    output_bytes: int = 0
+    status: str = "success"
+    speculative: bool = False  # Tool call started before the model finished.
+    speculative_time_saved: float = 0.0  # Seconds it ran before the node started.
+
+
+class TurnMetrics(BaseModel):
+    """
+    Metrics of one AgentGraph turn, with a record per executed node
+    """
+
+    turn_id: str
+    thread_id: Optional[str] = None
+    started_at: float
+    wall_time: float = 0.0
+    status: str = "success"  # "error" if the turn raised, "cancelled" if abandoned.
+    cache_hit: bool = False
+    speculative_calls: int = 0
+    speculative_hits: int = 0
+    speculative_time_saved: float = 0.0  # Shortening of the tool steps.
+    nodes: list[NodeMetrics] = []
+
+    @property
+    def node_time(self) -> float:
+        """Total wall time spent inside nodes (overlapping tool calls add up)."""
+        return sum(node.wall_time for node in self.nodes)
+
+    @property
+    def input_tokens(self) -> int:
+        """Input tokens of all LLM calls of the turn."""
+        return sum(node.input_tokens for node in self.nodes)
+
+    @property
+    def cached_input_tokens(self) -> int:
+        """Input tokens of the turn served from the provider's prompt cache."""
+        return sum(node.cached_input_tokens for node in self.nodes)
+
+
+class TurnRecorder:
+    """
+    Collects NodeMetrics while a turn runs, from the assistant and tool nodes
+    and the speculative tool calls alike; `close` finalizes the turn's totals.
+
+    Queueing time is the delay between a node becoming runnable and starting:
+    tool nodes become runnable when the assistant step finishes, and the
+    assistant when the turn starts or the last tool node finishes.
+    """
+
+    def __init__(
+        self, thread_id: Optional[str] = None, parallel_tool_calls: bool = False
+    ):
+        self.parallel_tool_calls = parallel_tool_calls
+        self.metrics = TurnMetrics(
+            turn_id=str(uuid.uuid4()), thread_id=thread_id, started_at=time.time()
+        )
+        self._start = time.perf_counter()
+        self._assistant_ready_at = self._start
+        self._tools_ready_at = self._start
+        self.closed = False
+
+    @property
+    def elapsed(self) -> float:
+        """Seconds since the turn started."""
+        return time.perf_counter() - self._start
+
+    def start(self, node: str) -> tuple[float, float]:
+        """Marks the start of a node and returns its start time and queueing time."""
+        now = time.perf_counter()
+        ready_at = (
+            self._assistant_ready_at if node == "assistant" else self._tools_ready_at
+        )
+        return now, max(now - ready_at, 0.0)
+
+    def finish(self, node: str, start: float, queue_time: float, **fields) -> float:
+        """Records a finished node and returns its wall time."""
+        now = time.perf_counter()
+        if node == "assistant":
+            self._tools_ready_at = now
+        else:
+            self._assistant_ready_at = max(self._assistant_ready_at, now)
+        wall_time = now - start
+        self.metrics.nodes.append(
+            NodeMetrics(
+                node=node,
+                started_at=self.metrics.started_at + (start - self._start),
+                wall_time=wall_time,
+                queue_time=queue_time,
+                **fields,
+            )
+        )
+        return wall_time
+
+    def tool_durations(self) -> dict[str, float]:
+        """Maps each tool call id of the turn to its wall time."""
+        return {
+            node.tool_call_id: node.wall_time
+            for node in self.metrics.nodes
+            if node.tool_call_id
+        }
+
+    def speculative_time_saved(self) -> float:
+        """
+        How much speculative tool calls shortened the turn's tool steps. The
+        tool nodes between two assistant steps form a step; with parallel tool
+        calls only the slowest call of a step counts.
+        """
+        saved = 0.0
+        steps: list[list[NodeMetrics]] = [[]]
+        for node in sorted(self.metrics.nodes, key=lambda node: node.started_at):
+            if node.node == "assistant":
+                steps.append([])
+            else:
+                steps[-1].append(node)
+        for step in steps:
+            if not step:
+                continue
+            if self.parallel_tool_calls:
+                saved += max(
+                    node.wall_time + node.speculative_time_saved for node in step
+                ) - max(node.wall_time for node in step)
+            else:
+                saved += sum(node.speculative_time_saved for node in step)
+        return saved
+
+    def close(self, status: str = "success") -> TurnMetrics:
+        """Finalizes and returns the turn's metrics."""
+        self.metrics.wall_time = time.perf_counter() - self._start
+        self.metrics.status = status
+        self.metrics.speculative_time_saved = self.speculative_time_saved()
+        self.closed = True
+        return self.metrics
+
+
+def get_turn_recorder(config: RunnableConfig) -> Optional[TurnRecorder]:
+    """Returns the recorder of the running turn, if the graph was run by AgentGraph."""
+    return config.get("configurable", {}).get(METRICS_CONFIG_KEY)
+
+
+def payload_size(messages: list[AnyMessage]) -> int:
+    """Approximates the size in bytes of messages, including tool call arguments."""
+    size = 0
+    for message in messages:
+        size += len(message.text().encode())
+        if isinstance(message, AIMessage) and message.tool_calls:
+            size += len(json.dumps(message.tool_calls, default=str).encode())
+    return size
+
+
+class NodeTimer:
+    """
+    Context manager timing a node step. Fields passed to `record` are stored
+    with the step's NodeMetrics when the turn has a recorder; the wall time is
+    available afterwards either way.
+    """
+
+    def __init__(
+        self,
+        recorder: Optional[TurnRecorder],
+        node: str,
+        tool_call_id: Optional[str] = None,
+    ):
+        self.recorder = recorder
+        self.node = node
+        self.fields: dict[str, Any] = {"tool_call_id": tool_call_id}
+        self.wall_time = 0.0
+
+    def record(self, **fields: Any):
+        self.fields.update(fields)
+
+    def __enter__(self) -> "NodeTimer":
+        if self.recorder:
+            self._start, self._queue_time = self.recorder.start(self.node)
+        else:
+            self._start, self._queue_time = time.perf_counter(), 0.0
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is not None:
+            self.fields["status"] = "error"
+        if self.recorder:
+            self.wall_time = self.recorder.finish(
+                self.node, self._start, self._queue_time, **self.fields
+            )
+        else:
+            self.wall_time = time.perf_counter() - self._start
+
+
+def time_node(
+    config: RunnableConfig, node: str, tool_call_id: Optional[str] = None
+) -> NodeTimer:
+    """Returns a NodeTimer for a node step of the turn run with `config`."""
+    return NodeTimer(get_turn_recorder(config), node, tool_call_id)
+
+
+class MetricsSink:
+    """
+    Base class of metrics exporters; receives the metrics of every finished turn.
+    """
+
+    def emit(self, turn: TurnMetrics):
+        raise NotImplementedError
+
+
+class InMemoryMetricsSink(MetricsSink):
+    """Keeps the metrics of the last `maxlen` turns in memory."""
+
+    def __init__(self, maxlen: int = 1000):
+        self.turns: deque[TurnMetrics] = deque(maxlen=maxlen)
+
+    def emit(self, turn: TurnMetrics):
+        self.turns.append(turn)
+
+
+class JsonLinesMetricsSink(MetricsSink):
+    """Appends the metrics of every turn as one JSON line to a file."""
+
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.Lock()
+
+    def emit(self, turn: TurnMetrics):
+        line = json.dumps(turn.model_dump(), separators=(",", ":"))
+        with self._lock, open(self.path, "a", encoding="utf-8") as f:
+            f.write(line + "\n")
+
+
+class PrometheusMetricsSink(MetricsSink):
+    """
+    Aggregates turn metrics into Prometheus counters and histograms. Serve the
+    output of `render()` from a /metrics endpoint to have them scraped.
+    """
+
+    BUCKETS = (0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+    def __init__(self, prefix: str = "agent_graph"):
+        self.prefix = prefix
+        self._lock = threading.Lock()
+        self._histograms: dict[tuple[str, tuple], list] = {}
+        self._counters: dict[tuple[str, tuple], float] = defaultdict(float)
+
+    def _observe(self, name: str, labels: tuple, value: float):
+        histogram = self._histograms.setdefault(
+            (name, labels), [[0] * len(self.BUCKETS), 0.0, 0]
+        )
+        for i, bound in enumerate(self.BUCKETS):
+            if value <= bound:
+                histogram[0][i] += 1
+        histogram[1] += value
+        histogram[2] += 1
+
+    def emit(self, turn: TurnMetrics):
+        with self._lock:
+            self._observe("turn_duration_seconds", (), turn.wall_time)
+            self._counters[("turns_total", (("status", turn.status),))] += 1
+            self._counters[
+                ("speculative_calls_total", (("result", "hit"),))
+            ] += turn.speculative_hits
+            self._counters[("speculative_calls_total", (("result", "miss"),))] += (
+                turn.speculative_calls - turn.speculative_hits
+            )
+            self._counters[
+                ("speculative_time_saved_seconds_total", ())
+            ] += turn.speculative_time_saved
+            for node in turn.nodes:
+                labels = (("node", node.node),)
+                self._observe("node_duration_seconds", labels, node.wall_time)
+                self._observe("node_queue_seconds", labels, node.queue_time)
+                self._counters[
+                    ("node_runs_total", labels + (("status", node.status),))
+                ] += 1
+                self._counters[("node_retries_total", labels)] += node.retries
+                for direction, tokens, size in (
+                    ("input", node.input_tokens, node.input_bytes),
+                    ("output", node.output_tokens, node.output_bytes),
+                ):
+                    direction_labels = labels + (("direction", direction),)
+                    self._counters[("node_tokens_total", direction_labels)] += tokens
+                    self._counters[
+                        ("node_payload_bytes_total", direction_labels)
+                    ] += size
+                self._counters[
+                    ("node_cached_input_tokens_total", labels)
+                ] += node.cached_input_tokens
+
+    @staticmethod
+    def _format_labels(labels: tuple) -> str:
+        if not labels:
+            return ""
+        return "{" + ",".join(f'{key}="{value}"' for key, value in labels) + "}"
+
+    def render(self) -> str:
+        """Returns all metrics in the Prometheus text exposition format."""
+        lines = []
+        with self._lock:
+            for name in sorted({name for name, _ in self._histograms}):
+                lines.append(f"# TYPE {self.prefix}_{name} histogram")
+                for (metric, labels), (buckets, total, count) in sorted(
+                    self._histograms.items()
+                ):
+                    if metric != name:
+                        continue
+                    metric_name = f"{self.prefix}_{name}"
+                    for bound, bucket_count in zip(self.BUCKETS, buckets):
+                        bucket_labels = self._format_labels(labels + (("le", bound),))
+                        lines.append(
+                            f"{metric_name}_bucket{bucket_labels} {bucket_count}"
+                        )
+                    inf_labels = self._format_labels(labels + (("le", "+Inf"),))
+                    lines.append(f"{metric_name}_bucket{inf_labels} {count}")
+                    lines.append(
+                        f"{metric_name}_sum{self._format_labels(labels)} {total}"
+                    )
+                    lines.append(
+                        f"{metric_name}_count{self._format_labels(labels)} {count}"
+                    )
+            for name in sorted({name for name, _ in self._counters}):
+                lines.append(f"# TYPE {self.prefix}_{name} counter")
+                for (metric, labels), value in sorted(self._counters.items()):
+                    if metric == name:
+                        lines.append(
+                            f"{self.prefix}_{name}{self._format_labels(labels)} {value}"
+                        )
+        return "\n".join(lines) + "\n"
@@ -1,6 +1,21 @@
+from datetime import datetime
+
+# Static instructions. Together with the tool schemas they form the prompt prefix
+# that is identical on every request, so providers can serve it from their
+# prompt cache; keep per-request values out of it.
 SYSPROMPT = """
 You are a helpful assistant for the University of Michigan. You have a set of tools at your disposal to answer user queries.
 
 You can invoke the tools as many times as you need to get the correct response.
+"""
+
+# Volatile per-request context, sent after the conversation so that it does not
+# invalidate the cached prefix.
+REQUEST_CONTEXT_PROMPT = """
 Current time: {time}.
 """
+
+
+def current_time() -> str:
+    """The current local time as shown to the model, read on every LLM call."""
+    return datetime.now().strftime("%A %Y-%m-%d %H:%M:%S")
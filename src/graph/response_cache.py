@@ -0,0 +1,226 @@
+import asyncio
+import hashlib
+import json
+import logging
+import re
+from typing import Any, NamedTuple, Optional
+
+from langchain_core.embeddings import Embeddings
+from langchain_core.messages import AnyMessage
+
+from src.tools.cache import ToolResultCache
+from src.tools.schemas import ToolCall, ToolSource
+
+logger = logging.getLogger(__name__)
+
+# Questions whose answer depends on the current date or time are never cached.
+DEFAULT_BYPASS_PATTERNS = (
+    r"\b(today|tonight|tomorrow|yesterday|now|currently|current|latest|recent)\b",
+    r"\b(this|next|last) (week|weekend|month|semester|term|year)\b",
+    r"\b(open|closed|schedule|hours|deadline)s? (now|today)\b",
+    r"\bwhat (time|day|date)\b",
+)
+
+# Configurable keys that make a turn bypass the cache. None by default: turns
+# are already scoped by their configurable values, so answers are never shared
+# between different user configs.
+DEFAULT_USER_CONFIG_KEYS: tuple[str, ...] = ()
+
+
+class CachedTurn(NamedTuple):
+    """The values AgentGraph.invoke returns for a turn."""
+
+    messages: list[AnyMessage]
+    flattened_sources: list[ToolSource]
+    tool_calls: list[ToolCall]
+
+
+def normalize_message(message: str) -> str:
+    """Lowercases a message and collapses whitespace and trailing punctuation."""
+    return " ".join(message.lower().split()).rstrip("?!. ")
+
+
+def fingerprint(value: Any) -> str:
+    """Returns a short, stable hash of a JSON-serializable value."""
+    encoded = json.dumps(value, sort_keys=True, separators=(",", ":"), default=str)
+    return hashlib.sha256(encoded.encode()).hexdigest()[:16]
+
+
+class ResponseCache:
+    """
+    Cache of whole assistant turns, placed in front of AgentGraph.invoke.
+
+    Only first turns (no prior history) are cached. Entries are scoped by the
+    tool set and a fingerprint of the configurable keys, and expire after `ttl`
+    seconds. The exact layer matches the normalized message. With `embeddings`,
+    a similarity layer also answers messages whose embedding has a cosine
+    similarity of at least `similarity_threshold` with a cached message.
+
+    Turns are bypassed if the message matches one of `bypass_patterns` (answers
+    depending on the current time) or, opt-in, if any of `user_config_keys` is
+    set in the configurable keys (answers that must never be cached per user).
+
+    Embedding failures are logged and treated as misses. New messages are
+    embedded in a background task, so storing a turn never delays its answer.
+
+    Args:
+        ttl: Time to live of an entry in seconds.
+        maxsize: Maximum number of cached turns.
+        embeddings: Optional embedding model of the similarity layer. Requires
+            numpy.
+        similarity_threshold: Minimum cosine similarity of a semantic hit.
+        bypass_patterns: Regular expressions of time-dependent messages.
+        user_config_keys: Configurable keys that make a turn bypass the cache.
+    """
+
+    def __init__(
+        self,
+        ttl: float = 3600,
+        maxsize: int = 1024,
+        embeddings: Optional[Embeddings] = None,
+        similarity_threshold: float = 0.95,
+        bypass_patterns: tuple[str, ...] = DEFAULT_BYPASS_PATTERNS,
+        user_config_keys: tuple[str, ...] = DEFAULT_USER_CONFIG_KEYS,
+    ):
+        self.entries = ToolResultCache(ttl=ttl, maxsize=maxsize)
+        self.maxsize = maxsize
+        self.embeddings = embeddings
+        self.similarity_threshold = similarity_threshold
+        self.bypass_pattern = re.compile("|".join(bypass_patterns), re.IGNORECASE)
+        self.user_config_keys = user_config_keys
+        self.hits = 0
+        self.misses = 0
+        self.semantic_hits = 0
+        self._indexing: set[asyncio.Task] = set()
+        # Per scope: the cached texts and a matrix of their unit-norm embeddings.
+        self._index: dict[str, tuple[list[str], Any]] = {}
+        if embeddings is not None:
+            try:
+                import numpy  # noqa: F401
+            except ImportError as e:
+                raise ImportError(
+                    "The similarity layer of ResponseCache requires numpy."
+                ) from e
+
+    def scope(
+        self, message: str, tools_fingerprint: str, configurable: dict[str, Any]
+    ) -> Optional[str]:
+        """
+        Returns the cache scope of a turn (tool set and config fingerprint), or
+        None if the turn must bypass the cache.
+        """
+        if self.bypass_pattern.search(message):
+            return None
+        if any(configurable.get(key) is not None for key in self.user_config_keys):
+            return None
+        config = {
+            key: value
+            for key, value in configurable.items()
+            if not key.startswith("__") and key != "thread_id"
+        }
+        return f"{tools_fingerprint}:{fingerprint(config)}"
+
+    async def aget(self, scope: str, message: str) -> Optional[CachedTurn]:
+        """
+        Looks up a turn in the exact layer, then in the similarity layer. Each
+        lookup counts as one hit or one miss.
+        """
+        text = normalize_message(message)
+        cached = self.entries.get((scope, text))
+        if cached is None and self.embeddings is not None and scope in self._index:
+            cached = await self._similar(scope, text)
+            if cached is not None:
+                self.semantic_hits += 1
+        if cached is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+        return cached
+
+    async def aset(self, scope: str, message: str, turn: CachedTurn):
+        """
+        Stores a turn under the normalized message. With the similarity layer,
+        the message is embedded and indexed in a background task.
+        """
+        text = normalize_message(message)
+        self.entries.set((scope, text), turn)
+        if self.embeddings is None:
+            return
+        task = asyncio.create_task(self._add_to_index(scope, text))
+        self._indexing.add(task)
+        task.add_done_callback(self._indexing.discard)
+
+    async def wait_indexed(self):
+        """Waits until the messages stored so far are in the similarity index."""
+        while self._indexing:
+            await asyncio.gather(*self._indexing)
+
+    async def _similar(self, scope: str, text: str) -> Optional[CachedTurn]:
+        import numpy as np
+
+        vector = await self._embed(text)
+        if vector is None:
+            return None
+        texts, matrix = self._index[scope]
+        similarities = matrix @ vector
+        best = int(np.argmax(similarities))
+        if similarities[best] < self.similarity_threshold:
+            return None
+        cached = self.entries.get((scope, texts[best]))
+        if cached is None:
+            # The entry expired or was evicted; drop it from the index.
+            self._remove(scope, best)
+        return cached
+
+    async def _add_to_index(self, scope: str, text: str):
+        import numpy as np
+
+        vector = await self._embed(text)
+        if vector is None:
+            return
+        texts, matrix = self._index.get(scope, ([], np.empty((0, len(vector)))))
+        if text in texts:
+            return
+        texts = [*texts, text][-self.maxsize :]
+        matrix = np.vstack([matrix, vector])[-self.maxsize :]
+        self._index[scope] = (texts, matrix)
+
+    async def _embed(self, text: str):
+        """Returns the unit-norm embedding of a text, or None if embedding fails."""
+        import numpy as np
+
+        try:
+            vector = await self.embeddings.aembed_query(text)
+        except Exception as e:
+            logger.warning("Response cache embedding failed, skipping: %r", e)
+            return None
+        vector = np.asarray(vector, dtype=float)
+        return vector / (np.linalg.norm(vector) or 1.0)
+
+    def _remove(self, scope: str, row: int):
+        import numpy as np
+
+        texts, matrix = self._index[scope]
+        self._index[scope] = (
+            texts[:row] + texts[row + 1 :],
+            np.delete(matrix, row, axis=0),
+        )
+
+    def clear(self):
+        """Drops every cached turn."""
+        self.entries.clear()
+        self._index.clear()
+
+    def stats(self) -> dict[str, int]:
+        """
+        Returns the lookup counters, of which `semantic_hits` were answered by
+        the similarity layer, and the evictions and size of the entries.
+        """
+        entries = self.entries.stats()
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "semantic_hits": self.semantic_hits,
+            "evictions": entries["evictions"],
+            "size": entries["size"],
+        }
@@ -0,0 +1,49 @@
+import random
+from typing import Optional
+
+import httpx
+from pydantic import BaseModel
+
+from src.common.http import retry_after
+
+
+class RetryPolicy(BaseModel):
+    """
+    Retry policy of the assistant's LLM calls. Empty responses and errors with a
+    retryable status code (rate limits and server errors) are retried with
+    jittered exponential backoff, waiting as long as a Retry-After header asks
+    for, until `max_attempts` is reached. Retries stop early when the wait would
+    run past the turn's optional `deadline` or a Retry-After exceeds
+    `max_retry_after`.
+    """
+
+    max_attempts: int = 3
+    backoff: float = 0.5
+    max_backoff: float = 8.0  # Cap of the computed backoff, not of Retry-After.
+    max_retry_after: float = 60.0
+    deadline: Optional[float] = None  # Seconds from the start of the turn.
+    retry_statuses: tuple[int, ...] = (429, 500, 502, 503, 504)
+
+    def delay(self, attempt: int, retry_after: Optional[float] = None) -> float:
+        """Returns the wait before the retry following the given attempt (from 0)."""
+        if retry_after is not None:
+            return retry_after
+        return min(
+            self.backoff * 2**attempt * random.uniform(0.5, 1.5), self.max_backoff
+        )
+
+
+def error_status(error: Exception) -> Optional[int]:
+    """Returns the HTTP status code carried by an API error, if any."""
+    status = getattr(error, "status_code", None)
+    if status is None:
+        status = getattr(getattr(error, "response", None), "status_code", None)
+    return status if isinstance(status, int) else None
+
+
+def error_retry_after(error: Exception) -> Optional[float]:
+    """Returns the Retry-After delay of an API error's response, if any."""
+    response = getattr(error, "response", None)
+    if isinstance(response, httpx.Response):
+        return retry_after(response)
+    return None
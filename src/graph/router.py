@@ -0,0 +1,303 @@
+import asyncio
+import copy
+import json
+import logging
+import os
+import random
+import threading
+import time
+from collections import deque
+from typing import Any, Literal, Optional
+
+import httpx
+import openai
+from langchain_core.language_models import BaseChatModel, LanguageModelInput
+from langchain_core.messages import BaseMessage
+from langchain_core.runnables import Runnable, RunnableConfig
+from langchain_openai import AzureChatOpenAI
+from pydantic import BaseModel, ConfigDict
+
+from src.graph.retry import error_retry_after, error_status
+
+logger = logging.getLogger(__name__)
+
+FAILOVER_STATUSES = (429, 500, 502, 503, 504)
+
+
+class Deployment(BaseModel):
+    """
+    A chat model deployment the router can send requests to.
+
+    Either pass `llm` (e.g. a local fake model) or the Azure `endpoint` and
+    `deployment_name`; the API key and version default to the environment.
+    `tpm` and `rpm` are the deployment's tokens- and requests-per-minute quotas.
+    """
+
+    model_config = ConfigDict(arbitrary_types_allowed=True)
+
+    name: str
+    endpoint: Optional[str] = None
+    deployment_name: Optional[str] = None
+    api_key: Optional[str] = None
+    api_version: Optional[str] = None
+    weight: float = 1.0
+    tpm: Optional[int] = None
+    rpm: Optional[int] = None
+    llm: Optional[BaseChatModel] = None
+
+    def create_llm(self) -> BaseChatModel:
+        """Returns the deployment's chat model, building the Azure client if needed."""
+        if self.llm is not None:
+            return self.llm
+        return AzureChatOpenAI(
+            api_key=self.api_key or os.getenv("AZURE_OPENAI_API_KEY"),
+            openai_api_version=self.api_version
+            or os.getenv("AZURE_OPENAI_API_VERSION"),
+            openai_organization=os.getenv("AZURE_OPENAI_ORGANIZATION"),
+            deployment_name=self.deployment_name,
+            azure_endpoint=self.endpoint,
+            # The router fails over instead of retrying on the same deployment.
+            max_retries=0,
+        )
+
+
+class DeploymentHealth:
+    """
+    Load, latency and quota bookkeeping of one deployment.
+
+    A failed call puts the deployment in a cooldown (Retry-After, or an
+    exponentially growing delay for consecutive failures) during which it only
+    receives traffic if every other deployment is unavailable.
+    """
+
+    def __init__(self, deployment: Deployment):
+        self.deployment = deployment
+        self.outstanding = 0
+        self.latency: Optional[float] = None  # Exponential moving average.
+        self.successes = 0
+        self.failures = 0
+        self.consecutive_failures = 0
+        self.cooldown_until = 0.0
+        self._requests: deque[float] = deque()
+        self._tokens: deque[tuple[float, int]] = deque()
+
+    def _prune(self, now: float):
+        while self._requests and self._requests[0] <= now - 60:
+            self._requests.popleft()
+        while self._tokens and self._tokens[0][0] <= now - 60:
+            self._tokens.popleft()
+
+    def available(self, now: float) -> bool:
+        """Whether the deployment is healthy and within its quotas."""
+        if now < self.cooldown_until:
+            return False
+        self._prune(now)
+        if (
+            self.deployment.rpm is not None
+            and len(self._requests) >= self.deployment.rpm
+        ):
+            return False
+        if self.deployment.tpm is not None:
+            if sum(tokens for _, tokens in self._tokens) >= self.deployment.tpm:
+                return False
+        return True
+
+    def start(self, now: float):
+        self.outstanding += 1
+        self._requests.append(now)
+
+    def succeed(self, now: float, latency: float, tokens: int):
+        self.outstanding -= 1
+        self.successes += 1
+        self.consecutive_failures = 0
+        self.latency = (
+            latency if self.latency is None else 0.8 * self.latency + 0.2 * latency
+        )
+        if tokens:
+            self._tokens.append((now, tokens))
+
+    def fail(self, now: float, cooldown: float):
+        self.outstanding -= 1
+        self.failures += 1
+        self.consecutive_failures += 1
+        self.cooldown_until = now + cooldown
+
+    def stats(self) -> dict[str, Any]:
+        return {
+            "outstanding": self.outstanding,
+            "latency": self.latency,
+            "successes": self.successes,
+            "failures": self.failures,
+            "cooling_down": time.monotonic() < self.cooldown_until,
+        }
+
+
+def is_failover_error(error: Exception) -> bool:
+    """Whether a call error should be retried on another deployment."""
+    if isinstance(error, (openai.APIConnectionError, httpx.TransportError)):
+        return True
+    return error_status(error) in FAILOVER_STATUSES
+
+
+class LLMRouter(Runnable[LanguageModelInput, BaseMessage]):
+    """
+    Routes chat model calls across several deployments.
+
+    Each call goes to an available deployment (not cooling down after a failure
+    and within its TPM/RPM quota), chosen by the fewest outstanding requests per
+    unit of weight ("least_outstanding") or at random by weight ("weighted").
+    Rate limits, server errors and connection errors fail over to the next
+    deployment; once every deployment has failed the last error is raised, so
+    the assistant's retry policy can back off.
+
+    Use it in place of a chat model: `bind_tools` binds the tools to every
+    deployment and returns a router sharing the same health state.
+
+    Args:
+        deployments: The deployments to route across.
+        strategy: "least_outstanding" or "weighted".
+        cooldown: Base cooldown in seconds after a failure; doubles with each
+            consecutive failure, up to `max_cooldown`.
+        max_cooldown: Upper bound of the cooldown in seconds.
+    """
+
+    def __init__(
+        self,
+        deployments: list[Deployment],
+        strategy: Literal["least_outstanding", "weighted"] = "least_outstanding",
+        cooldown: float = 5.0,
+        max_cooldown: float = 60.0,
+    ):
+        if not deployments:
+            raise ValueError("LLMRouter needs at least one deployment")
+        self.strategy = strategy
+        self.cooldown = cooldown
+        self.max_cooldown = max_cooldown
+        self.health = {d.name: DeploymentHealth(d) for d in deployments}
+        self._models: dict[str, Runnable] = {
+            d.name: d.create_llm() for d in deployments
+        }
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_env(cls, variable: str = "AZURE_OPENAI_DEPLOYMENTS") -> "LLMRouter":
+        """
+        Builds a router from a JSON list of deployments in an environment
+        variable, e.g. '[{"name": "east", "endpoint": "...", "deployment_name":
+        "gpt-4o", "weight": 2, "tpm": 150000}]'.
+        """
+        deployments = [
+            Deployment(**entry) for entry in json.loads(os.environ[variable])
+        ]
+        return cls(deployments)
+
+    def bind_tools(self, tools: list, **kwargs: Any) -> "LLMRouter":
+        """Returns a router whose deployments have the tools bound."""
+        router = copy.copy(self)
+        router._models = {
+            name: model.bind_tools(tools, **kwargs)
+            for name, model in self._models.items()
+        }
+        return router
+
+    def stats(self) -> dict[str, dict[str, Any]]:
+        """Returns the load and health counters of every deployment."""
+        return {name: health.stats() for name, health in self.health.items()}
+
+    def _select(self, tried: set[str]) -> Optional[str]:
+        """Picks the deployment for the next attempt and marks it as started."""
+        with self._lock:
+            now = time.monotonic()
+            remaining = [h for name, h in self.health.items() if name not in tried]
+            if not remaining:
+                return None
+            candidates = [h for h in remaining if h.available(now)]
+            if not candidates:
+                # Every untried deployment is cooling down or over quota: use the
+                # one that recovers first rather than failing the request.
+                candidates = [min(remaining, key=lambda h: h.cooldown_until)]
+            if self.strategy == "weighted":
+                chosen = random.choices(
+                    candidates, weights=[h.deployment.weight for h in candidates]
+                )[0]
+            else:
+                chosen = min(
+                    candidates,
+                    key=lambda h: (
+                        h.outstanding / h.deployment.weight,
+                        h.latency or 0.0,
+                    ),
+                )
+            chosen.start(now)
+            return chosen.deployment.name
+
+    def _succeed(self, name: str, started: float, result: BaseMessage):
+        usage = getattr(result, "usage_metadata", None) or {}
+        now = time.monotonic()
+        with self._lock:
+            self.health[name].succeed(now, now - started, usage.get("total_tokens", 0))
+
+    def _fail(self, name: str, error: Exception):
+        health = self.health[name]
+        cooldown = error_retry_after(error)
+        if cooldown is None:
+            cooldown = self.cooldown * 2**health.consecutive_failures
+        cooldown = min(cooldown, self.max_cooldown)
+        logger.warning(
+            "Deployment %s failed (%r), cooling down for %.1fs", name, error, cooldown
+        )
+        with self._lock:
+            health.fail(time.monotonic(), cooldown)
+
+    def _release(self, name: str):
+        with self._lock:
+            self.health[name].outstanding -= 1
+
+    async def ainvoke(
+        self,
+        input: LanguageModelInput,
+        config: Optional[RunnableConfig] = None,
+        **kwargs: Any,
+    ) -> BaseMessage:
+        tried: set[str] = set()
+        while (name := self._select(tried)) is not None:
+            tried.add(name)
+            started = time.monotonic()
+            try:
+                result = await self._models[name].ainvoke(input, config, **kwargs)
+            except asyncio.CancelledError:
+                self._release(name)
+                raise
+            except Exception as e:
+                if not is_failover_error(e):
+                    self._release(name)
+                    raise
+                self._fail(name, e)
+                if len(tried) == len(self.health):
+                    raise
+                continue
+            self._succeed(name, started, result)
+            return result
+
+    def invoke(
+        self,
+        input: LanguageModelInput,
+        config: Optional[RunnableConfig] = None,
+        **kwargs: Any,
+    ) -> BaseMessage:
+        tried: set[str] = set()
+        while (name := self._select(tried)) is not None:
+            tried.add(name)
+            started = time.monotonic()
+            try:
+                result = self._models[name].invoke(input, config, **kwargs)
+            except Exception as e:
+                if not is_failover_error(e):
+                    self._release(name)
+                    raise
+                self._fail(name, e)
+                if len(tried) == len(self.health):
+                    raise
+                continue
+            self._succeed(name, started, result)
+            return result
@@ -0,0 +1,195 @@
+"""
+Speculative execution of tool calls while the model is still responding.
+
+With speculation enabled, the assistant's LLM call streams, and a ToolCallWatcher
+follows the streamed tool-call chunks. As soon as a call's name and arguments
+parse, and the tool is marked side-effect-free, the call is started in the
+background. Once the response is complete, speculative calls that match a final
+tool call (same name and arguments) are handed to the tool node, which awaits
+them instead of starting the tool; the others are cancelled.
+"""
+
+import asyncio
+import json
+import logging
+import time
+from typing import Any, Awaitable, Callable, Optional
+
+from langchain_core.callbacks import AsyncCallbackHandler
+from langchain_core.messages import AIMessageChunk, ToolMessage
+from langchain_core.outputs import ChatGenerationChunk
+from langchain_core.runnables import RunnableConfig
+from langchain_core.runnables.config import merge_configs, patch_config
+
+from src.graph.metrics import TurnRecorder
+
+logger = logging.getLogger(__name__)
+
+# Key of the per-turn SpeculativeToolCalls in config["configurable"].
+SPECULATION_CONFIG_KEY = "__speculative_tool_calls"
+
+
+def call_key(name: str, args: dict[str, Any]) -> str:
+    return json.dumps([name, args], sort_keys=True, default=str)
+
+
+class SpeculativeCall:
+    """A tool call started before the model finished, with its timing."""
+
+    def __init__(self, task: asyncio.Task):
+        self.task = task
+        self.started_at = time.perf_counter()
+        self.finished_at: Optional[float] = None
+        self.claimed_at: Optional[float] = None
+        task.add_done_callback(self._finished)
+
+    def _finished(self, task: asyncio.Task):
+        self.finished_at = time.perf_counter()
+        if not task.cancelled():
+            # Marks the exception of an unclaimed call as retrieved.
+            task.exception()
+
+    def time_saved(self) -> float:
+        """Seconds the call ran before the tool node claimed its result."""
+        claimed_at = self.claimed_at or time.perf_counter()
+        return min(self.finished_at or claimed_at, claimed_at) - self.started_at
+
+
+class ToolCallWatcher(AsyncCallbackHandler):
+    """
+    Callback handler of one LLM call that starts each streamed tool call once
+    its arguments are complete JSON.
+    """
+
+    def __init__(self, speculation: "SpeculativeToolCalls", config: RunnableConfig):
+        self.speculation = speculation
+        self.config = config
+        self._message: Optional[AIMessageChunk] = None
+        self._last_chunk: Optional[ChatGenerationChunk] = None
+
+    async def on_llm_new_token(
+        self, token: str, *, chunk: Optional[ChatGenerationChunk] = None, **kwargs
+    ):
+        # Models may report the same chunk twice: from their stream and from the
+        # chat model base class.
+        if chunk is None or chunk is self._last_chunk:
+            return
+        self._last_chunk = chunk
+        if not isinstance(chunk.message, AIMessageChunk):
+            return
+        self._message = (
+            chunk.message if self._message is None else self._message + chunk.message
+        )
+        for call in self._message.tool_call_chunks:
+            if not call.get("name"):
+                continue
+            try:
+                args = json.loads(call.get("args") or "")
+            except ValueError:
+                continue
+            if isinstance(args, dict):
+                self.speculation.start(
+                    {
+                        "name": call["name"],
+                        "args": args,
+                        "id": call.get("id") or "",
+                        "type": "tool_call",
+                    },
+                    self.config,
+                )
+
+
+class SpeculativeToolCalls:
+    """
+    Per-turn registry of speculative tool calls: the assistant node starts and
+    reconciles them, and the tool nodes claim the ones matching a final call.
+
+    Args:
+        run: Runs a tool call and returns its ToolMessage.
+        is_eligible: Whether a tool, by name, may run speculatively.
+        recorder: The turn's recorder, receiving the speculation counts.
+    """
+
+    def __init__(
+        self,
+        run: Callable[[dict, RunnableConfig], Awaitable[ToolMessage]],
+        is_eligible: Callable[[str], bool],
+        recorder: Optional[TurnRecorder] = None,
+    ):
+        self.run = run
+        self.is_eligible = is_eligible
+        self.recorder = recorder
+        self._started: dict[str, SpeculativeCall] = {}
+        self._claimable: dict[str, SpeculativeCall] = {}
+
+    def watch(self, config: RunnableConfig) -> RunnableConfig:
+        """Returns the config of an LLM call with a ToolCallWatcher attached."""
+        return merge_configs(config, {"callbacks": [ToolCallWatcher(self, config)]})
+
+    def start(self, tool_call: dict, config: RunnableConfig):
+        """Starts a tool call in the background unless it already started."""
+        key = call_key(tool_call["name"], tool_call["args"])
+        if key in self._started or not self.is_eligible(tool_call["name"]):
+            return
+        logger.info("Speculatively starting %s", tool_call["name"])
+        self._started[key] = SpeculativeCall(
+            asyncio.create_task(
+                self.run(tool_call, self._tool_config(config, tool_call["name"]))
+            )
+        )
+        if self.recorder is not None:
+            self.recorder.metrics.speculative_calls += 1
+
+    @staticmethod
+    def _tool_config(config: RunnableConfig, tool_name: str) -> RunnableConfig:
+        """
+        Returns the config of a speculative call: a child run of the assistant
+        node, named and labelled like the tool node that claims its result, so
+        that the tool's callbacks, e.g. the messages of an LLM it calls, are not
+        streamed as the assistant's.
+        """
+        return patch_config(
+            merge_configs(
+                config,
+                {"metadata": {"langgraph_node": tool_name}, "tags": ["speculative"]},
+            ),
+            run_name=tool_name,
+        )
+
+    def reconcile(self, tool_calls: list[dict]):
+        """
+        Matches the final tool calls of a response with the speculative calls;
+        the unmatched speculative calls are cancelled.
+        """
+        for tool_call in tool_calls:
+            call = self._started.pop(
+                call_key(tool_call["name"], tool_call["args"]), None
+            )
+            if call is not None:
+                self._claimable[tool_call["id"]] = call
+        self._cancel(self._started)
+
+    def claim(self, tool_call_id: str) -> Optional[SpeculativeCall]:
+        """Returns the speculative call answering a final tool call, if any."""
+        call = self._claimable.pop(tool_call_id, None)
+        if call is not None:
+            call.claimed_at = time.perf_counter()
+            if self.recorder is not None:
+                self.recorder.metrics.speculative_hits += 1
+        return call
+
+    def cancel(self):
+        """Cancels every speculative call that was not claimed."""
+        self._cancel(self._started)
+        self._cancel(self._claimable)
+
+    @staticmethod
+    def _cancel(calls: dict[str, SpeculativeCall]):
+        for call in calls.values():
+            call.task.cancel()
+        calls.clear()
+
+
+def get_speculation(config: RunnableConfig) -> Optional[SpeculativeToolCalls]:
+    """Returns the running turn's speculative calls, if speculation is enabled."""
+    return config.get("configurable", {}).get(SPECULATION_CONFIG_KEY)
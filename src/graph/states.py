@@ -1,8 +1,92 @@
-from typing import Annotated, TypedDict
+import uuid
+from typing import Annotated, Optional, TypedDict
 
-from langchain_core.messages import AnyMessage
-from langgraph.graph.message import add_messages
+from langchain_core.messages import (
+    AnyMessage,
+    RemoveMessage,
+    convert_to_messages,
+    message_chunk_to_message,
+)
+from langgraph.graph.message import Messages, add_messages
+
+# Position of an id appended at different positions by diverging histories.
+_AMBIGUOUS = -1
+
+
+class _MessageIndex:
+    """
+    Positions of the message ids of a history, shared by the histories appended
+    to it. Histories appended to the same one, e.g. when a write is applied
+    again, add their ids to the same index; an id they place at different
+    positions is marked ambiguous.
+    """
+
+    __slots__ = ("positions",)
+
+    def __init__(self, messages: list[AnyMessage]):
+        self.positions = {m.id: i for i, m in enumerate(messages) if m.id is not None}
+
+    def may_contain(self, messages: list[AnyMessage], message_id: str) -> bool:
+        """Whether `messages` has the id, or the id is ambiguous."""
+        position = self.positions.get(message_id)
+        if position is None:
+            return False
+        return position == _AMBIGUOUS or (
+            position < len(messages) and messages[position].id == message_id
+        )
+
+    def add(self, message_id: str, position: int):
+        """Records the position of an appended message."""
+        if self.positions.setdefault(message_id, position) != position:
+            self.positions[message_id] = _AMBIGUOUS
+
+
+class MessageHistory(list):
+    """
+    Message list returned by append_messages. It is never changed in place, so
+    checkpointers may keep it by reference; every update creates a new history.
+    """
+
+    _index: Optional[_MessageIndex] = None
+
+
+def append_messages(left: Messages, right: Messages) -> MessageHistory:
+    """
+    Same semantics as add_messages, with a fast path for the common case of
+    appending new messages to a long, already-merged history. add_messages
+    re-converts every message in `left` on each update; here only `right` is
+    converted unless it updates or removes an existing message. The ids of the
+    history are kept in an index carried over to the returned history, so the
+    new ids are checked without scanning `left`.
+    """
+    if not left or not isinstance(left, list):
+        return MessageHistory(add_messages(left, right))
+    if not isinstance(right, list):
+        right = [right]
+    new_messages = [message_chunk_to_message(m) for m in convert_to_messages(right)]
+    if any(isinstance(m, RemoveMessage) for m in new_messages):
+        return MessageHistory(add_messages(left, right))
+    index = left._index if isinstance(left, MessageHistory) else None
+    if index is None:
+        # A plain list, e.g. restored from a serialized checkpoint, or a history
+        # merged by add_messages.
+        index = _MessageIndex(left)
+        if isinstance(left, MessageHistory):
+            left._index = index
+    if any(index.may_contain(left, m.id) for m in new_messages if m.id is not None):
+        return MessageHistory(add_messages(left, right))
+    # Messages are copied rather than mutated, since the caller's objects may
+    # also be held by a checkpoint or by pending writes.
+    new_messages = [
+        m if m.id is not None else m.model_copy(update={"id": str(uuid.uuid4())})
+        for m in new_messages
+    ]
+    for position, message in enumerate(new_messages, start=len(left)):
+        index.add(message.id, position)
+    history = MessageHistory([*left, *new_messages])
+    history._index = index
+    return history
 
 
 class AgentGraphState(TypedDict):
-    messages: Annotated[list[AnyMessage], add_messages]
+    messages: Annotated[list[AnyMessage], append_messages]
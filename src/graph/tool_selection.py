@@ -0,0 +1,125 @@
+import math
+import re
+from collections import Counter
+
+from langchain_core.messages import AIMessage, AnyMessage, HumanMessage
+from langchain_core.tools import BaseTool
+
+STOPWORDS = frozenset(
+    "a an and are as at be by can do for from how i in is it me my of on or "
+    "please the this to tool use what when where which who with you".split()
+)
+
+# Tokens are cut to a fixed prefix as a cheap stemmer, so that "multiply" and
+# "multiplication" or "library" and "libraries" match.
+STEM_LENGTH = 6
+
+
+def tokenize(text: str) -> list[str]:
+    """
+    Splits text into stemmed lowercase word tokens, splitting snake_case names.
+    Numbers are left out since they rarely identify a tool.
+    """
+    words = re.findall(r"[a-z][a-z0-9]*", text.lower().replace("_", " "))
+    return [word[:STEM_LENGTH] for word in words if word not in STOPWORDS]
+
+
+def tool_document(tool: BaseTool) -> str:
+    """Returns the text a tool is indexed by: name, description and arguments."""
+    fields = [
+        f"{name} {schema.get('description', '')}" for name, schema in tool.args.items()
+    ]
+    return " ".join([tool.name, tool.description, *fields])
+
+
+class BM25ToolIndex:
+    """
+    Local BM25 keyword index over the name, description and argument
+    descriptions of a tool catalog.
+    """
+
+    def __init__(self, tools: list[BaseTool], k1: float = 1.5, b: float = 0.75):
+        self.k1 = k1
+        self.b = b
+        self.names = [tool.name for tool in tools]
+        self._documents = [Counter(tokenize(tool_document(tool))) for tool in tools]
+        lengths = [sum(document.values()) for document in self._documents]
+        self._lengths = lengths
+        self._average_length = sum(lengths) / len(lengths) if lengths else 0.0
+        frequencies = Counter(term for document in self._documents for term in document)
+        count = len(self._documents)
+        self._idf = {
+            term: math.log(1 + (count - frequency + 0.5) / (frequency + 0.5))
+            for term, frequency in frequencies.items()
+        }
+
+    def scores(self, query: str) -> list[float]:
+        """Returns the BM25 score of every tool for the query."""
+        terms = [term for term in tokenize(query) if term in self._idf]
+        scores = []
+        for document, length in zip(self._documents, self._lengths):
+            score = 0.0
+            norm = self.k1 * (1 - self.b + self.b * length / self._average_length)
+            for term in terms:
+                frequency = document.get(term, 0)
+                if frequency:
+                    score += (
+                        self._idf[term] * frequency * (self.k1 + 1) / (frequency + norm)
+                    )
+            scores.append(score)
+        return scores
+
+    def search(self, query: str, k: int) -> list[str]:
+        """Returns the names of the `k` best matching tools with a positive score."""
+        ranked = sorted(
+            zip(self.scores(query), range(len(self.names))),
+            key=lambda item: (-item[0], item[1]),
+        )
+        return [self.names[index] for score, index in ranked[:k] if score > 0]
+
+
+class ToolSelector:
+    """
+    Picks the tools to bind for a turn, so the LLM only receives the schemas of
+    the `top_k` tools most relevant to the conversation instead of the whole
+    catalog.
+
+    The query is the text of the last `history_turns` human messages. Tools
+    listed in `always_include` and tools already called during the current turn
+    are always bound.
+
+    Args:
+        top_k: Number of tools selected by relevance.
+        always_include: Names of tools that are bound on every turn.
+        history_turns: Number of recent human messages the query is built from.
+    """
+
+    def __init__(
+        self,
+        top_k: int = 8,
+        always_include: tuple[str, ...] = (),
+        history_turns: int = 2,
+    ):
+        self.top_k = top_k
+        self.always_include = always_include
+        self.history_turns = history_turns
+        self._index: BM25ToolIndex | None = None
+
+    def build_index(self, tools: list[BaseTool]):
+        """(Re)builds the index for a tool catalog."""
+        self._index = BM25ToolIndex(tools)
+
+    def select(self, messages: list[AnyMessage]) -> tuple[str, ...]:
+        """Returns the names of the tools to bind, in catalog order."""
+        queries: list[str] = []
+        called: set[str] = set()
+        for message in reversed(messages):
+            if isinstance(message, HumanMessage):
+                queries.append(message.text())
+                if len(queries) == self.history_turns:
+                    break
+            elif isinstance(message, AIMessage) and not queries:
+                called.update(call["name"] for call in message.tool_calls)
+        selected = set(self._index.search(" ".join(queries), self.top_k))
+        selected.update(called, self.always_include)
+        return tuple(name for name in self._index.names if name in selected)
@@ -1,6 +1,13 @@
+from itertools import chain
+from typing import Optional
+
 from langchain_core.messages.tool import ToolMessage
+from langchain_core.runnables import RunnableConfig
+
+from src.tools.schemas import ToolArtifact, ToolCall, ToolSource
 
-from src.tools.schemas import ToolArtifact
+# Key of the per-turn TurnToolResults in config["configurable"].
+TOOL_RESULTS_CONFIG_KEY = "__turn_tool_results"
 
 
 def get_tool_names_from_messages(tool_messages: list[ToolMessage]):
@@ -9,9 +16,12 @@ def get_tool_names_from_messages(tool_messages: list[ToolMessage]):
 
 def validate_tool_artifact(tool_message: ToolMessage):
     """
-    Validates the ToolArtifact of a ToolMessage
+    Validates the ToolArtifact of a ToolMessage. Artifacts restored from a
+    checkpointer come back as plain dicts and are parsed into a ToolArtifact.
     """
     if tool_message.artifact:
+        if isinstance(tool_message.artifact, dict):
+            return ToolArtifact.model_validate(tool_message.artifact)
         return tool_message.artifact
     return None
 
@@ -36,3 +46,47 @@ def get_tool_call_args(tool_artifact: ToolArtifact | None):
     if not tool_artifact:
         return None
     return tool_artifact.metadata.get("args", None)
+
+
+class TurnToolResults:
+    """
+    Tool calls and sources of a single turn, collected as its tool nodes finish
+    so that earlier turns are never scanned again.
+
+    Results keep the order of the tool calls in the assistant's messages, also
+    when parallel calls finish in another order; sources are de-duplicated,
+    keeping their first occurrence.
+    """
+
+    def __init__(self):
+        self._results: dict[str, Optional[tuple[ToolCall, list[ToolSource]]]] = {}
+
+    def expect(self, tool_calls: list[dict]):
+        """Reserves the position of the tool calls requested by the assistant."""
+        for tool_call in tool_calls:
+            self._results.setdefault(tool_call["id"], None)
+
+    def add(self, tool_message: ToolMessage, duration: Optional[float] = None):
+        """Records the result of a tool call and, optionally, its duration."""
+        tool_artifact = validate_tool_artifact(tool_message)
+        metadata = {"args": get_tool_call_args(tool_artifact)}
+        if duration is not None:
+            metadata["duration"] = duration
+        self._results[tool_message.tool_call_id] = (
+            ToolCall(tool_name=tool_message.name, metadata=metadata),
+            get_artifact_sources(tool_artifact),
+        )
+
+    @property
+    def tool_calls(self) -> list[ToolCall]:
+        return [result[0] for result in self._results.values() if result]
+
+    @property
+    def sources(self) -> list[ToolSource]:
+        sources = (result[1] for result in self._results.values() if result)
+        return list(dict.fromkeys(chain.from_iterable(sources)))
+
+
+def get_turn_tool_results(config: RunnableConfig) -> Optional[TurnToolResults]:
+    """Returns the running turn's tool results collector, if any."""
+    return config.get("configurable", {}).get(TOOL_RESULTS_CONFIG_KEY)
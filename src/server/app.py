@@ -0,0 +1,297 @@
+import argparse
+import asyncio
+import importlib
+import logging
+import os
+import signal
+import uuid
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, Callable, Literal, Optional
+
+import uvicorn
+from dotenv import load_dotenv
+from pydantic import BaseModel, ValidationError
+from starlette.applications import Starlette
+from starlette.requests import Request
+from starlette.responses import JSONResponse, PlainTextResponse, StreamingResponse
+from starlette.routing import Route
+
+from src.common.logs import configure_logging, log_context, shutdown_logging
+from src.common.tokens import preload_encoding
+from src.graph.agent_graph import AgentGraph
+from src.graph.checkpointers import close_checkpointer, create_checkpointer
+from src.graph.events import FinalEvent, StreamEvent
+from src.graph.metrics import PrometheusMetricsSink
+from src.tools.executors import close_tool_executors
+from src.tools.http import close_http_pool
+
+logger = logging.getLogger(__name__)
+
+
+class ServerSettings(BaseModel):
+    """
+    Settings of the ASGI service, read from environment variables so that every
+    worker process picks up the same configuration
+    """
+
+    graph_factory: str = "src.graph.create_graph:create_mimaizey_graph"
+    checkpointer: Literal["memory", "sqlite", "none"] = "memory"
+    checkpoint_path: str = "checkpoints.sqlite"
+    max_concurrency: int = 64  # Graph runs per worker process.
+    shutdown_delay: float = 0.0  # Seconds to report not-ready before draining.
+    drain_timeout: float = 30.0  # Seconds to wait for in-flight requests.
+    log_level: str = "info"
+    log_json: bool = True  # JSON log records, correlated by request and thread id.
+
+    @classmethod
+    def from_env(cls) -> "ServerSettings":
+        values = {
+            name: os.environ[name.upper()]
+            for name in cls.model_fields
+            if name.upper() in os.environ
+        }
+        return cls(**values)
+
+
+class InvokeRequest(BaseModel):
+    """
+    Body of the invoke and stream endpoints
+    """
+
+    message: str
+    thread_id: Optional[str] = None
+    config: dict[str, Any] = {}
+
+
+def load_graph_factory(path: str) -> Callable[..., AgentGraph]:
+    """Imports a graph factory given as "module:function"."""
+    module_name, _, attribute = path.partition(":")
+    return getattr(importlib.import_module(module_name), attribute)
+
+
+class GraphService:
+    """
+    Per-process state of the service: the compiled graph, built once at startup,
+    a bound on concurrent graph runs and the in-flight request count used for
+    readiness and graceful draining.
+    """
+
+    def __init__(self, settings: ServerSettings):
+        self.settings = settings
+        self.graph: Optional[AgentGraph] = None
+        self.metrics_sink = PrometheusMetricsSink()
+        self.ready = False
+        self.draining = False
+        self.in_flight = 0
+        self._idle = asyncio.Event()
+        self._idle.set()
+        self._semaphore = asyncio.Semaphore(settings.max_concurrency)
+
+    async def start(self):
+        checkpointer = None
+        if self.settings.checkpointer != "none":
+            checkpointer = create_checkpointer(
+                self.settings.checkpointer, self.settings.checkpoint_path
+            )
+        factory = load_graph_factory(self.settings.graph_factory)
+        self.graph = factory(checkpointer=checkpointer)
+        if self.graph.metrics_sink is None:
+            self.graph.metrics_sink = self.metrics_sink
+        # The tokenizer may be downloaded on first use; load it before serving.
+        await asyncio.to_thread(preload_encoding().wait, 30.0)
+        self._install_drain_handler()
+        self.ready = True
+        logger.info("Graph ready in worker %d", os.getpid())
+
+    def _install_drain_handler(self):
+        """
+        Chains a handler in front of the server's SIGTERM handler that marks the
+        worker as draining, so readiness checks fail, and hands over to the
+        server's shutdown after `shutdown_delay` seconds.
+        """
+        loop = asyncio.get_running_loop()
+        previous = signal.getsignal(signal.SIGTERM)
+        if not callable(previous):
+            return
+
+        def handle_sigterm(signum, frame):
+            self.draining = True
+            loop.call_soon_threadsafe(
+                loop.call_later, self.settings.shutdown_delay, previous, signum, frame
+            )
+
+        signal.signal(signal.SIGTERM, handle_sigterm)
+
+    async def stop(self):
+        """Waits for in-flight requests, then releases the process's resources."""
+        self.draining = True
+        self.ready = False
+        try:
+            await asyncio.wait_for(self._idle.wait(), self.settings.drain_timeout)
+        except TimeoutError:
+            logger.warning("Stopping with %d request(s) in flight", self.in_flight)
+        if self.graph is not None:
+            await close_checkpointer(self.graph.checkpointer)
+        await close_http_pool()
+        await close_tool_executors()
+
+    @asynccontextmanager
+    async def track(self) -> AsyncIterator[None]:
+        """Counts a request as in flight and bounds concurrent graph runs."""
+        self.in_flight += 1
+        self._idle.clear()
+        try:
+            async with self._semaphore:
+                yield
+        finally:
+            self.in_flight -= 1
+            if self.in_flight == 0:
+                self._idle.set()
+
+    def thread_id(self, request: InvokeRequest) -> Optional[str]:
+        """Returns the request's thread id, creating one if the graph needs it."""
+        if request.thread_id is None and self.graph.checkpointer is not None:
+            return str(uuid.uuid4())
+        return request.thread_id
+
+
+def request_id(request: Request) -> str:
+    """The request's X-Request-Id header, or a new id to correlate its logs."""
+    return request.headers.get("X-Request-Id") or str(uuid.uuid4())
+
+
+async def parse_request(request: Request) -> InvokeRequest | JSONResponse:
+    try:
+        return InvokeRequest.model_validate(await request.json())
+    except (ValueError, ValidationError) as e:
+        return JSONResponse({"error": str(e)}, status_code=422)
+
+
+async def invoke(request: Request) -> JSONResponse:
+    service: GraphService = request.app.state.service
+    body = await parse_request(request)
+    if isinstance(body, JSONResponse):
+        return body
+    thread_id = service.thread_id(body)
+    with log_context(request_id=request_id(request)):
+        async with service.track():
+            messages, flattened_sources, tool_calls = await service.graph.invoke(
+                chat_history=[],
+                message=body.message,
+                runtime_config=body.config,
+                thread_id=thread_id,
+            )
+    result = FinalEvent(
+        messages=messages, flattened_sources=flattened_sources, tool_calls=tool_calls
+    )
+    return JSONResponse(
+        result.model_dump(mode="json"),
+        headers={"X-Thread-Id": thread_id} if thread_id else None,
+    )
+
+
+async def stream(request: Request) -> StreamingResponse | JSONResponse:
+    service: GraphService = request.app.state.service
+    body = await parse_request(request)
+    if isinstance(body, JSONResponse):
+        return body
+    thread_id = service.thread_id(body)
+
+    async def server_sent_events() -> AsyncIterator[str]:
+        with log_context(request_id=request_id(request)):
+            async with service.track():
+                events: AsyncIterator[StreamEvent] = service.graph.stream(
+                    chat_history=[],
+                    message=body.message,
+                    runtime_config=body.config,
+                    thread_id=thread_id,
+                )
+                async for event in events:
+                    yield f"event: {event.type}\ndata: {event.model_dump_json()}\n\n"
+
+    return StreamingResponse(
+        server_sent_events(),
+        media_type="text/event-stream",
+        headers={"X-Thread-Id": thread_id} if thread_id else None,
+    )
+
+
+async def health(request: Request) -> PlainTextResponse:
+    """Liveness check: the worker's event loop is responsive."""
+    return PlainTextResponse("ok")
+
+
+async def ready(request: Request) -> PlainTextResponse:
+    """Readiness check: the graph is built and the worker is not draining."""
+    service: GraphService = request.app.state.service
+    if service.ready and not service.draining:
+        return PlainTextResponse("ready")
+    return PlainTextResponse("not ready", status_code=503)
+
+
+async def metrics(request: Request) -> PlainTextResponse:
+    """Per-worker turn metrics in the Prometheus text format."""
+    service: GraphService = request.app.state.service
+    return PlainTextResponse(
+        service.metrics_sink.render(), media_type="text/plain; version=0.0.4"
+    )
+
+
+def create_app(settings: Optional[ServerSettings] = None) -> Starlette:
+    """Creates the ASGI application; the graph is built when a worker starts."""
+    load_dotenv()
+    settings = settings or ServerSettings.from_env()
+    configure_logging(level=settings.log_level, json_format=settings.log_json)
+
+    @asynccontextmanager
+    async def lifespan(app: Starlette):
+        app.state.service = GraphService(settings)
+        await app.state.service.start()
+        yield
+        await app.state.service.stop()
+        shutdown_logging()
+
+    return Starlette(
+        routes=[
+            Route("/invoke", invoke, methods=["POST"]),
+            Route("/stream", stream, methods=["POST"]),
+            Route("/healthz", health),
+            Route("/readyz", ready),
+            Route("/metrics", metrics),
+        ],
+        lifespan=lifespan,
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Serve the agent graph over HTTP.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8000)
+    parser.add_argument("--workers", type=int, default=1)
+    parser.add_argument("--graph-factory", help="module:function building the graph")
+    parser.add_argument("--log-level", help="defaults to LOG_LEVEL, or info")
+    args = parser.parse_args()
+    # Worker processes read their settings from the environment.
+    if args.graph_factory:
+        os.environ["GRAPH_FACTORY"] = args.graph_factory
+    if args.log_level:
+        os.environ["LOG_LEVEL"] = args.log_level
+    settings = ServerSettings.from_env()
+    if args.workers > 1 and settings.checkpointer == "memory":
+        logger.warning(
+            "The memory checkpointer is not shared between workers; use "
+            "CHECKPOINTER=sqlite to continue threads on any worker."
+        )
+    uvicorn.run(
+        "src.server.app:create_app",
+        factory=True,
+        host=args.host,
+        port=args.port,
+        workers=args.workers,
+        log_level=settings.log_level.lower(),
+        timeout_graceful_shutdown=int(settings.drain_timeout),
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -1,17 +1,36 @@
+from contextlib import aclosing
+from contextvars import ContextVar
 from logging import getLogger
-from typing import Any, Optional, Type, Union
+from typing import Any, AsyncIterator, ClassVar, Optional, Type, Union
 
 from langchain_core.callbacks import (
     AsyncCallbackManagerForToolRun,
     CallbackManagerForToolRun,
 )
-from langchain_core.messages.tool import ToolCall
+from langchain_core.messages.tool import ToolCall, ToolMessage
 from langchain_core.runnables import RunnableConfig
 from langchain_core.tools import BaseTool
-from pydantic import BaseModel
+from langgraph.config import get_stream_writer
+from pydantic import BaseModel, ValidationError
+
+from src.common.logs import LogPayload
+from src.common.tokens import count_tokens, truncate_text
+from src.tools.cache import SingleFlight, ToolResultCache, make_cache_key
+from src.tools.executors import ExecutionMode, get_tool_executors
+from src.tools.http import HttpClientPool, get_http_pool
+from src.tools.schemas import ToolArtifact, ToolChunk, ToolProgressEvent, ToolSource
 
 logger = getLogger(__name__)
 
+# Id of the tool call being run, for the progress events of streaming tools.
+_current_tool_call_id: ContextVar[Optional[str]] = ContextVar(
+    "current_tool_call_id", default=None
+)
+
+
+def _is_tool_call(input: Any) -> bool:
+    return isinstance(input, dict) and input.get("type") == "tool_call"
+
 
 class MiMaizeyTool(BaseTool):
     """
@@ -19,17 +38,47 @@ class MiMaizeyTool(BaseTool):
 
     This class is designed to be subclassed by specific tool implementations.
     It mandates the definition of an asynchronous method `_arun` where the tool's
-    logic must be implemented.
+    logic must be implemented, or of an async generator `_astream` for tools that
+    produce large results piece by piece. Tools doing CPU-bound or blocking work
+    set `execution_mode` and implement the synchronous `_run` instead.
 
     Attributes:
         name (str): Name of the tool.
         description (str): Description of what the tool does.
         args_schema (Type[BaseModel]): Pydantic model defining the structure of input arguments.
         response_format (str): Format of the response; defaults to "content_and_artifact".
+        timeout (Optional[float]): Seconds after which a call to the tool is cancelled;
+            defaults to the graph-wide tool timeout.
+        max_output_bytes (Optional[int]): Cap on the content of a streaming tool; the
+            stream is closed and the content truncated once it is reached.
+        max_output_tokens (Optional[int]): Same cap in tokens.
+
+    Class Attributes:
+        cache_ttl (Optional[float]): Opt-in result caching for deterministic tools.
+            Results of tool calls are reused for this many seconds; None disables it.
+        cache_maxsize (int): Maximum number of cached results for the tool class.
+        cache_config_keys (tuple[str, ...]): Keys of `config["configurable"]` that
+            the result depends on and that are therefore part of the cache key.
+        coalesce_calls (bool): Opt-in de-duplication of concurrent identical tool
+            calls (same key as the cache): they share a single execution.
+        side_effect_free (bool): Marks the tool as safe to call speculatively: with
+            speculative tool calls enabled, it may be started while the model is
+            still responding, and cancelled if the final call differs.
+        execution_mode (str): Where the tool runs. "async" (default) awaits `_arun`
+            on the event loop. "thread" and "process" run the synchronous `_run`
+            in the process-wide thread or process pool (see `ToolExecutors`),
+            keeping the event loop free for other conversations. Process-mode
+            tools, their arguments and results must be picklable, and `_run`
+            only receives the primitive values of `config["configurable"]`.
 
     Methods:
         ainvoke: Asynchronously invoke the tool with given input and configuration.
+        result_cache: Return the tool class's result cache and its hit/miss counters.
+        in_flight_calls: Return the tool class's de-duplicator of in-flight calls.
+        http: The process-wide async HTTP client pool to call external services with.
         _arun: Abstract method where the tool's core logic is to be defined by subclasses.
+        _astream: Alternative to `_arun` yielding the result as ToolChunks.
+        _run: Synchronous logic of tools with a "thread" or "process" execution mode.
     """
 
     def __init_subclass__(
@@ -43,18 +92,76 @@ class MiMaizeyTool(BaseTool):
     description: str
     args_schema: Type[BaseModel]
     response_format: str = "content_and_artifact"
+    timeout: Optional[float] = None
+    max_output_bytes: Optional[int] = None
+    max_output_tokens: Optional[int] = None
+
+    cache_ttl: ClassVar[Optional[float]] = None
+    cache_maxsize: ClassVar[int] = 256
+    cache_config_keys: ClassVar[tuple[str, ...]] = ()
+    coalesce_calls: ClassVar[bool] = False
+    side_effect_free: ClassVar[bool] = False
+    execution_mode: ClassVar[ExecutionMode] = "async"
+
+    @classmethod
+    def result_cache(cls) -> ToolResultCache:
+        """Returns the result cache shared by all instances of this tool class."""
+        if "_result_cache" not in cls.__dict__:
+            cls._result_cache = ToolResultCache(
+                ttl=cls.cache_ttl or 0, maxsize=cls.cache_maxsize
+            )
+        return cls.__dict__["_result_cache"]
+
+    @classmethod
+    def in_flight_calls(cls) -> SingleFlight:
+        """Returns the de-duplicator of in-flight calls shared by this tool class."""
+        if "_in_flight_calls" not in cls.__dict__:
+            cls._in_flight_calls = SingleFlight()
+        return cls.__dict__["_in_flight_calls"]
+
+    @property
+    def http(self) -> HttpClientPool:
+        """
+        The process-wide async HTTP client pool. Use it instead of creating your own
+        client to get keep-alive connection reuse, per-host rate limits and retries:
+
+            response = await self.http.get("https://api.example.umich.edu/hours")
+        """
+        return get_http_pool()
+
+    def _cache_key(self, args: dict, config: Optional[RunnableConfig]) -> str:
+        """Builds the cache key from the validated arguments and allow-listed config."""
+        if isinstance(self.args_schema, type) and issubclass(
+            self.args_schema, BaseModel
+        ):
+            try:
+                args = self.args_schema.model_validate(args).model_dump(mode="json")
+            except ValidationError:
+                pass
+        configurable = (config or {}).get("configurable", {})
+        return make_cache_key(self.name, args, configurable, self.cache_config_keys)
 
     def _run(
         self,
+        config: RunnableConfig,
         run_manager: Optional[CallbackManagerForToolRun] = None,
-    ) -> str:
+        **kwargs: Any,
+    ):
         """
-        Placeholder for synchronous tool methods, which are currently unsupported.
+        Define the tool's synchronous logic in this method in subclasses with a
+        "thread" or "process" execution mode. It returns the same
+        `(content, ToolArtifact)` tuple as `_arun`. Thread-mode tools doing long
+        work call `check_cancelled` between steps to stop once the call was
+        cancelled or timed out.
 
         Raises:
-            NotImplementedError: Always raised to indicate no support for synchronous calls.
+            NotImplementedError: If the tool runs on the event loop or does not
+                implement it.
         """
-        raise NotImplementedError("MiMaizeyTool does not support sync invocation.")
+        raise NotImplementedError(
+            f"{type(self).__name__} does not support sync invocation; set "
+            "execution_mode and implement _run."
+        )
 
     async def ainvoke(
         self,
@@ -71,25 +178,68 @@ class MiMaizeyTool(BaseTool):
             config (Optional[RunnableConfig]): Configuration for the tool's runtime, if any.
 
         Returns:
-            The result of the tool's asynchronous run method.
+            The result of the tool's asynchronous run method. For tool calls of a
+            tool with `cache_ttl` set, a cached result may be returned instead, and
+            with `coalesce_calls` set, the result of an identical in-flight call.
 
         Raises:
             Exception: Re-raises any exceptions encountered during the tool's execution.
         """
+        call_id = _current_tool_call_id.set(
+            input["id"] if _is_tool_call(input) else None
+        )
         try:
-            logger.info(f"\n🔧🔧🔧 TOOL SELECTED: {input}")
-            return await super().ainvoke(input, config, **kwargs)
+            logger.info("Tool selected: %s %s", self.name, LogPayload(input))
+            if not _is_tool_call(input) or (
+                self.cache_ttl is None and not self.coalesce_calls
+            ):
+                return await super().ainvoke(input, config, **kwargs)
+
+            key = self._cache_key(input["args"], config)
+            if self.cache_ttl is not None:
+                if (cached := self.result_cache().get(key)) is not None:
+                    logger.info("Tool cache hit: %s", self.name)
+                    content, artifact = cached
+                    return ToolMessage(
+                        content=content,
+                        artifact=artifact,
+                        tool_call_id=input["id"],
+                        name=self.name,
+                    )
+            if not self.coalesce_calls:
+                return await self._ainvoke_and_cache(key, input, config, **kwargs)
+
+            output = await self.in_flight_calls().do(
+                key, lambda: self._ainvoke_and_cache(key, input, config, **kwargs)
+            )
+            # The shared ToolMessage answers the first caller's tool call.
+            return output.model_copy(update={"tool_call_id": input["id"]})
         except Exception as e:
-            logger.exception(f"TOOL ERROR: {self.name} - {e}")
+            logger.exception("Tool error: %s - %s", self.name, e)
             raise
+        finally:
+            _current_tool_call_id.reset(call_id)
+
+    async def _ainvoke_and_cache(
+        self, key: str, input: ToolCall, config: Optional[RunnableConfig], **kwargs
+    ) -> ToolMessage:
+        """Runs the tool call and caches successful results if caching is enabled."""
+        output = await super().ainvoke(input, config, **kwargs)
+        if self.cache_ttl is not None and output.status == "success":
+            self.result_cache().set(key, (output.content, output.artifact))
+        return output
 
     async def _arun(
         self,
         config: RunnableConfig,
         run_manager: Optional[AsyncCallbackManagerForToolRun] = None,
+        **kwargs: Any,
     ):
         """
         Define the tool's core asynchronous logic in this method in the subclass.
+        Tools implementing `_astream` instead inherit this method, which consumes
+        their stream, and tools with a "thread" or "process" execution mode
+        inherit it to run `_run` in the matching pool.
 
         Args:
             config (RunnableConfig): Configuration settings for the tool run.
@@ -98,5 +248,108 @@ class MiMaizeyTool(BaseTool):
         Note:
             This method should be overridden in any subclass to implement specific tool logic.
         """
+        if self.execution_mode != "async":
+            return await self._arun_offloaded(config, **kwargs)
+        return await self._aconsume_stream(config, **kwargs)
+
+    async def _arun_offloaded(self, config: RunnableConfig, **kwargs: Any):
+        """Runs `_run` in the pool of the tool's execution mode."""
+        if self.execution_mode == "process":
+            # Only picklable config values can be sent to the worker process.
+            config = {
+                "configurable": {
+                    key: value
+                    for key, value in config.get("configurable", {}).items()
+                    if not key.startswith("__")
+                    and isinstance(value, (str, int, float, bool))
+                }
+            }
+        return await get_tool_executors().run(
+            self.execution_mode, self._run, config=config, **kwargs
+        )
+
+    async def _astream(
+        self, config: RunnableConfig, **kwargs: Any
+    ) -> AsyncIterator[ToolChunk]:
+        """
+        Define this async generator instead of `_arun` to produce the result
+        incrementally, e.g. while paging through search results. Every yielded
+        ToolChunk is reported as a ToolProgressEvent on the graph's stream, and
+        the content and sources of all chunks make up the tool's result.
+
+        Args:
+            config (RunnableConfig): Configuration settings for the tool run.
+            **kwargs: The tool's arguments, as for `_arun`.
+        """
+        raise NotImplementedError(
+            f"{type(self).__name__} must implement _arun or _astream."
+        )
+        yield
+
+    async def _aconsume_stream(
+        self, config: RunnableConfig, **kwargs: Any
+    ) -> tuple[str, ToolArtifact]:
+        """
+        Consumes `_astream` until it ends or the content reaches
+        `max_output_bytes` or `max_output_tokens`, in which case the stream is
+        closed early. Returns the joined content and a ToolArtifact with the
+        de-duplicated sources of all chunks in order.
+        """
+        parts: list[str] = []
+        sources: dict[ToolSource, None] = {}
+        metadata: dict[str, Any] = {}
+        size = tokens = chunks = 0
+        truncated = False
+        async with aclosing(self._astream(config, **kwargs)) as stream:
+            async for chunk in stream:
+                content = chunk.content
+                if self.max_output_bytes is not None:
+                    encoded = content.encode()
+                    if size + len(encoded) > self.max_output_bytes:
+                        remaining = self.max_output_bytes - size
+                        content = encoded[:remaining].decode(errors="ignore")
+                        truncated = True
+                if self.max_output_tokens is not None:
+                    content_tokens = count_tokens(content)
+                    if tokens + content_tokens > self.max_output_tokens:
+                        content = truncate_text(
+                            content, self.max_output_tokens - tokens
+                        )
+                        content_tokens = count_tokens(content)
+                        truncated = True
+                    tokens += content_tokens
+                size += len(content.encode())
+                chunks += 1
+                parts.append(content)
+                new_sources = [s for s in chunk.sources if s not in sources]
+                sources.update(dict.fromkeys(new_sources))
+                metadata.update(chunk.metadata)
+                self._write_progress(
+                    ToolProgressEvent(
+                        tool_name=self.name,
+                        tool_call_id=_current_tool_call_id.get(),
+                        content=content,
+                        sources=new_sources,
+                        chunks=chunks,
+                        bytes=size,
+                        truncated=truncated,
+                    )
+                )
+                if truncated:
+                    break
 
-        pass
+        content = "".join(parts)
+        if truncated:
+            logger.info("Tool output truncated: %s after %d bytes", self.name, size)
+            content += f"\n\n[Output truncated after {size} bytes.]"
+            metadata["truncated"] = True
+        return content, ToolArtifact(sources=list(sources), metadata=metadata)
+
+    @staticmethod
+    def _write_progress(event: ToolProgressEvent):
+        """Writes an event to the graph's custom stream, if running in a graph."""
+        try:
+            write_event = get_stream_writer()
+        except RuntimeError:
+            return
+        write_event(event)
@@ -0,0 +1,124 @@
+import asyncio
+import json
+import time
+from collections import OrderedDict
+from functools import partial
+from typing import Any, Awaitable, Callable, Hashable, Optional, TypeVar
+
+T = TypeVar("T")
+
+
+def make_cache_key(
+    tool_name: str,
+    args: dict[str, Any],
+    configurable: dict[str, Any],
+    config_keys: tuple[str, ...] = (),
+) -> str:
+    """
+    Builds a canonical key from the tool name, its arguments and the allow-listed
+    `configurable` keys, so that equal calls map to the same key regardless of
+    argument order.
+    """
+    return json.dumps(
+        {
+            "tool": tool_name,
+            "args": args,
+            "config": {key: configurable.get(key) for key in config_keys},
+        },
+        sort_keys=True,
+        separators=(",", ":"),
+        default=str,
+    )
+
+
+class ToolResultCache:
+    """
+    Size-bounded LRU cache whose entries expire `ttl` seconds after being stored.
+
+    Attributes:
+        ttl (float): Time to live of an entry in seconds.
+        maxsize (int): Maximum number of entries; the least recently used entry
+            is evicted first.
+        hits (int): Number of lookups answered from the cache.
+        misses (int): Number of lookups that found no fresh entry.
+        evictions (int): Number of entries dropped for size or age.
+    """
+
+    def __init__(self, ttl: float, maxsize: int = 256):
+        self.ttl = ttl
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._entries: OrderedDict[Hashable, tuple[float, Any]] = OrderedDict()
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        """Returns the cached value for `key`, or None if absent or expired."""
+        entry = self._entries.get(key)
+        if entry is not None:
+            expires_at, value = entry
+            if expires_at > time.monotonic():
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return value
+            del self._entries[key]
+            self.evictions += 1
+        self.misses += 1
+        return None
+
+    def set(self, key: Hashable, value: Any):
+        """Stores `value` under `key`, evicting the least recently used entries."""
+        self._entries[key] = (time.monotonic() + self.ttl, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    def clear(self):
+        """Drops every entry; the counters are kept."""
+        self._entries.clear()
+
+    def stats(self) -> dict[str, int]:
+        """Returns the hit/miss counters and the current size."""
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "size": len(self._entries),
+        }
+
+
+class SingleFlight:
+    """
+    De-duplicates concurrent calls: callers that ask for the same key while a
+    call is in flight await that call instead of starting their own. Every
+    waiter receives the same result, or the same exception.
+
+    Attributes:
+        coalesced (int): Number of calls answered by joining an in-flight call.
+    """
+
+    def __init__(self):
+        self.coalesced = 0
+        self._calls: dict[tuple[asyncio.AbstractEventLoop, Hashable], asyncio.Task] = {}
+
+    async def do(self, key: Hashable, call: Callable[[], Awaitable[T]]) -> T:
+        """Runs `call` unless a call with the same key is already in flight."""
+        flight_key = (asyncio.get_running_loop(), key)
+        task = self._calls.get(flight_key)
+        if task is None:
+            task = asyncio.ensure_future(call())
+            self._calls[flight_key] = task
+            task.add_done_callback(partial(self._finish, flight_key))
+        else:
+            self.coalesced += 1
+        # Shield the shared call so that one cancelled waiter does not cancel it
+        # for the others.
+        return await asyncio.shield(task)
+
+    def _finish(self, flight_key: tuple, task: asyncio.Task):
+        if self._calls.get(flight_key) is task:
+            del self._calls[flight_key]
+        # Mark the exception as retrieved in case every waiter was cancelled.
+        if not task.cancelled():
+            task.exception()
@@ -0,0 +1,226 @@
+import asyncio
+import contextvars
+import functools
+import multiprocessing
+import os
+import signal
+import threading
+from concurrent.futures import Executor, Future, ProcessPoolExecutor, ThreadPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from logging import getLogger
+from typing import Any, Callable, Literal, Optional
+
+from pydantic import BaseModel
+
+logger = getLogger(__name__)
+
+ExecutionMode = Literal["async", "thread", "process"]
+
+# Cancellation flag of the tool call running in the current worker thread.
+_cancel_event: contextvars.ContextVar[Optional[threading.Event]] = (
+    contextvars.ContextVar("tool_cancel_event", default=None)
+)
+
+
+class ExecutorLimits(BaseModel):
+    """
+    Size and time limits of one executor pool
+    """
+
+    max_workers: int
+    max_queued: int = 64  # Calls waiting for a worker; further calls are rejected.
+    timeout: Optional[float] = None  # Seconds per call, including the wait.
+
+
+class ToolExecutorFull(RuntimeError):
+    """Raised when a pool already has `max_workers + max_queued` calls."""
+
+
+class ToolCancelled(Exception):
+    """Raised in a thread-mode tool whose call was cancelled or timed out."""
+
+
+def check_cancelled():
+    """
+    Raises ToolCancelled if the thread-mode tool call running in this thread was
+    cancelled or timed out. Long-running `_run` implementations call it between
+    steps, since a running thread cannot be interrupted from the outside.
+    """
+    event = _cancel_event.get()
+    if event is not None and event.is_set():
+        raise ToolCancelled()
+
+
+def _raise_timeout(signum: int, frame: Any):
+    raise TimeoutError("Tool call exceeded its time limit in the worker process")
+
+
+def _run_with_deadline(
+    fn: Callable[..., Any], timeout: Optional[float], args: tuple, kwargs: dict
+) -> Any:
+    """
+    Runs a call in a worker process, interrupting it after `timeout` seconds.
+    Pool workers run their calls in the main thread, where SIGALRM is delivered.
+    """
+    if timeout is None or not hasattr(signal, "setitimer"):
+        return fn(*args, **kwargs)
+    previous = signal.signal(signal.SIGALRM, _raise_timeout)
+    signal.setitimer(signal.ITIMER_REAL, timeout)
+    try:
+        return fn(*args, **kwargs)
+    finally:
+        signal.setitimer(signal.ITIMER_REAL, 0)
+        signal.signal(signal.SIGALRM, previous)
+
+
+class ToolExecutors:
+    """
+    Process-wide thread and process pools that run the synchronous work of tools
+    off the event loop (see `MiMaizeyTool.execution_mode`).
+
+    Each pool has its own limits. Calls beyond `max_workers + max_queued` are
+    rejected with ToolExecutorFull instead of queueing without bound. A call that
+    times out or is cancelled is removed from the queue if it has not started. A
+    running thread call is flagged, so that `check_cancelled` raises in it; a
+    running process call is interrupted in its worker once its timeout expires.
+    Process pools start their workers with "spawn", as forking a process with a
+    running event loop and threads is unsafe; calls and results must be picklable.
+
+    Args:
+        thread_limits: Limits of the thread pool.
+        process_limits: Limits of the process pool.
+    """
+
+    def __init__(
+        self,
+        thread_limits: Optional[ExecutorLimits] = None,
+        process_limits: Optional[ExecutorLimits] = None,
+    ):
+        self.limits = {
+            "thread": thread_limits
+            or ExecutorLimits(max_workers=min(32, (os.cpu_count() or 1) + 4)),
+            "process": process_limits
+            or ExecutorLimits(max_workers=os.cpu_count() or 1),
+        }
+        self._executors: dict[str, Executor] = {}
+        self._in_flight = {"thread": 0, "process": 0}
+        self._lock = threading.Lock()
+
+    def in_flight(self, mode: ExecutionMode) -> int:
+        """Number of calls of a pool that are queued or running."""
+        return self._in_flight[mode]
+
+    def executor(self, mode: ExecutionMode) -> Executor:
+        """Returns the pool of an execution mode, creating it on first use."""
+        with self._lock:
+            executor = self._executors.get(mode)
+            if executor is None:
+                limits = self.limits[mode]
+                if mode == "thread":
+                    executor = ThreadPoolExecutor(
+                        max_workers=limits.max_workers, thread_name_prefix="tool"
+                    )
+                else:
+                    executor = ProcessPoolExecutor(
+                        max_workers=limits.max_workers,
+                        mp_context=multiprocessing.get_context("spawn"),
+                    )
+                self._executors[mode] = executor
+            return executor
+
+    def _acquire(self, mode: ExecutionMode):
+        limits = self.limits[mode]
+        with self._lock:
+            if self._in_flight[mode] >= limits.max_workers + limits.max_queued:
+                raise ToolExecutorFull(
+                    f"The {mode} pool has {self._in_flight[mode]} calls in flight"
+                )
+            self._in_flight[mode] += 1
+
+    def _release(self, mode: ExecutionMode, future: Optional[Future]):
+        with self._lock:
+            self._in_flight[mode] -= 1
+
+    def _submit(
+        self, mode: ExecutionMode, fn: Callable[..., Any], args: tuple, kwargs: dict
+    ) -> tuple[Future, Optional[threading.Event]]:
+        executor = self.executor(mode)
+        if mode == "process":
+            timeout = self.limits[mode].timeout
+            return executor.submit(_run_with_deadline, fn, timeout, args, kwargs), None
+        cancelled = threading.Event()
+        context = contextvars.copy_context()
+        context.run(_cancel_event.set, cancelled)
+        return executor.submit(context.run, fn, *args, **kwargs), cancelled
+
+    async def run(
+        self, mode: ExecutionMode, fn: Callable[..., Any], /, *args: Any, **kwargs: Any
+    ) -> Any:
+        """
+        Runs `fn(*args, **kwargs)` in the pool of `mode` and returns its result.
+        The pool's timeout covers the wait for a worker and the call itself.
+
+        Raises:
+            ToolExecutorFull: If the pool is at its size limit.
+            TimeoutError: If the call exceeded the pool's timeout.
+        """
+        self._acquire(mode)
+        try:
+            future, cancelled = self._submit(mode, fn, args, kwargs)
+        except BaseException:
+            self._release(mode, None)
+            raise
+        # The slot is freed when the work ends, not when the caller stops waiting.
+        future.add_done_callback(functools.partial(self._release, mode))
+        try:
+            async with asyncio.timeout(self.limits[mode].timeout):
+                return await asyncio.wrap_future(future)
+        except BrokenProcessPool:
+            # A worker died; the next call starts a new pool.
+            logger.warning("The %s pool is broken; replacing it", mode)
+            with self._lock:
+                if self._executors.get(mode) is not None:
+                    self._executors.pop(mode).shutdown(wait=False)
+            raise
+        except BaseException:
+            if cancelled is not None:
+                cancelled.set()
+            raise
+
+    def shutdown(self, wait: bool = True):
+        """Shuts the pools down; queued calls are cancelled."""
+        with self._lock:
+            executors, self._executors = self._executors, {}
+        for executor in executors.values():
+            executor.shutdown(wait=wait, cancel_futures=True)
+
+
+_tool_executors: Optional[ToolExecutors] = None
+
+
+def get_tool_executors() -> ToolExecutors:
+    """Returns the process-wide tool executors, creating them on first use."""
+    global _tool_executors
+    if _tool_executors is None:
+        _tool_executors = ToolExecutors()
+    return _tool_executors
+
+
+def configure_tool_executors(
+    thread_limits: Optional[ExecutorLimits] = None,
+    process_limits: Optional[ExecutorLimits] = None,
+) -> ToolExecutors:
+    """Replaces the process-wide tool executors, e.g. at startup."""
+    global _tool_executors
+    if _tool_executors is not None:
+        _tool_executors.shutdown(wait=False)
+    _tool_executors = ToolExecutors(thread_limits, process_limits)
+    return _tool_executors
+
+
+async def close_tool_executors():
+    """Shuts the process-wide tool executors down, e.g. on server shutdown."""
+    global _tool_executors
+    if _tool_executors is not None:
+        executors, _tool_executors = _tool_executors, None
+        await asyncio.to_thread(executors.shutdown)
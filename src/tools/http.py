@@ -0,0 +1,224 @@
+import asyncio
+import random
+import time
+from logging import getLogger
+from typing import Any, Callable, Optional
+
+import httpx
+from pydantic import BaseModel
+
+from src.common.http import retry_after
+
+logger = getLogger(__name__)
+
+
+class HostLimits(BaseModel):
+    """
+    Connection, rate and retry limits applied to every request to one host
+    """
+
+    max_connections: int = 20
+    max_keepalive_connections: int = 10
+    keepalive_expiry: float = 30.0
+    rate: Optional[float] = None  # Requests per second; None means unlimited.
+    burst: int = 10
+    retries: int = 2
+    backoff: float = 0.5
+    max_backoff: float = 10.0  # Cap of the computed backoff, not of Retry-After.
+    max_retry_after: float = 60.0  # Longer Retry-After waits are not retried.
+    retry_statuses: tuple[int, ...] = (429, 500, 502, 503, 504)
+    # Methods retried by default; others only with `retry=True`, since a
+    # repeated POST may apply its side effect twice.
+    retry_methods: tuple[str, ...] = ("GET", "HEAD", "OPTIONS", "PUT", "DELETE")
+    timeout: float = 10.0
+
+
+class TokenBucket:
+    """
+    Token-bucket rate limiter. Callers reserve a token and sleep until it has
+    been refilled, so requests are spaced at `rate` per second after an initial
+    burst of `capacity`.
+    """
+
+    def __init__(self, rate: float, capacity: int):
+        self.rate = rate
+        self.capacity = capacity
+        self._tokens = float(capacity)
+        self._updated = time.monotonic()
+
+    async def acquire(self):
+        now = time.monotonic()
+        self._tokens = min(
+            self.capacity, self._tokens + (now - self._updated) * self.rate
+        )
+        self._updated = now
+        self._tokens -= 1
+        if self._tokens < 0:
+            await asyncio.sleep(-self._tokens / self.rate)
+
+
+class HttpClientPool:
+    """
+    Process-wide pool of keep-alive async HTTP clients shared by all tools.
+
+    One httpx.AsyncClient is kept per host (and event loop), so connections are
+    reused across tool calls and conversations while each host gets its own
+    connection limit. Requests are rate limited per host with a token bucket.
+    Idempotent requests are retried with jittered exponential backoff on
+    transport errors and retryable status codes, waiting as long as the server's
+    Retry-After asks for.
+
+    Args:
+        default_limits: Limits for hosts without their own entry.
+        host_limits: Per-host overrides, keyed by host name.
+        transport_factory: Optional factory for the clients' transport, e.g. an
+            httpx.MockTransport in tests.
+    """
+
+    def __init__(
+        self,
+        default_limits: Optional[HostLimits] = None,
+        host_limits: Optional[dict[str, HostLimits]] = None,
+        transport_factory: Optional[Callable[[], httpx.AsyncBaseTransport]] = None,
+    ):
+        self.default_limits = default_limits or HostLimits()
+        self.host_limits = dict(host_limits or {})
+        self.transport_factory = transport_factory
+        self._clients: dict[
+            tuple[asyncio.AbstractEventLoop, str], httpx.AsyncClient
+        ] = {}
+        self._buckets: dict[str, TokenBucket] = {}
+
+    def configure_host(self, host: str, limits: HostLimits):
+        """Sets the limits of a host; applies to clients created afterwards."""
+        self.host_limits[host] = limits
+        self._buckets.pop(host, None)
+
+    def limits_for(self, host: str) -> HostLimits:
+        return self.host_limits.get(host, self.default_limits)
+
+    def client(self, host: str) -> httpx.AsyncClient:
+        """Returns the shared client for a host on the running event loop."""
+        loop = asyncio.get_running_loop()
+        # Clients of event loops that have been closed can no longer be used.
+        for stale in [key for key in self._clients if key[0].is_closed()]:
+            del self._clients[stale]
+        client = self._clients.get((loop, host))
+        if client is None or client.is_closed:
+            limits = self.limits_for(host)
+            client = httpx.AsyncClient(
+                limits=httpx.Limits(
+                    max_connections=limits.max_connections,
+                    max_keepalive_connections=limits.max_keepalive_connections,
+                    keepalive_expiry=limits.keepalive_expiry,
+                ),
+                timeout=limits.timeout,
+                transport=self.transport_factory() if self.transport_factory else None,
+            )
+            self._clients[(loop, host)] = client
+        return client
+
+    def _bucket(self, host: str) -> Optional[TokenBucket]:
+        limits = self.limits_for(host)
+        if limits.rate is None:
+            return None
+        if host not in self._buckets:
+            self._buckets[host] = TokenBucket(limits.rate, limits.burst)
+        return self._buckets[host]
+
+    async def request(
+        self, method: str, url: str, retry: Optional[bool] = None, **kwargs: Any
+    ) -> httpx.Response:
+        """
+        Sends a request through the host's shared client, applying its rate limit
+        and retry policy. The last response is returned once retries are exhausted;
+        transport errors of the last attempt are raised.
+
+        Args:
+            retry: Whether to retry the request; by default only the host's
+                `retry_methods` are. Pass True for non-idempotent requests that
+                are safe to repeat, e.g. a POST with an idempotency key.
+        """
+        host = httpx.URL(url).host
+        limits = self.limits_for(host)
+        client = self.client(host)
+        bucket = self._bucket(host)
+        if retry is None:
+            retry = method.upper() in limits.retry_methods
+        retries = limits.retries if retry else 0
+        for attempt in range(retries + 1):
+            if bucket:
+                await bucket.acquire()
+            delay = None
+            try:
+                response = await client.request(method, url, **kwargs)
+            except httpx.TransportError as e:
+                if attempt == retries:
+                    raise
+                logger.warning("HTTP %s %s failed (%r), retrying", method, url, e)
+            else:
+                if (
+                    response.status_code not in limits.retry_statuses
+                    or attempt == retries
+                ):
+                    return response
+                delay = retry_after(response)
+                if delay is not None and delay > limits.max_retry_after:
+                    logger.warning(
+                        "HTTP %s %s returned %d with Retry-After %.0fs, not retrying",
+                        method,
+                        url,
+                        response.status_code,
+                        delay,
+                    )
+                    return response
+                logger.warning(
+                    "HTTP %s %s returned %d, retrying",
+                    method,
+                    url,
+                    response.status_code,
+                )
+                await response.aclose()
+            if delay is None:
+                delay = min(
+                    limits.backoff * 2**attempt * random.uniform(0.5, 1.5),
+                    limits.max_backoff,
+                )
+            await asyncio.sleep(delay)
+
+    async def get(self, url: str, **kwargs: Any) -> httpx.Response:
+        return await self.request("GET", url, **kwargs)
+
+    async def post(self, url: str, **kwargs: Any) -> httpx.Response:
+        return await self.request("POST", url, **kwargs)
+
+    async def aclose(self):
+        """Closes the clients of the running event loop."""
+        loop = asyncio.get_running_loop()
+        for key in [key for key in self._clients if key[0] is loop]:
+            await self._clients.pop(key).aclose()
+
+    async def __aenter__(self) -> "HttpClientPool":
+        return self
+
+    async def __aexit__(self, *exc_info: Any):
+        await self.aclose()
+
+
+_http_pool: Optional[HttpClientPool] = None
+
+
+def get_http_pool() -> HttpClientPool:
+    """Returns the process-wide HTTP client pool, creating it on first use."""
+    global _http_pool
+    if _http_pool is None:
+        _http_pool = HttpClientPool()
+    return _http_pool
+
+
+async def close_http_pool():
+    """Closes the process-wide HTTP client pool, e.g. on server shutdown."""
+    global _http_pool
+    if _http_pool is not None:
+        await _http_pool.aclose()
+        _http_pool = None
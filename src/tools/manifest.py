@@ -0,0 +1,232 @@
+"""
+Tool manifests let the graph bind tool schemas without importing tool code.
+
+A manifest lists every tool of a tool package with its name, description,
+argument JSON schema and implementing class. The graph is built from LazyTool
+proxies, and a tool's module is only imported, and the tool instantiated, on
+its first call. The manifest records a hash of every module's source, so a
+stale manifest is detected without importing anything.
+
+Regenerate the manifest after changing tools (create_mimaizey_graph also
+rewrites a stale one):
+
+    python -m src.tools.manifest src.tools.tool_directory
+"""
+
+import argparse
+import hashlib
+import importlib
+import importlib.util
+import inspect
+import os
+import pkgutil
+import tempfile
+from logging import getLogger
+from pathlib import Path
+from typing import Any, Optional, Union
+
+from langchain_core.messages.tool import ToolCall
+from langchain_core.runnables import RunnableConfig
+from langchain_core.tools import BaseTool
+from langchain_core.utils.function_calling import convert_to_openai_tool
+from pydantic import BaseModel, PrivateAttr, ValidationError
+
+from src.tools.base import MiMaizeyTool
+
+logger = getLogger(__name__)
+
+MANIFEST_FILENAME = "manifest.json"
+
+
+class ToolManifestEntry(BaseModel):
+    """
+    Schema of one tool in a manifest
+    """
+
+    name: str
+    description: str
+    args_schema: dict[str, Any]
+    module: str
+    class_name: str
+    timeout: Optional[float] = None
+    side_effect_free: bool = False
+
+
+class ToolManifest(BaseModel):
+    """
+    Schema of a tool package's manifest
+    """
+
+    package: str
+    module_hashes: dict[str, str]
+    tools: list[ToolManifestEntry]
+
+
+def default_manifest_path(package_path: str) -> Path:
+    """Returns the manifest location of a tool package: inside the package."""
+    spec = importlib.util.find_spec(package_path)
+    return Path(list(spec.submodule_search_locations)[0]) / MANIFEST_FILENAME
+
+
+def hash_files(files: list[Path], root: Path) -> str:
+    """Hashes the paths, relative to `root`, and contents of files."""
+    digest = hashlib.sha256()
+    for file in files:
+        digest.update(file.relative_to(root).as_posix().encode() + b"\0")
+        digest.update(file.read_bytes())
+    return digest.hexdigest()
+
+
+def hash_modules(package_path: str) -> dict[str, str]:
+    """
+    Hashes the source of every module in a package without importing them. A
+    subpackage is hashed over all of its Python files, and a compiled module
+    over its files.
+    """
+    spec = importlib.util.find_spec(package_path)
+    hashes = {}
+    for module_info in pkgutil.iter_modules(spec.submodule_search_locations):
+        root = Path(module_info.module_finder.path)
+        if module_info.ispkg:
+            files = sorted((root / module_info.name).rglob("*.py"))
+        elif (root / f"{module_info.name}.py").exists():
+            files = [root / f"{module_info.name}.py"]
+        else:
+            files = sorted(root.glob(f"{module_info.name}.*"))
+        hashes[module_info.name] = hash_files(files, root)
+    return hashes
+
+
+def generate_manifest(package_path: str) -> ToolManifest:
+    """Imports every tool of a package and describes it in a manifest."""
+    entries = []
+    for _, modname, _ in pkgutil.iter_modules(
+        importlib.import_module(package_path).__path__
+    ):
+        module_path = f"{package_path}.{modname}"
+        module = importlib.import_module(module_path)
+        for class_name, cls in inspect.getmembers(module, inspect.isclass):
+            if (
+                issubclass(cls, MiMaizeyTool)
+                and cls is not MiMaizeyTool
+                and cls.__module__ == module_path
+            ):
+                tool = cls()
+                entries.append(
+                    ToolManifestEntry(
+                        name=tool.name,
+                        description=tool.description,
+                        args_schema=convert_to_openai_tool(tool)["function"][
+                            "parameters"
+                        ],
+                        module=module_path,
+                        class_name=class_name,
+                        timeout=tool.timeout,
+                        side_effect_free=tool.side_effect_free,
+                    )
+                )
+    return ToolManifest(
+        package=package_path, module_hashes=hash_modules(package_path), tools=entries
+    )
+
+
+def write_manifest(package_path: str, path: Optional[Path] = None) -> ToolManifest:
+    """
+    Generates a package's manifest and writes it to `path`. The file is written
+    to a temporary file and renamed, so concurrent readers, such as other worker
+    processes, never see a partial manifest.
+    """
+    manifest = generate_manifest(package_path)
+    path = path or default_manifest_path(package_path)
+    with tempfile.NamedTemporaryFile(
+        "w", dir=path.parent, prefix=f".{path.name}.", suffix=".tmp", delete=False
+    ) as file:
+        file.write(manifest.model_dump_json(indent=2) + "\n")
+    try:
+        # Temporary files are private to the owner; manifests are not.
+        os.chmod(file.name, 0o644)
+        os.replace(file.name, path)
+    except OSError:
+        os.unlink(file.name)
+        raise
+    return manifest
+
+
+def read_manifest(
+    package_path: str, path: Optional[Path] = None
+) -> Optional[ToolManifest]:
+    """
+    Reads a package's manifest; returns None if it is missing, invalid or stale.
+    """
+    path = path or default_manifest_path(package_path)
+    if not path.exists():
+        return None
+    try:
+        manifest = ToolManifest.model_validate_json(path.read_text())
+    except ValidationError as e:
+        logger.warning("Tool manifest %s is invalid: %s", path, e)
+        return None
+    if manifest.package != package_path:
+        return None
+    if manifest.module_hashes != hash_modules(package_path):
+        logger.warning("Tool manifest %s is stale", path)
+        return None
+    return manifest
+
+
+class LazyTool(BaseTool):
+    """
+    Proxy of a manifest entry. It exposes the tool's name, description and
+    argument schema for binding, and imports and instantiates the implementing
+    MiMaizeyTool on its first call, delegating every call to it.
+    """
+
+    entry: ToolManifestEntry
+    timeout: Optional[float] = None
+    side_effect_free: bool = False
+    response_format: str = "content_and_artifact"
+    _tool: Optional[MiMaizeyTool] = PrivateAttr(default=None)
+
+    def __init__(self, entry: ToolManifestEntry, **kwargs: Any):
+        super().__init__(
+            entry=entry,
+            name=entry.name,
+            description=entry.description,
+            args_schema=entry.args_schema,
+            timeout=entry.timeout,
+            side_effect_free=entry.side_effect_free,
+            **kwargs,
+        )
+
+    @property
+    def tool(self) -> MiMaizeyTool:
+        """The implementing tool, imported and instantiated on first access."""
+        if self._tool is None:
+            module = importlib.import_module(self.entry.module)
+            self._tool = getattr(module, self.entry.class_name)()
+        return self._tool
+
+    async def ainvoke(
+        self,
+        input: Union[str, dict, ToolCall],
+        config: Optional[RunnableConfig] = None,
+        **kwargs: Any,
+    ):
+        return await self.tool.ainvoke(input, config, **kwargs)
+
+    def _run(self, *args: Any, **kwargs: Any):
+        raise NotImplementedError("MiMaizeyTool does not support sync invocation.")
+
+
+def load_lazy_tools(manifest: ToolManifest) -> list[LazyTool]:
+    """Creates a LazyTool for every tool in a manifest."""
+    return [LazyTool(entry) for entry in manifest.tools]
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Generate a tool manifest.")
+    parser.add_argument("package", nargs="?", default="src.tools.tool_directory")
+    parser.add_argument("--output", type=Path, default=None)
+    args = parser.parse_args()
+    manifest = write_manifest(args.package, args.output)
+    print(f"Wrote {len(manifest.tools)} tool(s) to the manifest of {args.package}")
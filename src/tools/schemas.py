@@ -1,4 +1,4 @@
-from typing import Any
+from typing import Any, Literal, Optional
 
 from pydantic import BaseModel, ConfigDict
 
@@ -14,6 +14,32 @@ class ToolCall(BaseModel):
     metadata: dict[str, Any] = {}
 
 
+class ToolChunk(BaseModel):
+    """
+    A part of a streamed tool result, yielded by MiMaizeyTool._astream
+    """
+
+    content: str = ""
+    sources: list[ToolSource] = []
+    metadata: dict[str, Any] = {}
+
+
+class ToolProgressEvent(BaseModel):
+    """
+    Emitted for every chunk of a streaming tool, with the chunk's content and
+    the totals consumed so far
+    """
+
+    type: Literal["tool_progress"] = "tool_progress"
+    tool_name: str
+    tool_call_id: Optional[str] = None
+    content: str = ""
+    sources: list[ToolSource] = []
+    chunks: int
+    bytes: int
+    truncated: bool = False
+
+
 class ToolArtifact(BaseModel):
     """
     Schema for MiMaizey tool responses
@@ -5,6 +5,7 @@ from typing import Type
 from langchain_core.runnables import RunnableConfig
 from pydantic import BaseModel, Field
 
+from src.common.logs import LogPayload
 from src.tools.base import MiMaizeyTool
 from src.tools.schemas import ToolArtifact, ToolSource
 
@@ -32,6 +33,17 @@ class MultiplicationTool(MiMaizeyTool):
     )
     # NOTE: Use Type[BaseModel] = None if the tool does not require any input
 
+    # Deterministic tools can opt in to result caching (see MiMaizeyTool):
+    # cache_ttl = 3600  # Reuse results of identical calls for an hour
+    # cache_config_keys = ("campus",)  # Config keys the result depends on
+
+    # Tools without side effects can opt in to speculative calls (see MiMaizeyTool):
+    # side_effect_free = True
+
+    # Tools doing CPU-bound or blocking work implement the synchronous _run instead of
+    # _arun and run it off the event loop (see MiMaizeyTool):
+    # execution_mode = "thread"  # or "process" for CPU-bound work
+
     # note that the args are the same as the input schema
     # Any custom logic goes in the _arun method
     async def _arun(
@@ -44,10 +56,14 @@ class MultiplicationTool(MiMaizeyTool):
             if not k.startswith("__") and not k.startswith("checkpoint")
         }  # Filter out private keys and checkpoint keys. You are only interested in the keys that are added by you.
         # you need not to do the above. you can just get the appropriate key from the config if needed
-        logger.info(f"✨✨✨✨ config is {configurable}")
+        # Log payloads lazily with LogPayload; it redacts user data such as emails.
+        logger.info("config is %s", LogPayload(configurable))
         # The config is a dictionary that contains the runtime configuration of the tool.
         # Use this to pass any additional information to the tool that the AI does not need to be aware of.
 
+        # To call an external API, use the shared HTTP client pool instead of creating your own client:
+        # response = await self.http.get("https://api.example.umich.edu/...")
+
         result = num1 * num2
         return result, ToolArtifact(
             sources=[ToolSource(label="Multiplication", url="")],
@@ -0,0 +1,45 @@
+"""
+Context budget behavior of AgentGraph with a scripted model.
+
+Run from the repository root:
+    python -m unittest discover tests
+"""
+
+import unittest
+
+from langchain_core.messages import AIMessage, HumanMessage
+
+from benchmarks.fake_llm import FakeChatModel
+from src.graph.agent_graph import AgentGraph
+from src.graph.context import ContextBudget, create_llm_summarizer
+from src.graph.events import TokenEvent
+
+
+class ContextBudgetStreamTest(unittest.IsolatedAsyncioTestCase):
+    async def test_summary_is_not_streamed_as_reply_tokens(self):
+        summarizer = create_llm_summarizer(
+            FakeChatModel(script=[AIMessage(content="SECRET SUMMARY OF OLD TURNS")])
+        )
+        graph = AgentGraph(
+            tools=[],
+            config={"configurable": {}},
+            llm=FakeChatModel(script=[AIMessage(content="final answer")]),
+            context_budget=ContextBudget(max_tokens=60, summarizer=summarizer),
+        )
+        graph.compile()
+        chat_history = []
+        for i in range(10):
+            chat_history.append(HumanMessage(content=f"question {i} " * 10))
+            chat_history.append(AIMessage(content=f"answer {i} " * 10))
+
+        tokens = [
+            event.content
+            async for event in graph.stream(chat_history, "next question")
+            if isinstance(event, TokenEvent)
+        ]
+
+        self.assertEqual("".join(tokens), "final answer")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,86 @@
+"""
+Retry behavior of HttpClientPool against a local stub server.
+
+Run from the repository root:
+    python -m unittest discover tests
+"""
+
+import threading
+import time
+import unittest
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from src.tools.http import HostLimits, HttpClientPool
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    """Answers with the next scripted (status, headers) of the server."""
+
+    def do_GET(self):
+        self._respond()
+
+    def do_POST(self):
+        self.rfile.read(int(self.headers.get("Content-Length", 0)))
+        self._respond()
+
+    def _respond(self):
+        server = self.server
+        server.requests.append((self.command, time.monotonic()))
+        status, headers = server.script.pop(0) if server.script else (200, {})
+        self.send_response(status)
+        for name, value in headers.items():
+            self.send_header(name, value)
+        self.send_header("Content-Length", "0")
+        self.end_headers()
+
+    def log_message(self, format, *args):
+        pass
+
+
+class HttpClientPoolRetryTest(unittest.IsolatedAsyncioTestCase):
+    def setUp(self):
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), StubHandler)
+        self.server.script = []
+        self.server.requests = []
+        threading.Thread(
+            target=self.server.serve_forever, args=(0.05,), daemon=True
+        ).start()
+        self.url = f"http://127.0.0.1:{self.server.server_port}/resource"
+        self.pool = HttpClientPool(
+            HostLimits(retries=2, backoff=0.01, max_backoff=0.05, max_retry_after=5)
+        )
+
+    async def asyncTearDown(self):
+        await self.pool.aclose()
+        self.server.shutdown()
+        self.server.server_close()
+
+    async def test_get_waits_for_retry_after_beyond_max_backoff(self):
+        self.server.script = [(429, {"Retry-After": "1"})]
+        response = await self.pool.get(self.url)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(self.server.requests), 2)
+        (_, first), (_, second) = self.server.requests
+        self.assertGreaterEqual(second - first, 1.0)
+
+    async def test_retry_after_beyond_limit_is_not_retried(self):
+        self.server.script = [(429, {"Retry-After": "120"})]
+        response = await self.pool.get(self.url)
+        self.assertEqual(response.status_code, 429)
+        self.assertEqual(len(self.server.requests), 1)
+
+    async def test_post_is_not_retried_by_default(self):
+        self.server.script = [(503, {}), (200, {})]
+        response = await self.pool.post(self.url, json={"a": 1})
+        self.assertEqual(response.status_code, 503)
+        self.assertEqual(len(self.server.requests), 1)
+
+    async def test_post_is_retried_when_requested(self):
+        self.server.script = [(429, {"Retry-After": "0"}), (200, {})]
+        response = await self.pool.post(self.url, json={"a": 1}, retry=True)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual([method for method, _ in self.server.requests], ["POST"] * 2)
+
+
+if __name__ == "__main__":
+    unittest.main()